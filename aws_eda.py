@@ -8,22 +8,38 @@ This project was developed with assistance from Cursor AI, which provided code s
 debugging support, and implementation guidance throughout the development process.
 """
 
+import functools
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
-import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
-from io import StringIO
 
-sns.set_style("darkgrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['figure.facecolor'] = '#0E1117'
-plt.rcParams['axes.facecolor'] = '#0E1117'
-plt.rcParams['axes.labelcolor'] = 'white'
-plt.rcParams['text.color'] = 'white'
-plt.rcParams['xtick.color'] = 'white'
-plt.rcParams['ytick.color'] = 'white'
+from finops.loader import (
+    COMPUTE_DTYPES,
+    COMPUTE_STEM,
+    COMPUTE_TAB_COLUMNS,
+    S3_DTYPES,
+    S3_STEM,
+    S3_TAB_COLUMNS,
+    SNAPSHOT_SUFFIX,
+    file_signature,
+    find_dataset,
+    snapshot_supported,
+    tab_columns,
+)
+from finops.filter_index import COMPUTE_FILTER_COLUMNS, S3_FILTER_COLUMNS
+from finops import anomalies, charts, downloads, forecast, quality, query, rightsizing, tags, tiering, uploads
+from finops.export import ChartExporter
+from finops.history import DEFAULT_DB_NAME, HistoryStore, snapshot_date_for
+from finops.profiling import Profiler, profile_setting
+from finops.registry import DatasetRegistry
+from finops.sources import ACCOUNT_COLUMN, DATA_ENV_VAR, account_for, data_patterns, expand_inputs, load_sources
+
+charts.apply_theme()
+profiler = Profiler.from_env()
 
 st.set_page_config(
     page_title="AWS Cloud Economics Dashboard",
@@ -81,33 +97,170 @@ st.markdown("""
 st.markdown('<h1 class="main-header">☁️ AWS Cloud Economics Analyzer</h1>', unsafe_allow_html=True)
 st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #888;">Comprehensive Cost & Performance Analysis Dashboard</p>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_figure_cache():
+    return charts.FigureCache(max_entries=64)
+
+
+@st.cache_resource
+def get_export_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="chart-export")
+
+
+@st.cache_resource
+def get_dataset_registry():
+    return DatasetRegistry()
+
+
+# `signatures` is a tuple of file_signature() tuples, one per export file, so
+# the registry loads the data again whenever any of the files changes.
+def load_dataset(name, signatures, dtypes):
+    return get_dataset_registry().acquire(
+        name, signatures, lambda: load_sources([path for path, _, _ in signatures], dtypes)
+    )
+
+
+def load_upload_dataset(name, files, dtypes, required, progress):
+    """Registry view of uploaded exports, parsed once per distinct content."""
+    digest = uploads.content_hash(files)
+    return get_dataset_registry().acquire(
+        f"upload:{name}:{digest}",
+        (digest,),
+        lambda: uploads.load_uploads(
+            files, dtypes, required,
+            lambda fraction: progress.progress(fraction, text=f"Parsing {name} uploads... {fraction:.0%}"),
+        ),
+    )
+
+
+# `rules_signature` is the file_signature() of cleaning_rules.json (None when
+# absent), so editing the rules re-cleans the data.
+def load_cleaning_rules(rules_signature):
+    return quality.cleaning_rules(rules_signature[0] if rules_signature else None)
+
+
+@st.cache_resource(show_spinner="Opening exports in DuckDB...", max_entries=2)
+def get_duckdb_backend(compute_signatures, s3_signatures, rules_signature):
+    return query.DuckDBBackend([path for path, _, _ in compute_signatures], [path for path, _, _ in s3_signatures],
+                               load_cleaning_rules(rules_signature))
+
+
+def build_pandas_backend(ec2_full, s3_full, rules_signature):
+    rules = load_cleaning_rules(rules_signature)
+    return query.PandasBackend(
+        query.PandasDataset.projected(ec2_full, EC2_DASHBOARD_COLUMNS, COMPUTE_FILTER_COLUMNS,
+                                      rules["compute"], COMPUTE_DTYPES),
+        query.PandasDataset.projected(s3_full, S3_DASHBOARD_COLUMNS, S3_FILTER_COLUMNS, rules["s3"], S3_DTYPES),
+    )
+
+
+@st.cache_resource(show_spinner="Loading exports...", max_entries=2)
+def get_pandas_backend(compute_signatures, s3_signatures, rules_signature):
+    return build_pandas_backend(load_dataset("compute", compute_signatures, COMPUTE_DTYPES),
+                                load_dataset("s3", s3_signatures, S3_DTYPES), rules_signature)
+
+
+@st.cache_data(show_spinner=False)
+def load_instance_catalog(path, mtime_ns, size):
+    return rightsizing.load_catalog(path)
+
+
+@st.cache_data(show_spinner=False)
+def load_s3_price_table(path, mtime_ns, size):
+    return tiering.load_price_table(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_cost_history(db_path, snapshot_dates, service, before, window):
+    # snapshot_dates only keys the cache, so ingesting another export refreshes it.
+    return HistoryStore(db_path).resource_costs(service, window, before)
+
+
+EC2_DASHBOARD_COLUMNS = tab_columns(COMPUTE_TAB_COLUMNS, "filters", "ec2", "insights", "forecast", "tags")
+S3_DASHBOARD_COLUMNS = tab_columns(S3_TAB_COLUMNS, "filters", "s3", "insights", "tiering", "forecast", "tags")
+
 BASE_DIR = Path(__file__).resolve().parent
-compute_csv_path = BASE_DIR / "aws_resources_compute.csv"
-s3_csv_path = BASE_DIR / "aws_resources_S3.csv"
+cleaning_rules_path = BASE_DIR / quality.RULES_FILENAME
+rules_signature = file_signature(cleaning_rules_path) if cleaning_rules_path.exists() else None
+with profiler.stage("locate_datasets"):
+    input_patterns = data_patterns()
+    if input_patterns:
+        compute_paths = expand_inputs(input_patterns, COMPUTE_STEM)
+        s3_paths = expand_inputs(input_patterns, S3_STEM)
+    else:
+        compute_paths = [p for p in [find_dataset(BASE_DIR, COMPUTE_STEM)] if p is not None]
+        s3_paths = [p for p in [find_dataset(BASE_DIR, S3_STEM)] if p is not None]
 
-if not compute_csv_path.exists() or not s3_csv_path.exists():
+if not compute_paths or not s3_paths:
     st.error("❌ CSV files not found!")
-    st.info("""
-    **Please ensure the following files are in the same folder as this script:**
-    - `aws_resources_compute.csv`
-    - `aws_resources_S3.csv`
-    
-    **Or upload them using the file uploader below:**
-    """)
-    
-    uploaded_ec2 = st.file_uploader("Upload EC2/Compute Data (CSV)", type=["csv"], key="ec2")
-    uploaded_s3 = st.file_uploader("Upload S3 Data (CSV)", type=["csv"], key="s3")
-    
-    if uploaded_ec2 is not None and uploaded_s3 is not None:
-        ec2_df = pd.read_csv(uploaded_ec2)
-        s3_df = pd.read_csv(uploaded_s3)
+    if input_patterns:
+        st.info(f"""
+        **No compute and S3 exports matched `{DATA_ENV_VAR}`:** `{", ".join(input_patterns)}`
+        
+        File names must start with `{COMPUTE_STEM}` or `{S3_STEM}` (CSV or `.parquet`).
+        
+        **Or upload them using the file uploader below:**
+        """)
+    else:
+        st.info(f"""
+        **Please ensure the following files are in the same folder as this script:**
+        - `aws_resources_compute.csv` (or its `.parquet` snapshot)
+        - `aws_resources_S3.csv` (or its `.parquet` snapshot)
+        
+        To load one export per account, set `{DATA_ENV_VAR}` to directories or glob patterns.
+        
+        **Or upload them using the file uploader below (one file per account is fine):**
+        """)
+    
+    uploaded_ec2 = st.file_uploader("Upload EC2/Compute Data (CSV, optionally .gz or .zst)", type=uploads.UPLOAD_TYPES,
+                                    key="ec2", accept_multiple_files=True)
+    uploaded_s3 = st.file_uploader("Upload S3 Data (CSV, optionally .gz or .zst)", type=uploads.UPLOAD_TYPES,
+                                   key="s3", accept_multiple_files=True)
+    
+    if uploaded_ec2 and uploaded_s3:
+        upload_key = (tuple(f.file_id for f in uploaded_ec2), tuple(f.file_id for f in uploaded_s3), rules_signature)
+        if st.session_state.get("upload_key") != upload_key:
+            # Parsed uploads nobody is viewing any more are dropped before loading new ones.
+            get_dataset_registry().prune("upload:")
+            upload_progress = st.progress(0.0, text="Reading uploads...")
+            try:
+                with profiler.stage("load:upload") as stage:
+                    ec2_full = load_upload_dataset("compute", uploaded_ec2, COMPUTE_DTYPES,
+                                                   uploads.COMPUTE_REQUIRED_COLUMNS, upload_progress)
+                    s3_full = load_upload_dataset("S3", uploaded_s3, S3_DTYPES,
+                                                  uploads.S3_REQUIRED_COLUMNS, upload_progress)
+                    stage.rows = lambda: len(ec2_full) + len(s3_full)
+            except ValueError as error:
+                upload_progress.empty()
+                st.error(f"❌ {error}")
+                st.stop()
+            upload_progress.empty()
+            st.session_state["upload_backend"] = build_pandas_backend(ec2_full, s3_full, rules_signature)
+            st.session_state["upload_key"] = upload_key
+        backend = st.session_state["upload_backend"]
+        dataset_signature = upload_key
         st.success("✅ Files loaded successfully!")
     else:
         st.stop()
 else:
-    ec2_df = pd.read_csv(compute_csv_path)
-    s3_df = pd.read_csv(s3_csv_path)
-    st.success("✅ CSV files loaded from local directory!")
+    with profiler.stage("load:backend") as stage:
+        compute_signatures = tuple(file_signature(p) for p in compute_paths)
+        s3_signatures = tuple(file_signature(p) for p in s3_paths)
+        if query.backend_name() == "duckdb":
+            backend = get_duckdb_backend(compute_signatures, s3_signatures, rules_signature)
+        else:
+            backend = get_pandas_backend(compute_signatures, s3_signatures, rules_signature)
+        stage.rows = lambda: len(backend.ec2) + len(backend.s3)
+    dataset_signature = (backend.name, compute_signatures, s3_signatures, rules_signature)
+    engine_note = " (queried with DuckDB)" if backend.name == "duckdb" else ""
+    if len(compute_paths) > 1 or len(s3_paths) > 1:
+        accounts = {account_for(p) for p in compute_paths + s3_paths}
+        st.success(f"✅ {len(compute_paths)} compute and {len(s3_paths)} S3 exports loaded across "
+                   f"{len(accounts)} account{'s' if len(accounts) != 1 else ''}{engine_note}!")
+    elif all(p.suffix == SNAPSHOT_SUFFIX for p in compute_paths + s3_paths):
+        st.success(f"✅ Parquet snapshots loaded from local directory{engine_note}!")
+    else:
+        st.success(f"✅ CSV files loaded from local directory{engine_note}!")
 
 with st.sidebar:
     st.markdown("### 🔍 Filters")
@@ -115,7 +268,17 @@ with st.sidebar:
     
     st.markdown("#### 💻 EC2/Compute Filters")
     
-    ec2_regions_list = sorted([x for x in ec2_df["Region"].dropna().unique() if pd.notna(x)])
+    if len(backend.ec2.options(ACCOUNT_COLUMN)) > 0:
+        ec2_accounts = st.multiselect(
+            "Select Accounts (EC2)",
+            options=backend.ec2.options(ACCOUNT_COLUMN),
+            default=backend.ec2.options(ACCOUNT_COLUMN),
+            key="ec2_accounts"
+        )
+    else:
+        ec2_accounts = []
+    
+    ec2_regions_list = backend.ec2.options("Region")
     ec2_regions = st.multiselect(
         "Select Regions (EC2)",
         options=ec2_regions_list,
@@ -123,7 +286,7 @@ with st.sidebar:
         key="ec2_regions"
     )
     
-    ec2_instance_types_list = sorted([x for x in ec2_df["InstanceType"].dropna().unique() if pd.notna(x)])
+    ec2_instance_types_list = backend.ec2.options("InstanceType")
     ec2_instance_types = st.multiselect(
         "Select Instance Types",
         options=ec2_instance_types_list,
@@ -131,7 +294,7 @@ with st.sidebar:
         key="ec2_types"
     )
     
-    ec2_states_list = sorted([x for x in ec2_df["State"].dropna().unique() if pd.notna(x)])
+    ec2_states_list = backend.ec2.options("State")
     ec2_states = st.multiselect(
         "Select States",
         options=ec2_states_list,
@@ -139,8 +302,8 @@ with st.sidebar:
         key="ec2_states"
     )
     
-    if "ResourceType" in ec2_df.columns:
-        ec2_resource_types_list = sorted([x for x in ec2_df["ResourceType"].dropna().unique() if pd.notna(x)])
+    if len(backend.ec2.options("ResourceType")) > 0:
+        ec2_resource_types_list = backend.ec2.options("ResourceType")
         ec2_resource_types = st.multiselect(
             "Select Resource Types",
             options=ec2_resource_types_list,
@@ -150,10 +313,30 @@ with st.sidebar:
     else:
         ec2_resource_types = []
     
+    ec2_tag_filters = {}
+    for tag_column in backend.ec2.tag_columns():
+        ec2_tag_filters[tag_column] = st.multiselect(
+            f"Tag: {tag_column[len(tags.TAG_COLUMN_PREFIX):]} (EC2)",
+            options=backend.ec2.options(tag_column),
+            default=[],
+            placeholder="All (including untagged)",
+            key=f"ec2_{tag_column}"
+        )
+    
     st.markdown("---")
     st.markdown("#### 📦 S3 Filters")
     
-    s3_regions_list = sorted([x for x in s3_df["Region"].dropna().unique() if pd.notna(x)])
+    if len(backend.s3.options(ACCOUNT_COLUMN)) > 0:
+        s3_accounts = st.multiselect(
+            "Select Accounts (S3)",
+            options=backend.s3.options(ACCOUNT_COLUMN),
+            default=backend.s3.options(ACCOUNT_COLUMN),
+            key="s3_accounts"
+        )
+    else:
+        s3_accounts = []
+    
+    s3_regions_list = backend.s3.options("Region")
     s3_regions = st.multiselect(
         "Select Regions (S3)",
         options=s3_regions_list,
@@ -161,7 +344,7 @@ with st.sidebar:
         key="s3_regions"
     )
     
-    s3_storage_classes_list = sorted([x for x in s3_df["StorageClass"].dropna().unique() if pd.notna(x)])
+    s3_storage_classes_list = backend.s3.options("StorageClass")
     s3_storage_classes = st.multiselect(
         "Select Storage Classes",
         options=s3_storage_classes_list,
@@ -169,8 +352,8 @@ with st.sidebar:
         key="s3_storage"
     )
     
-    if "Encryption" in s3_df.columns:
-        s3_encryption_list = sorted([x for x in s3_df["Encryption"].dropna().unique() if pd.notna(x)])
+    if len(backend.s3.options("Encryption")) > 0:
+        s3_encryption_list = backend.s3.options("Encryption")
         s3_encryption = st.multiselect(
             "Select Encryption",
             options=s3_encryption_list,
@@ -180,50 +363,162 @@ with st.sidebar:
     else:
         s3_encryption = []
     
+    s3_tag_filters = {}
+    for tag_column in backend.s3.tag_columns():
+        s3_tag_filters[tag_column] = st.multiselect(
+            f"Tag: {tag_column[len(tags.TAG_COLUMN_PREFIX):]} (S3)",
+            options=backend.s3.options(tag_column),
+            default=[],
+            placeholder="All (including untagged)",
+            key=f"s3_{tag_column}"
+        )
+    
     st.markdown("---")
     st.markdown("### 📊 Quick Stats")
     st.markdown("---")
     
-    ec2_filtered = ec2_df[
-        (ec2_df["Region"].isin(ec2_regions) if len(ec2_regions) > 0 else True) &
-        (ec2_df["InstanceType"].isin(ec2_instance_types) if len(ec2_instance_types) > 0 else True) &
-        (ec2_df["State"].isin(ec2_states) if len(ec2_states) > 0 else True)
-    ]
-    
-    if "ResourceType" in ec2_df.columns and len(ec2_resource_types) > 0:
-        ec2_filtered = ec2_filtered[ec2_filtered["ResourceType"].isin(ec2_resource_types)]
-    
-    s3_filtered = s3_df[
-        (s3_df["Region"].isin(s3_regions) if len(s3_regions) > 0 else True) &
-        (s3_df["StorageClass"].isin(s3_storage_classes) if len(s3_storage_classes) > 0 else True)
-    ]
-    
-    if "Encryption" in s3_df.columns and len(s3_encryption) > 0:
-        s3_filtered = s3_filtered[s3_filtered["Encryption"].isin(s3_encryption)]
-    
-    st.metric("EC2 Instances", f"{len(ec2_filtered):,}", f"{len(ec2_filtered) - len(ec2_df):,} filtered")
-    st.metric("S3 Buckets", f"{len(s3_filtered):,}", f"{len(s3_filtered) - len(s3_df):,} filtered")
+    with profiler.stage("filter:ec2") as stage:
+        ec2_filters = {
+            ACCOUNT_COLUMN: ec2_accounts,
+            "Region": ec2_regions,
+            "InstanceType": ec2_instance_types,
+            "State": ec2_states,
+            "ResourceType": ec2_resource_types,
+            **ec2_tag_filters,
+        }
+        ec2_selection = backend.ec2.select(ec2_filters)
+        stage.rows = lambda: len(ec2_selection)
+    
+    with profiler.stage("filter:s3") as stage:
+        s3_filters = {
+            ACCOUNT_COLUMN: s3_accounts,
+            "Region": s3_regions,
+            "StorageClass": s3_storage_classes,
+            "Encryption": s3_encryption,
+            **s3_tag_filters,
+        }
+        s3_selection = backend.s3.select(s3_filters)
+        stage.rows = lambda: len(s3_selection)
+    
+    st.metric("EC2 Instances", f"{len(ec2_selection):,}", f"{len(ec2_selection) - len(backend.ec2):,} filtered")
+    st.metric("S3 Buckets", f"{len(s3_selection):,}", f"{len(s3_selection) - len(backend.s3):,} filtered")
     
     st.markdown("---")
     st.markdown("### 💰 Cost Overview")
     
-    total_ec2_cost = ec2_filtered["CostUSD"].sum()
-    total_s3_cost = s3_filtered["CostUSD"].sum()
+    with profiler.stage("sidebar:cost_totals"):
+        total_ec2_cost = ec2_selection.total("CostUSD")
+        total_s3_cost = s3_selection.total("CostUSD")
     
     st.metric("Total EC2 Cost", f"${total_ec2_cost:,.2f}")
     st.metric("Total S3 Cost", f"${total_s3_cost:,.2f}")
     st.metric("Combined Cost", f"${total_ec2_cost + total_s3_cost:,.2f}")
     
+    st.markdown("---")
+    st.markdown("### 🎨 Chart Settings")
+    density_threshold = st.number_input(
+        "Density plot above (rows)",
+        min_value=1_000,
+        value=charts.DENSITY_THRESHOLD,
+        step=10_000,
+        help="Scatter plots with more points are drawn as a binned density heatmap",
+        key="density_threshold"
+    )
+    outlier_percentile = st.slider(
+        "Highlight cost above percentile",
+        min_value=90.0,
+        max_value=99.9,
+        value=charts.OUTLIER_PERCENTILE,
+        step=0.1,
+        help="In density mode, resources above this cost percentile are still drawn as points",
+        key="outlier_percentile"
+    )
+    scatter_params = {"density_threshold": int(density_threshold), "outlier_percentile": outlier_percentile}
+    
+    st.markdown("---")
+    st.markdown("### 📐 Rightsizing")
+    catalog_path = BASE_DIR / rightsizing.CATALOG_FILENAME
+    if catalog_path.exists():
+        instance_catalog = load_instance_catalog(*file_signature(catalog_path))
+        target_utilization = st.slider(
+            "Target utilization (%)",
+            min_value=50,
+            max_value=95,
+            value=int(rightsizing.DEFAULT_TARGET_UTILIZATION * 100),
+            step=5,
+            help="Recommended types must keep CPU, memory and network below this utilization",
+            key="target_utilization"
+        )
+        cross_family = st.checkbox("Allow other instance families", value=False, key="cross_family")
+    else:
+        instance_catalog = None
+        st.caption(f"Add `{rightsizing.CATALOG_FILENAME}` next to the dashboard to enable rightsizing.")
+    
+    st.markdown("---")
+    st.markdown("### 🧊 S3 Lifecycle Policy")
+    price_table_path = BASE_DIR / tiering.PRICE_TABLE_FILENAME
+    if price_table_path.exists():
+        s3_price_table = load_s3_price_table(*file_signature(price_table_path))
+        age_options = ["Off", 30, 60, 90, 180, 365, 730, 1095, 1825]
+        tiering_policy = {}
+        for storage_class in tiering.POLICY_CLASSES:
+            after = st.select_slider(
+                f"Move to {storage_class} after (days)",
+                options=age_options,
+                value=tiering.DEFAULT_POLICY.get(storage_class, "Off"),
+                key=f"tiering_{storage_class}"
+            )
+            if after != "Off":
+                tiering_policy[storage_class] = after
+    else:
+        s3_price_table = None
+        st.caption(f"Add `{tiering.PRICE_TABLE_FILENAME}` next to the dashboard to simulate lifecycle policies.")
+    
+    st.markdown("---")
+    st.markdown("### 📤 Chart Export")
+    export_charts = st.checkbox("Save charts as PNG files", value=False, key="export_charts")
+    if export_charts:
+        if "chart_exporter" not in st.session_state:
+            run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            st.session_state["chart_exporter"] = ChartExporter(
+                BASE_DIR / "exports" / run_id, get_export_executor(), get_figure_cache()
+            )
+        chart_exporter = st.session_state["chart_exporter"]
+        st.caption(f"Writing to `{chart_exporter.output_dir.relative_to(BASE_DIR)}` · {chart_exporter.pending()} pending")
+        for filename, error in chart_exporter.errors().items():
+            st.warning(f"Could not export {filename}: {error}")
+    else:
+        chart_exporter = None
+    
     st.markdown("---")
     if st.button("🔄 Reset All Filters"):
         st.rerun()
 
-st.markdown(f"**📊 Filtered Results:** EC2 Instances: **{len(ec2_filtered):,}** | S3 Buckets: **{len(s3_filtered):,}**")
+st.markdown(f"**📊 Filtered Results:** EC2 Instances: **{len(ec2_selection):,}** | S3 Buckets: **{len(s3_selection):,}**")
 st.markdown("---")
 
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Data Overview", "💻 EC2 Analysis", "📦 S3 Analysis", "🎯 Insights"])
+figure_cache = get_figure_cache()
+# Chart data is a function of the loaded files, the cleaning rules and the
+# filters, so charts are cached on those rather than on a hash of their rows.
+ec2_chart_signature = (dataset_signature, "ec2", query.SelectionCache.key(ec2_filters))
+s3_chart_signature = (dataset_signature, "s3", query.SelectionCache.key(s3_filters))
+
+
+def show_chart(filename, draw, data, signature, **params):
+    with profiler.stage(f"chart:{filename}", rows=lambda: len(data[0]) if isinstance(data, tuple) else len(data)):
+        png = charts.render_chart(draw, data, figure_cache, signature, **params)
+    st.image(png, width='stretch')
+
+
+with profiler.stage("clean:complete_rows") as stage:
+    ec2_filtered = ec2_selection.complete()
+    s3_filtered = s3_selection.complete()
+    stage.rows = lambda: len(ec2_filtered) + len(s3_filtered)
 
-with tab1:
+SECTIONS = ["📈 Data Overview", "💻 EC2 Analysis", "📦 S3 Analysis", "🎯 Insights", "📅 Cost Trends"]
+active_section = st.radio("Section", SECTIONS, horizontal=True, label_visibility="collapsed", key="active_section")
+
+if active_section == "📈 Data Overview":
     st.markdown('<div class="section-header">Dataset Exploration</div>', unsafe_allow_html=True)
     
     col1, col2, col3, col4 = st.columns(4)
@@ -234,7 +529,7 @@ with tab1:
             <h3 style="margin:0; color: white;">EC2 Records</h3>
             <h2 style="margin:0; color: white;">{:,}</h2>
         </div>
-        """.format(len(ec2_filtered)), unsafe_allow_html=True)
+        """.format(len(ec2_selection)), unsafe_allow_html=True)
     
     with col2:
         st.markdown("""
@@ -242,7 +537,7 @@ with tab1:
             <h3 style="margin:0; color: white;">S3 Records</h3>
             <h2 style="margin:0; color: white;">{:,}</h2>
         </div>
-        """.format(len(s3_filtered)), unsafe_allow_html=True)
+        """.format(len(s3_selection)), unsafe_allow_html=True)
     
     with col3:
         st.markdown("""
@@ -250,7 +545,7 @@ with tab1:
             <h3 style="margin:0; color: white;">Avg EC2 Cost</h3>
             <h2 style="margin:0; color: white;">${:.2f}</h2>
         </div>
-        """.format(ec2_filtered["CostUSD"].mean() if len(ec2_filtered) > 0 else 0), unsafe_allow_html=True)
+        """.format(ec2_selection.mean("CostUSD")), unsafe_allow_html=True)
     
     with col4:
         st.markdown("""
@@ -258,90 +553,85 @@ with tab1:
             <h3 style="margin:0; color: white;">Total S3 Storage</h3>
             <h2 style="margin:0; color: white;">{:.1f} GB</h2>
         </div>
-        """.format(s3_filtered["TotalSizeGB"].sum() if len(s3_filtered) > 0 else 0), unsafe_allow_html=True)
+        """.format(s3_selection.total("TotalSizeGB")), unsafe_allow_html=True)
     
     st.markdown("---")
     
+    with profiler.stage("overview:profile") as stage:
+        ec2_profile = ec2_selection.profile()
+        s3_profile = s3_selection.profile()
+        stage.rows = lambda: ec2_profile.rows + s3_profile.rows
+    
+    profile_config = {
+        "NonNull": st.column_config.NumberColumn("Non-null", format="%d"),
+        "MissingPct": st.column_config.NumberColumn("Missing %", format="%.1f%%"),
+        "Invalid": st.column_config.NumberColumn("Invalid", help="Non-null values that do not parse as the expected type"),
+        "Distinct": st.column_config.NumberColumn("Distinct (≈)", format="%d",
+                                                  help=f"HyperLogLog estimate, about {quality.DISTINCT_ERROR:.1%} error"),
+    }
+    
     col_info1, col_info2 = st.columns(2)
     
     with col_info1:
         with st.expander("🔍 EC2 Dataset Details", expanded=False):
-            buffer = StringIO()
-            ec2_filtered.info(buf=buffer)
-            st.code(buffer.getvalue(), language=None)
+            st.markdown("**Data Quality Profile**")
+            st.dataframe(ec2_profile.summary(), width='stretch', hide_index=True, column_config=profile_config)
             
             st.markdown("**Statistical Summary**")
-            st.dataframe(ec2_filtered.describe(), width='stretch')
+            st.dataframe(ec2_profile.statistics(), width='stretch')
     
     with col_info2:
         with st.expander("🔍 S3 Dataset Details", expanded=False):
-            buffer = StringIO()
-            s3_filtered.info(buf=buffer)
-            st.code(buffer.getvalue(), language=None)
+            st.markdown("**Data Quality Profile**")
+            st.dataframe(s3_profile.summary(), width='stretch', hide_index=True, column_config=profile_config)
             
             st.markdown("**Statistical Summary**")
-            st.dataframe(s3_filtered.describe(), width='stretch')
+            st.dataframe(s3_profile.statistics(), width='stretch')
     
     st.markdown("---")
     st.markdown("### 🧹 Data Cleaning Report")
+    if rules_signature is None:
+        st.caption(f"Default cleaning rules. Add `{quality.RULES_FILENAME}` next to the dashboard to impute, drop "
+                   "or keep missing values per column.")
+    else:
+        st.caption(f"Cleaning rules from `{quality.RULES_FILENAME}`, applied on top of the defaults.")
     
-    ec2_missing_before = ec2_filtered.isna().sum().sum()
-    s3_missing_before = s3_filtered.isna().sum().sum()
-    
-    ec2_filtered = ec2_filtered.dropna()
-    s3_filtered = s3_filtered.dropna()
-    
-    ec2_missing_after = ec2_filtered.isna().sum().sum()
-    s3_missing_after = s3_filtered.isna().sum().sum()
+    with profiler.stage("overview:cleaning_report"):
+        ec2_cleaning = ec2_selection.cleaning_report()
+        s3_cleaning = s3_selection.cleaning_report()
     
     col_clean1, col_clean2 = st.columns(2)
     
-    with col_clean1:
-        st.info(f"**EC2:** Removed {ec2_missing_before} missing values | Final: {len(ec2_filtered):,} records")
-    
-    with col_clean2:
-        st.info(f"**S3:** Removed {s3_missing_before} missing values | Final: {len(s3_filtered):,} records")
+    for column, service, cleaning, profile, plan in (
+        (col_clean1, "EC2", ec2_cleaning, ec2_profile, backend.ec2.plan),
+        (col_clean2, "S3", s3_cleaning, s3_profile, backend.s3.plan),
+    ):
+        with column:
+            dropped = cleaning["records_before"] - cleaning["records_after"]
+            st.info(f"**{service}:** {cleaning['missing_values']} missing values | Imputed "
+                    f"{cleaning['imputed_values']} | Dropped {dropped:,} records | Final: {cleaning['records_after']:,} records")
+            cleaning_rows = quality.cleaning_table(profile, plan)
+            if len(cleaning_rows) > 0:
+                st.dataframe(cleaning_rows, width='stretch', hide_index=True)
 
-with tab2:
+if active_section == "💻 EC2 Analysis":
     st.markdown('<div class="section-header">EC2 Compute Analysis</div>', unsafe_allow_html=True)
     
+    with profiler.stage("ec2:chart_data") as stage:
+        ec2_points = ec2_filtered.frame(["CPUUtilization", "CostUSD"])
+        stage.rows = lambda: len(ec2_points)
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        fig1, ax1 = plt.subplots(facecolor='#0E1117')
-        ax1.set_facecolor('#0E1117')
-        sns.histplot(ec2_filtered["CPUUtilization"], bins=20, kde=True, ax=ax1, color='#4ECDC4')
-        ax1.set_title("CPU Utilization Distribution", color='white', fontsize=14, fontweight='bold')
-        ax1.set_xlabel("CPU Utilization (%)", color='white')
-        ax1.set_ylabel("Frequency", color='white')
-        ax1.tick_params(colors='white')
-        st.pyplot(fig1)
-        plt.savefig("cpu_utilization_distribution.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-        plt.close()
+        show_chart("cpu_utilization_distribution.png", charts.cpu_histogram, ec2_points["CPUUtilization"], ec2_chart_signature,
+                   bins=20, kde=True)
     
     with col2:
-        fig2, ax2 = plt.subplots(facecolor='#0E1117')
-        ax2.set_facecolor('#0E1117')
-        sns.boxplot(y=ec2_filtered["CostUSD"], ax=ax2, color='#FF6B6B')
-        ax2.set_title("EC2 Cost Distribution (Outliers)", color='white', fontsize=14, fontweight='bold')
-        ax2.set_ylabel("Cost (USD)", color='white')
-        ax2.tick_params(colors='white')
-        st.pyplot(fig2)
-        plt.savefig("ec2_cost_outliers.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-        plt.close()
-    
-    fig3, ax3 = plt.subplots(facecolor='#0E1117')
-    ax3.set_facecolor('#0E1117')
-    scatter = ax3.scatter(ec2_filtered["CPUUtilization"], ec2_filtered["CostUSD"], 
-                         c=ec2_filtered["CostUSD"], cmap='viridis', alpha=0.6, s=100)
-    ax3.set_title("CPU Utilization vs Cost Relationship", color='white', fontsize=16, fontweight='bold')
-    ax3.set_xlabel("CPU Utilization (%)", color='white', fontsize=12)
-    ax3.set_ylabel("Cost (USD)", color='white', fontsize=12)
-    ax3.tick_params(colors='white')
-    plt.colorbar(scatter, ax=ax3, label='Cost (USD)')
-    st.pyplot(fig3)
-    plt.savefig("cpu_vs_cost.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-    plt.close()
+        show_chart("ec2_cost_outliers.png", charts.cost_boxplot, ec2_points["CostUSD"], ec2_chart_signature)
+    
+    show_chart("cpu_vs_cost.png", charts.cpu_vs_cost_scatter, (ec2_points["CPUUtilization"], ec2_points["CostUSD"]),
+               ec2_chart_signature, **scatter_params)
     
     st.markdown("---")
     
@@ -349,75 +639,80 @@ with tab2:
     
     with col_analysis1:
         st.markdown("### 🏆 Top 5 Most Expensive Instances")
-        top_ec2_data = ec2_filtered.nlargest(5, "CostUSD")[["ResourceId", "Region", "CostUSD", "CPUUtilization"]]
+        with profiler.stage("ec2:top_instances"):
+            top_ec2_data = ec2_filtered.top_instances()
         top_ec2 = top_ec2_data.rename(columns={"ResourceId": "Resource ID", "CostUSD": "Cost (USD)", 
                                           "CPUUtilization": "CPU %"})
         st.dataframe(top_ec2, width='stretch', hide_index=True)
         
         if len(top_ec2_data) > 0:
-            fig_top5, ax_top5 = plt.subplots(figsize=(10, 6), facecolor='#0E1117')
-            ax_top5.set_facecolor('#0E1117')
-            
-            x_pos = range(len(top_ec2_data))
-            bars = ax_top5.barh(x_pos, top_ec2_data["CostUSD"].values, color='#FF6B6B', alpha=0.8)
-            
-            ax_top5.set_yticks(x_pos)
-            ax_top5.set_yticklabels([f"{row['ResourceId']}\n({row['Region']})" for _, row in top_ec2_data.iterrows()], 
-                                    color='white', fontsize=10)
-            ax_top5.set_xlabel("Cost (USD)", color='white', fontsize=12, fontweight='bold')
-            ax_top5.set_title("Top 5 Most Expensive EC2 Instances", color='white', fontsize=14, fontweight='bold')
-            ax_top5.tick_params(colors='white')
-            ax_top5.invert_yaxis()
-            
-            for i, (idx, row) in enumerate(top_ec2_data.iterrows()):
-                ax_top5.text(row["CostUSD"] + 0.01, i, f"${row['CostUSD']:.3f}\nCPU: {row['CPUUtilization']:.1f}%", 
-                            color='white', va='center', fontsize=9, fontweight='bold')
-            
-            ax_top5.grid(axis='x', alpha=0.3, color='gray')
-            plt.tight_layout()
-            st.pyplot(fig_top5)
-            plt.savefig("top_5_expensive_instances.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-            plt.close()
+            show_chart("top_5_expensive_instances.png", charts.top_instances_bars, top_ec2_data, ec2_chart_signature)
     
     with col_analysis2:
         st.markdown("### 📊 Average Cost by Region")
-        avg_cost = ec2_filtered.groupby("Region")["CostUSD"].mean().sort_values(ascending=False)
+        with profiler.stage("ec2:avg_cost_by_region"):
+            avg_cost = ec2_filtered.avg_cost_by_region()
         avg_cost_df = avg_cost.to_frame(name="Avg Cost (USD)")
         st.dataframe(avg_cost_df, width='stretch')
 
-with tab3:
+if active_section == "📦 S3 Analysis":
     st.markdown('<div class="section-header">S3 Storage Analysis</div>', unsafe_allow_html=True)
     
     col3, col4 = st.columns(2)
     
     with col3:
-        s3_region = s3_filtered.groupby("Region")["TotalSizeGB"].sum().sort_values(ascending=False)
-        fig4, ax4 = plt.subplots(facecolor='#0E1117')
-        ax4.set_facecolor('#0E1117')
-        bars = ax4.barh(range(len(s3_region)), s3_region.values, color='#45B7D1')
-        ax4.set_yticks(range(len(s3_region)))
-        ax4.set_yticklabels(s3_region.index, color='white')
-        ax4.set_title("Total S3 Storage by Region", color='white', fontsize=14, fontweight='bold')
-        ax4.set_xlabel("Total Size (GB)", color='white')
-        ax4.tick_params(colors='white')
-        ax4.invert_yaxis()
-        st.pyplot(fig4)
-        plt.savefig("s3_storage_by_region.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-        plt.close()
+        with profiler.stage("s3:storage_by_region"):
+            s3_region = s3_filtered.storage_by_region()
+        show_chart("s3_storage_by_region.png", charts.s3_storage_by_region_bars, s3_region, s3_chart_signature)
     
     with col4:
-        fig5, ax5 = plt.subplots(facecolor='#0E1117')
-        ax5.set_facecolor('#0E1117')
-        scatter2 = ax5.scatter(s3_filtered["TotalSizeGB"], s3_filtered["CostUSD"], 
-                              c=s3_filtered["CostUSD"], cmap='plasma', alpha=0.7, s=120)
-        ax5.set_title("S3 Cost vs Storage", color='white', fontsize=14, fontweight='bold')
-        ax5.set_xlabel("Total Size (GB)", color='white')
-        ax5.set_ylabel("Cost (USD)", color='white')
-        ax5.tick_params(colors='white')
-        plt.colorbar(scatter2, ax=ax5, label='Cost (USD)')
-        st.pyplot(fig5)
-        plt.savefig("s3_cost_vs_storage.png", dpi=150, bbox_inches='tight', facecolor='#0E1117')
-        plt.close()
+        with profiler.stage("s3:chart_data") as stage:
+            s3_points = s3_filtered.frame(["TotalSizeGB", "CostUSD"])
+            stage.rows = lambda: len(s3_points)
+        show_chart("s3_cost_vs_storage.png", charts.s3_cost_vs_storage_scatter, (s3_points["TotalSizeGB"], s3_points["CostUSD"]),
+                   s3_chart_signature, **scatter_params)
+    
+    if s3_price_table is not None:
+        st.markdown("---")
+        st.markdown("### 🧊 Lifecycle Tiering What-If")
+        with profiler.stage("s3:tiering") as stage:
+            s3_tiering_rows = s3_filtered.frame(S3_TAB_COLUMNS["tiering"])
+            today = date.today().isoformat()
+            simulator = s3_filtered.cached(
+                ("tiering", file_signature(price_table_path), today),
+                lambda: tiering.TieringSimulator(s3_tiering_rows, s3_price_table, today),
+            )
+            simulation = simulator.simulate(tiering_policy)
+            tiering_summary = tiering.summarize(simulation)
+            stage.rows = lambda: len(simulator)
+        st.caption("Monthly storage at list prices from the local price table; bucket age (CreationDate) stands in "
+                   "for object age, and each move pays one transition request per object.")
+        tier_col1, tier_col2, tier_col3, tier_col4 = st.columns(4)
+        tier_col1.metric("Buckets Moved", f"{tiering_summary['buckets_moved']:,}")
+        tier_col2.metric(
+            "Monthly Savings",
+            f"${tiering_summary['monthly_savings']:,.2f}",
+            f"${tiering_summary['projected_monthly']:,.2f} projected",
+            delta_color="off"
+        )
+        tier_col3.metric("One-off Transition Cost", f"${tiering_summary['transition_cost']:,.2f}")
+        payback = tiering_summary["payback_months"]
+        tier_col4.metric("Payback", "—" if payback is None else f"{payback:.1f} months")
+        if tiering_summary["buckets_moved"] > 0:
+            money = {
+                "MonthlySavingsUSD": st.column_config.NumberColumn("Savings / month", format="$%.2f"),
+                "TransitionCostUSD": st.column_config.NumberColumn("Transition cost", format="$%.2f"),
+                "TotalSizeGB": st.column_config.NumberColumn("Size (GB)", format="%.1f"),
+            }
+            move_col1, move_col2 = st.columns(2)
+            with move_col1:
+                st.markdown("**By transition**")
+                st.dataframe(tiering.transition_table(s3_tiering_rows, simulation), width='stretch',
+                             hide_index=True, column_config=money)
+            with move_col2:
+                st.markdown("**Top buckets by savings**")
+                st.dataframe(tiering.bucket_table(s3_tiering_rows, simulation, n=10), width='stretch',
+                             hide_index=True, column_config=money)
     
     st.markdown("---")
     
@@ -425,32 +720,105 @@ with tab3:
     
     with col_s3_1:
         st.markdown("### 🗂️ Top 5 Largest Buckets")
-        top_s3 = s3_filtered.nlargest(5, "TotalSizeGB")[["BucketName", "Region", "TotalSizeGB", "CostUSD"]]
+        with profiler.stage("s3:top_buckets"):
+            top_s3 = s3_filtered.top_buckets()
         top_s3 = top_s3.rename(columns={"BucketName": "Bucket Name", "TotalSizeGB": "Size (GB)", 
                                         "CostUSD": "Cost (USD)"})
         st.dataframe(top_s3, width='stretch', hide_index=True)
     
     with col_s3_2:
         st.markdown("### 📍 Total Storage by Region")
-        total_storage = s3_filtered.groupby("Region")["TotalSizeGB"].sum().sort_values(ascending=False)
+        total_storage = s3_filtered.storage_by_region()
         total_storage_df = total_storage.to_frame(name="Total Size (GB)")
         st.dataframe(total_storage_df, width='stretch')
 
-with tab4:
+if active_section == "🎯 Insights":
     st.markdown('<div class="section-header">Key Insights & Recommendations</div>', unsafe_allow_html=True)
     
+    if instance_catalog is not None:
+        with profiler.stage("insights:rightsizing") as stage:
+            ec2_rightsizing_rows = ec2_filtered.frame(COMPUTE_TAB_COLUMNS["insights"])
+            recommendations = ec2_filtered.cached(
+                ("rightsize", file_signature(catalog_path), target_utilization, cross_family),
+                lambda: rightsizing.rightsize(
+                    ec2_rightsizing_rows, instance_catalog, target_utilization / 100, same_family=not cross_family
+                ),
+            )
+            stage.rows = lambda: len(ec2_rightsizing_rows)
+        export_rightsize = functools.partial(rightsizing.rightsize, catalog=instance_catalog,
+                                             target_utilization=target_utilization / 100,
+                                             same_family=not cross_family)
+    else:
+        recommendations = None
+        export_rightsize = None
+    with profiler.stage("insights:summary"):
+        insights = ec2_filtered.ec2_insights(recommendations)
+    
+    with profiler.stage("insights:anomalies") as stage:
+        history_path = BASE_DIR / DEFAULT_DB_NAME
+        history_dates = tuple(HistoryStore(history_path).snapshot_dates()) if history_path.exists() else ()
+        if compute_paths and s3_paths:
+            current_snapshot = max(snapshot_date_for(p) for p in compute_paths).isoformat()
+        else:
+            current_snapshot = date.today().isoformat()
+        ec2_history = s3_history = None
+        if history_dates:
+            ec2_history = load_cost_history(str(history_path), history_dates, "EC2", current_snapshot, anomalies.BASELINE_WINDOW)
+            s3_history = load_cost_history(str(history_path), history_dates, "S3", current_snapshot, anomalies.BASELINE_WINDOW)
+        ec2_anomaly_rows = ec2_filtered.frame(COMPUTE_TAB_COLUMNS["insights"])
+        s3_anomaly_rows = s3_filtered.frame(S3_TAB_COLUMNS["insights"])
+        ec2_anomalies = ec2_filtered.cached(
+            ("anomalies", history_dates, current_snapshot),
+            lambda: anomalies.score(ec2_anomaly_rows, anomalies.EC2_GROUPS, "ResourceId", ec2_history),
+        )
+        s3_anomalies = s3_filtered.cached(
+            ("anomalies", history_dates, current_snapshot),
+            lambda: anomalies.score(s3_anomaly_rows, anomalies.S3_GROUPS, "BucketName", s3_history),
+        )
+        ec2_anomaly_table = anomalies.anomaly_table(
+            ec2_anomaly_rows, ec2_anomalies, ["Account", "ResourceId", "Region", "InstanceType", "CostUSD"]
+        )
+        s3_anomaly_table = anomalies.anomaly_table(
+            s3_anomaly_rows, s3_anomalies, ["Account", "BucketName", "Region", "StorageClass", "CostUSD"]
+        )
+        stage.rows = lambda: len(ec2_anomaly_rows) + len(s3_anomaly_rows)
+    
+    with profiler.stage("insights:forecast") as stage:
+        ec2_forecast_history = s3_forecast_history = None
+        if history_dates:
+            ec2_forecast_history = load_cost_history(str(history_path), history_dates, "EC2", current_snapshot, forecast.HISTORY_WINDOW)
+            s3_forecast_history = load_cost_history(str(history_path), history_dates, "S3", current_snapshot, forecast.HISTORY_WINDOW)
+        ec2_forecast_rows = ec2_filtered.frame(COMPUTE_TAB_COLUMNS["forecast"])
+        s3_forecast_rows = s3_filtered.frame(S3_TAB_COLUMNS["forecast"])
+        ec2_forecasts = ec2_filtered.cached(
+            ("forecast", history_dates, current_snapshot),
+            lambda: forecast.forecast_groups(ec2_forecast_rows, forecast.EC2_GROUPS, "ResourceId", ec2_forecast_history,
+                                             current_snapshot, workers=forecast.forecast_workers()),
+        )
+        s3_forecasts = s3_filtered.cached(
+            ("forecast", history_dates, current_snapshot),
+            lambda: forecast.forecast_groups(s3_forecast_rows, forecast.S3_GROUPS, "BucketName", s3_forecast_history,
+                                             current_snapshot, workers=forecast.forecast_workers()),
+        )
+        ec2_region_forecast = forecast.rollup(ec2_forecasts, "Region")
+        stage.rows = lambda: len(ec2_forecasts) + len(s3_forecasts)
+    forecast_horizon = forecast.HORIZONS[-1]
+    
+    if insights["savings_source"] == "rightsizing":
+        underutilized_caption = f"Can move to a cheaper type at {target_utilization}% target utilization"
+    else:
+        underutilized_caption = "Low CPU (<30%) but high cost"
+    
     insight_col1, insight_col2, insight_col3 = st.columns(3)
     
     with insight_col1:
         if len(ec2_filtered) > 0:
-            low_cpu_high_cost = ec2_filtered[(ec2_filtered["CPUUtilization"] < 30) & (ec2_filtered["CostUSD"] > ec2_filtered["CostUSD"].median())]
-            potential_savings = low_cpu_high_cost["CostUSD"].sum() if len(low_cpu_high_cost) > 0 else 0.0
             st.markdown(f"""
             <div class="insight-box">
                 <h3 style="margin-top:0; color: white;">⚠️ Underutilized Instances</h3>
-                <h2 style="color: white;">{len(low_cpu_high_cost)}</h2>
-                <p style="margin-bottom:0; color: white;">Low CPU (<30%) but high cost</p>
-                <p style="margin-bottom:0; color: white;">Potential savings: ${potential_savings:.2f}</p>
+                <h2 style="color: white;">{insights["underutilized_count"]}</h2>
+                <p style="margin-bottom:0; color: white;">{underutilized_caption}</p>
+                <p style="margin-bottom:0; color: white;">Potential savings: ${insights["potential_savings"]:.2f}</p>
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -463,11 +831,10 @@ with tab4:
     
     with insight_col2:
         if len(ec2_filtered) > 0:
-            stopped_instances = len(ec2_filtered[ec2_filtered["State"] == "stopped"])
             st.markdown(f"""
             <div class="insight-box" style="background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);">
                 <h3 style="margin-top:0; color: white;">🛑 Stopped Instances</h3>
-                <h2 style="color: white;">{stopped_instances}</h2>
+                <h2 style="color: white;">{insights["stopped_count"]}</h2>
                 <p style="margin-bottom:0; color: white;">Consider terminating if unused</p>
             </div>
             """, unsafe_allow_html=True)
@@ -481,13 +848,21 @@ with tab4:
     
     with insight_col3:
         if len(ec2_filtered) > 0:
-            expensive_regions = ec2_filtered.groupby("Region")["CostUSD"].sum().sort_values(ascending=False).head(1)
-            if len(expensive_regions) > 0:
+            if insights["highest_cost_region"] is not None:
+                region_projection = ""
+                if insights["highest_cost_region"] in ec2_region_forecast.index:
+                    projected = ec2_region_forecast.loc[insights["highest_cost_region"]]
+                    region_projection = (
+                        f'<p style="margin-bottom:0; color: white;">{forecast_horizon}-day projection: '
+                        f'${projected[f"Forecast{forecast_horizon}dUSD"]:.2f} '
+                        f'(${projected[f"Lower{forecast_horizon}dUSD"]:.2f}–${projected[f"Upper{forecast_horizon}dUSD"]:.2f})</p>'
+                    )
                 st.markdown(f"""
                 <div class="insight-box" style="background: linear-gradient(135deg, #30cfd0 0%, #330867 100%);">
                     <h3 style="margin-top:0; color: white;">🌍 Highest Cost Region</h3>
-                    <h2 style="color: white;">{expensive_regions.index[0]}</h2>
-                    <p style="margin-bottom:0; color: white;">${expensive_regions.values[0]:.2f} total</p>
+                    <h2 style="color: white;">{insights["highest_cost_region"]}</h2>
+                    <p style="margin-bottom:0; color: white;">${insights["highest_cost_region_total"]:.2f} total</p>
+                    {region_projection}
                 </div>
                 """, unsafe_allow_html=True)
             else:
@@ -537,6 +912,127 @@ with tab4:
         </div>
         """, unsafe_allow_html=True)
     
+    if recommendations is not None:
+        st.markdown("---")
+        st.markdown("### 📐 Rightsizing Recommendations")
+        st.dataframe(
+            rightsizing.recommendation_table(ec2_rightsizing_rows, recommendations, n=20),
+            width='stretch',
+            hide_index=True,
+            column_config={"CostUSD": st.column_config.NumberColumn("Cost (USD)", format="$%.2f"),
+                           "ProjectedCostUSD": st.column_config.NumberColumn("Projected (USD)", format="$%.2f"),
+                           "SavingsUSD": st.column_config.NumberColumn("Savings (USD)", format="$%.2f")}
+        )
+    
+    st.markdown("---")
+    st.markdown("### 🚨 Cost Anomalies")
+    if history_dates:
+        st.caption(
+            f"Robust z-score above {anomalies.ANOMALY_THRESHOLD} against each resource's last "
+            f"{anomalies.BASELINE_WINDOW} snapshots in the history store, or its Region × type/class peers "
+            f"when it has fewer than {anomalies.MIN_SNAPSHOTS}."
+        )
+    else:
+        st.caption(
+            f"Robust z-score (median/MAD) above {anomalies.ANOMALY_THRESHOLD} within each Region × instance "
+            "type or storage class. Add exports to the history store to score resources against their own history."
+        )
+    anomaly_config = {
+        "CostUSD": st.column_config.NumberColumn("Cost (USD)", format="$%.2f"),
+        "BaselineCostUSD": st.column_config.NumberColumn("Baseline (USD)", format="$%.2f"),
+        "DeviationUSD": st.column_config.NumberColumn("Deviation (USD)", format="$%.2f"),
+        "AnomalyScore": st.column_config.NumberColumn("Score", format="%.1f"),
+        "BaselineSource": st.column_config.TextColumn("Baseline"),
+    }
+    anomaly_col1, anomaly_col2 = st.columns(2)
+    
+    with anomaly_col1:
+        st.markdown(f"**EC2: {len(ec2_anomaly_table):,} flagged**")
+        if len(ec2_anomaly_table) > 0:
+            st.dataframe(ec2_anomaly_table.head(20), width='stretch', hide_index=True, column_config=anomaly_config)
+    
+    with anomaly_col2:
+        st.markdown(f"**S3: {len(s3_anomaly_table):,} flagged**")
+        if len(s3_anomaly_table) > 0:
+            st.dataframe(s3_anomaly_table.head(20), width='stretch', hide_index=True, column_config=anomaly_config)
+    
+    st.markdown("---")
+    st.markdown("### 📈 30/60/90-Day Cost Forecast")
+    st.caption(
+        f"Linear trend per Region × instance type or storage class with {forecast.INTERVAL_LEVEL:.0%} prediction "
+        f"intervals, fitted on the last {forecast.HISTORY_WINDOW} history-store snapshots where a group has at least "
+        f"{forecast.MIN_HISTORY_POINTS}, otherwise on fleet growth by CreationDate over the last "
+        f"{forecast.CREATION_LOOKBACK_DAYS} days. The CreationDate basis only sees resources that still exist, so it "
+        "never shows decline and tends to overstate growth; ingest snapshots into the history store for a real trend."
+    )
+    forecast_config = {
+        "CurrentUSD": st.column_config.NumberColumn("Current (USD)", format="$%.2f"),
+        "TrendUSDPerDay": st.column_config.NumberColumn("Trend (USD/day)", format="$%.4f"),
+        **{f"Forecast{h}dUSD": st.column_config.NumberColumn(f"{h}d (USD)", format="$%.2f") for h in forecast.HORIZONS},
+        f"Lower{forecast_horizon}dUSD": st.column_config.NumberColumn(f"{forecast_horizon}d low (USD)", format="$%.2f"),
+        f"Upper{forecast_horizon}dUSD": st.column_config.NumberColumn(f"{forecast_horizon}d high (USD)", format="$%.2f"),
+    }
+    forecast_col1, forecast_col2 = st.columns(2)
+    
+    for column, service, forecasts in ((forecast_col1, "EC2", ec2_forecasts), (forecast_col2, "S3", s3_forecasts)):
+        with column:
+            st.markdown(f"**{service}**")
+            if len(forecasts) == 0:
+                st.info("No data to forecast. Adjust filters.")
+                continue
+            totals = forecast.rollup(forecasts).iloc[0]
+            metric_cols = st.columns(len(forecast.HORIZONS))
+            for metric_col, h in zip(metric_cols, forecast.HORIZONS):
+                metric_col.metric(
+                    f"In {h} days",
+                    f"${totals[f'Forecast{h}dUSD']:,.2f}",
+                    delta=f"{totals[f'Forecast{h}dUSD'] - totals['CurrentUSD']:+,.2f}",
+                    delta_color="inverse",
+                    help=f"{forecast.INTERVAL_LEVEL:.0%} interval: ${totals[f'Lower{h}dUSD']:,.2f}–${totals[f'Upper{h}dUSD']:,.2f}",
+                )
+            shown = [*forecasts.columns[:2], "Basis", "CurrentUSD", "TrendUSDPerDay",
+                     *(f"Forecast{h}dUSD" for h in forecast.HORIZONS),
+                     f"Lower{forecast_horizon}dUSD", f"Upper{forecast_horizon}dUSD"]
+            st.dataframe(
+                forecasts.nlargest(20, f"Forecast{forecast_horizon}dUSD")[shown],
+                width='stretch',
+                hide_index=True,
+                column_config=forecast_config,
+            )
+    
+    st.markdown("---")
+    st.markdown("### 🏷️ Cost Allocation by Tag")
+    
+    allocation_keys = sorted(set(ec2_filtered.tag_keys()) | set(s3_filtered.tag_keys()))
+    if allocation_keys:
+        allocation_key = st.selectbox("Group costs by tag", options=allocation_keys, key="allocation_tag")
+        with profiler.stage("insights:cost_by_tag"):
+            ec2_tag_costs = ec2_filtered.cost_by_tag(allocation_key)
+            s3_tag_costs = s3_filtered.cost_by_tag(allocation_key)
+        tag_col1, tag_col2 = st.columns(2)
+        
+        with tag_col1:
+            st.markdown(f"**EC2 cost by {allocation_key}**")
+            st.dataframe(
+                ec2_tag_costs,
+                width='stretch',
+                hide_index=True,
+                column_config={"Total": st.column_config.NumberColumn("Cost (USD)", format="$%.2f"),
+                               "Share": st.column_config.NumberColumn("Share", format="percent")}
+            )
+        
+        with tag_col2:
+            st.markdown(f"**S3 cost by {allocation_key}**")
+            st.dataframe(
+                s3_tag_costs,
+                width='stretch',
+                hide_index=True,
+                column_config={"Total": st.column_config.NumberColumn("Cost (USD)", format="$%.2f"),
+                               "Share": st.column_config.NumberColumn("Share", format="percent")}
+            )
+    else:
+        st.info("No Tags column found in the loaded data.")
+    
     st.markdown("---")
     st.markdown("### 📥 Export Analysis Results")
     
@@ -544,8 +1040,9 @@ with tab4:
     
     with col_d1:
         if len(ec2_filtered) > 0:
-            top_ec2_export = ec2_filtered.nlargest(5, "CostUSD")[["ResourceId", "Region", "CostUSD"]]
-            ec2_csv = top_ec2_export.to_csv(index=False).encode('utf-8')
+            with profiler.stage("insights:export_csv:ec2"):
+                top_ec2_export = ec2_filtered.top_instances(columns=["ResourceId", "Region", "CostUSD"])
+                ec2_csv = top_ec2_export.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="💾 Download Top EC2 Instances (CSV)",
                 data=ec2_csv,
@@ -555,11 +1052,20 @@ with tab4:
             )
         else:
             st.info("No EC2 data to export. Adjust filters.")
+        if len(ec2_anomaly_table) > 0:
+            st.download_button(
+                label="💾 Download EC2 Cost Anomalies (CSV)",
+                data=ec2_anomaly_table.to_csv(index=False).encode('utf-8'),
+                file_name="ec2_cost_anomalies.csv",
+                mime="text/csv",
+                width='stretch'
+            )
     
     with col_d2:
         if len(s3_filtered) > 0:
-            top_s3_export = s3_filtered.nlargest(5, "TotalSizeGB")[["BucketName", "Region", "TotalSizeGB"]]
-            s3_csv = top_s3_export.to_csv(index=False).encode('utf-8')
+            with profiler.stage("insights:export_csv:s3"):
+                top_s3_export = s3_filtered.top_buckets(columns=["BucketName", "Region", "TotalSizeGB"])
+                s3_csv = top_s3_export.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="💾 Download Top S3 Buckets (CSV)",
                 data=s3_csv,
@@ -569,11 +1075,160 @@ with tab4:
             )
         else:
             st.info("No S3 data to export. Adjust filters.")
+        if len(s3_anomaly_table) > 0:
+            st.download_button(
+                label="💾 Download S3 Cost Anomalies (CSV)",
+                data=s3_anomaly_table.to_csv(index=False).encode('utf-8'),
+                file_name="s3_cost_anomalies.csv",
+                mime="text/csv",
+                width='stretch'
+            )
+
+    st.markdown("#### Full filtered data")
+    st.caption("Every filtered row with all export columns; EC2 rows also get the Underutilized and Stopped flags "
+               "counted in the cards above. Files are written in chunks when the button is clicked.")
+    export_formats = {"csv.gz": "CSV.gz", "parquet": "Parquet"}
+    if not snapshot_supported():
+        del export_formats["parquet"]
+    col_f1, col_f2 = st.columns(2)
+    
+    with col_f1:
+        if len(ec2_filtered) > 0:
+            for file_format, format_label in export_formats.items():
+                st.download_button(
+                    label=f"💾 Download All Filtered EC2 ({format_label})",
+                    data=downloads.deferred(
+                        lambda selection=ec2_filtered: downloads.ec2_export_chunks(selection, rightsize=export_rightsize),
+                        file_format,
+                    ),
+                    file_name=f"ec2_filtered.{file_format}",
+                    mime=downloads.FORMATS[file_format],
+                    on_click="ignore",
+                    width='stretch'
+                )
+    
+    with col_f2:
+        if len(s3_filtered) > 0:
+            for file_format, format_label in export_formats.items():
+                st.download_button(
+                    label=f"💾 Download All Filtered S3 ({format_label})",
+                    data=downloads.deferred(lambda selection=s3_filtered: downloads.s3_export_chunks(selection), file_format),
+                    file_name=f"s3_filtered.{file_format}",
+                    mime=downloads.FORMATS[file_format],
+                    on_click="ignore",
+                    width='stretch'
+                )
+
+if active_section == "📅 Cost Trends":
+    st.markdown('<div class="section-header">Cost Trends Across Snapshots</div>', unsafe_allow_html=True)
+    
+    history_path = BASE_DIR / DEFAULT_DB_NAME
+    
+    if compute_paths and s3_paths:
+        if st.button("➕ Add current export to history", key="ingest_history"):
+            store = HistoryStore(history_path)
+            written = {
+                "EC2": sum(store.ingest_file(p, "EC2") for p in compute_paths),
+                "S3": sum(store.ingest_file(p, "S3") for p in s3_paths),
+            }
+            if any(written.values()):
+                st.success(f"✅ Ingested {', '.join(f'{rows:,} {service} rows' for service, rows in written.items() if rows)}")
+            else:
+                st.info("Current export is already in the history store.")
+    
+    history_store = HistoryStore(history_path) if history_path.exists() else None
+    snapshot_dates = history_store.snapshot_dates() if history_store is not None else []
+    if len(snapshot_dates) == 0:
+        st.info("""
+        **No history yet.** Ingest each daily export to build trends:
+        
+        `python -m finops.history ingest path/to/export-2025-01-31 --db history.sqlite`
+        """)
+    else:
+        st.caption(f"{len(snapshot_dates)} snapshots from {snapshot_dates[0]} to {snapshot_dates[-1]}")
+        
+        trend_col1, trend_col2, trend_col3 = st.columns(3)
+        with trend_col1:
+            trend_freq = st.radio("Period", ["day", "week", "month"], index=2, horizontal=True, key="trend_freq")
+        with trend_col2:
+            trend_by = st.radio("Group by", ["region", "service"], horizontal=True, key="trend_by")
+        with trend_col3:
+            trend_service = st.selectbox("Service", ["All", "EC2", "S3"], key="trend_service")
+        service_filter = None if trend_service == "All" else trend_service
+        
+        with profiler.stage("trends:query"):
+            cost_trend = history_store.cost_trend(trend_freq, trend_by, service_filter)
+            cost_changes = history_store.month_over_month(trend_by, service_filter)
+        st.markdown(f"### 📈 Cost per {trend_freq.capitalize()}")
+        st.caption(f"Average cost of the snapshots taken in each {trend_freq}, so periods with more snapshots "
+                   "are not inflated.")
+        st.line_chart(cost_trend)
+        
+        st.markdown("### 📊 Month-over-Month Change")
+        st.dataframe(
+            cost_changes,
+            width='stretch',
+            hide_index=True,
+            column_config={
+                "Period": st.column_config.DateColumn("Month", format="YYYY-MM"),
+                "Cost": st.column_config.NumberColumn("Cost (USD)", format="$%.2f"),
+                "Previous": st.column_config.NumberColumn("Previous (USD)", format="$%.2f"),
+                "Delta": st.column_config.NumberColumn("Change (USD)", format="$%.2f"),
+                "PctChange": st.column_config.NumberColumn("Change", format="percent"),
+            }
+        )
+
+export_signature = (ec2_chart_signature, s3_chart_signature, tuple(sorted(scatter_params.items())))
+if chart_exporter is not None and chart_exporter.exported != export_signature:
+    # Export covers every dashboard chart, not just the ones in the visible section, so
+    # it only runs when the data, filters or chart parameters changed since the last one.
+    with profiler.stage("export:queue_charts"):
+        for filename, draw, data, params in charts.dashboard_charts(
+            ec2_filtered.frame(["ResourceId", "Region", "CostUSD", "CPUUtilization"]),
+            s3_filtered.frame(["Region", "TotalSizeGB", "CostUSD"]),
+            **scatter_params
+        ):
+            chart_exporter.export(filename, draw, data, (ec2_chart_signature, s3_chart_signature), **params)
+    chart_exporter.exported = export_signature
 
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 15px; color: white;">
     <h3 style="color: white; margin: 0;">✅ Analysis Complete!</h3>
-    <p style="color: white; margin: 0.5rem 0 0 0;">All visualizations have been saved as PNG files</p>
+    <p style="color: white; margin: 0.5rem 0 0 0;">{}</p>
 </div>
-""", unsafe_allow_html=True)
+""".format(
+    f"Charts are being saved as PNG files to {chart_exporter.output_dir.relative_to(BASE_DIR)}"
+    if chart_exporter is not None
+    else "Enable Chart Export in the sidebar to save visualizations as PNG files"
+), unsafe_allow_html=True)
+
+if profiler.enabled:
+    profiler.context.update(section=active_section, backend=backend.name)
+    _, profile_path = profile_setting()
+    if profile_path is not None:
+        profiler.write_jsonl(profile_path)
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### 🐞 Debug: Stage Timings")
+        st.caption(f"Run `{profiler.run_id}` · {profiler.total_seconds() * 1000:.1f} ms in {len(profiler.records)} stages")
+        st.dataframe(
+            profiler.frame(),
+            width='stretch',
+            hide_index=True,
+            column_config={
+                "ms": st.column_config.NumberColumn("Time (ms)", format="%.1f"),
+                "rss_delta_mib": st.column_config.NumberColumn("RSS Δ (MiB)", format="%.1f"),
+            }
+        )
+        shared_datasets = get_dataset_registry().stats()
+        if shared_datasets:
+            st.markdown("**Shared datasets** (one copy per process)")
+            shared_frame = pd.DataFrame(shared_datasets)
+            shared_frame["bytes"] = shared_frame["bytes"] / 2**20
+            st.dataframe(
+                shared_frame.rename(columns={"bytes": "mib"}),
+                width='stretch',
+                hide_index=True,
+                column_config={"mib": st.column_config.NumberColumn("Memory (MiB)", format="%.1f")}
+            )
@@ -0,0 +1,6 @@
+"""
+FinOps analysis helpers for the AWS Cloud Economics EDA Dashboard.
+
+Everything in this package is plain pandas/NumPy so it can be imported from
+batch jobs and notebooks without pulling in Streamlit.
+"""
@@ -0,0 +1,116 @@
+"""
+Dashboard computations as plain functions over the compute and S3 frames.
+
+The Streamlit dashboard and the headless batch report (finops.report) both
+call these, so the numbers in a nightly report match what analysts see
+interactively. Nothing here imports Streamlit or Matplotlib.
+"""
+
+TOP_EC2_COLUMNS = ["ResourceId", "Region", "CostUSD", "CPUUtilization"]
+TOP_S3_COLUMNS = ["BucketName", "Region", "TotalSizeGB", "CostUSD"]
+
+UNDERUTILIZED_CPU_THRESHOLD = 30
+
+
+def top_instances(ec2, n=5, columns=TOP_EC2_COLUMNS):
+    return ec2.nlargest(n, "CostUSD")[columns]
+
+
+def top_buckets(s3, n=5, columns=TOP_S3_COLUMNS):
+    return s3.nlargest(n, "TotalSizeGB")[columns]
+
+
+def avg_cost_by_region(ec2):
+    return ec2.groupby("Region", observed=True)["CostUSD"].mean().sort_values(ascending=False)
+
+
+def cost_by_region(df):
+    return df.groupby("Region", observed=True)["CostUSD"].sum().sort_values(ascending=False)
+
+
+def storage_by_region(s3):
+    return s3.groupby("Region", observed=True)["TotalSizeGB"].sum().sort_values(ascending=False)
+
+
+def underutilized_mask(ec2, cpu_threshold=UNDERUTILIZED_CPU_THRESHOLD, median_cost=None):
+    """Low CPU but above-median cost.
+
+    The median is taken over `ec2` unless `median_cost` is given, e.g. when
+    flagging one chunk of a larger selection.
+    """
+    if median_cost is None:
+        median_cost = ec2["CostUSD"].median()
+    return (ec2["CPUUtilization"] < cpu_threshold) & (ec2["CostUSD"] > median_cost)
+
+
+def underutilized_instances(ec2, cpu_threshold=UNDERUTILIZED_CPU_THRESHOLD):
+    return ec2[underutilized_mask(ec2, cpu_threshold)]
+
+
+def stopped_mask(ec2):
+    return ec2["State"] == "stopped"
+
+
+def with_insight_flags(ec2, median_cost=None, cpu_threshold=UNDERUTILIZED_CPU_THRESHOLD, recommendations=None):
+    """ec2 with boolean Underutilized and Stopped columns appended.
+
+    As in ec2_insights(), rightsizing `recommendations` aligned with ec2
+    decide Underutilized when given; otherwise the heuristic does.
+    """
+    if recommendations is not None:
+        underutilized = recommendations["RecommendedType"].notna()
+    else:
+        underutilized = underutilized_mask(ec2, cpu_threshold, median_cost)
+    return ec2.assign(
+        Underutilized=underutilized.fillna(False).astype(bool),
+        Stopped=stopped_mask(ec2).fillna(False).astype(bool),
+    )
+
+
+def highest_cost_region(ec2):
+    """(region, total cost) of the most expensive region, or None if there is no data."""
+    totals = cost_by_region(ec2)
+    if len(totals) == 0:
+        return None
+    return totals.index[0], float(totals.iloc[0])
+
+
+def ec2_insights(ec2, recommendations=None):
+    """Headline numbers shown on the Insights tab.
+
+    When rightsizing `recommendations` (see finops.rightsizing) are given,
+    the underutilized count and savings come from them; otherwise the
+    low-CPU/above-median-cost heuristic is used.
+    """
+    if recommendations is not None:
+        underutilized_count = int(recommendations["RecommendedType"].notna().sum())
+        potential_savings = float(recommendations["SavingsUSD"].sum())
+        savings_source = "rightsizing"
+    else:
+        underutilized = underutilized_instances(ec2)
+        underutilized_count = int(len(underutilized))
+        potential_savings = float(underutilized["CostUSD"].sum())
+        savings_source = "heuristic"
+    region = highest_cost_region(ec2)
+    return {
+        "underutilized_count": underutilized_count,
+        "potential_savings": potential_savings,
+        "savings_source": savings_source,
+        "stopped_count": int(stopped_mask(ec2).sum()),
+        "highest_cost_region": region[0] if region else None,
+        "highest_cost_region_total": region[1] if region else 0.0,
+    }
+
+
+def summarize(ec2, s3, recommendations=None):
+    """Everything the batch report writes for one account, as plain data."""
+    return {
+        "ec2_records": int(len(ec2)),
+        "s3_records": int(len(s3)),
+        "total_ec2_cost": float(ec2["CostUSD"].sum()),
+        "total_s3_cost": float(s3["CostUSD"].sum()),
+        "avg_ec2_cost": float(ec2["CostUSD"].mean()) if len(ec2) > 0 else 0.0,
+        "total_s3_storage_gb": float(s3["TotalSizeGB"].sum()) if len(s3) > 0 else 0.0,
+        "insights": ec2_insights(ec2, recommendations),
+    }
+
@@ -0,0 +1,155 @@
+"""
+Cost anomaly detection with robust baselines.
+
+Each resource's CostUSD is compared with a baseline and scored as a robust
+z-score, (cost - median) / (1.4826 * MAD), so a handful of extreme costs
+cannot drag the baseline towards themselves the way a mean and standard
+deviation would. Resources scoring above ANOMALY_THRESHOLD in either
+direction are flagged.
+
+Two baselines are available:
+
+- peer group: the median/MAD of every resource in the same group
+  (Region x InstanceType for EC2, Region x StorageClass for S3), computed
+  with groupby transforms in one pass over the rows.
+- history: when the history store (finops.history) holds at least
+  MIN_SNAPSHOTS earlier snapshots of a resource, its own median/MAD over the
+  last BASELINE_WINDOW snapshots. Resources are matched on Account and ID
+  when both the export and the store have accounts, since accounts may
+  reuse IDs. Resources without enough history fall back to their peer group.
+
+When most costs in a baseline are identical the MAD is 0, so the scale
+falls back to 1.2533 * mean absolute deviation. The scale is also floored at
+MIN_RELATIVE_SIGMA of the baseline, so a resource billed exactly the same
+every day is flagged for a real jump but not for a cent of rounding.
+"""
+
+import numpy as np
+import pandas as pd
+
+from finops.history import resource_index, resource_keys
+
+ANOMALY_THRESHOLD = 3.5
+MIN_GROUP_SIZE = 5
+MIN_SNAPSHOTS = 3
+BASELINE_WINDOW = 7
+MIN_RELATIVE_SIGMA = 0.05
+
+EC2_GROUPS = ["Region", "InstanceType"]
+S3_GROUPS = ["Region", "StorageClass"]
+
+# Scale factors that make MAD and mean absolute deviation estimate a normal sigma.
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+
+ANOMALY_COLUMNS = ["BaselineCostUSD", "DeviationUSD", "AnomalyScore", "BaselineSource", "IsAnomaly"]
+
+
+def _robust_sigma(baseline, mad, mean_ad):
+    sigma = np.where(mad > 0, MAD_SCALE * mad, MEAN_AD_SCALE * mean_ad)
+    sigma = np.maximum(sigma, MIN_RELATIVE_SIGMA * np.abs(baseline))
+    return np.where(sigma > 0, sigma, np.nan)
+
+
+def group_baselines(df, groups, value="CostUSD", min_group_size=MIN_GROUP_SIZE):
+    """Per-row (Baseline, Sigma) from the row's peer group, aligned with df.index.
+
+    Rows in groups smaller than `min_group_size`, or with a missing group
+    key, get NaN.
+    """
+    values = df[value].astype("float64")
+    keys = [df[column] for column in groups]
+    median = values.groupby(keys, observed=True, dropna=True).transform("median")
+    deviation = (values - median).abs().groupby(keys, observed=True, dropna=True)
+    size = values.groupby(keys, observed=True, dropna=True).transform("count")
+    sigma = _robust_sigma(median.to_numpy(), deviation.transform("median").to_numpy(),
+                          deviation.transform("mean").to_numpy())
+    enough = (size >= min_group_size).to_numpy()
+    return pd.DataFrame({
+        "Baseline": median.where(enough),
+        "Sigma": np.where(enough & median.notna().to_numpy(), sigma, np.nan),
+    }, index=df.index)
+
+
+def history_baselines(history, key, value="CostUSD", min_snapshots=MIN_SNAPSHOTS):
+    """Per-resource (Baseline, Sigma, Snapshots) from a long frame of past costs.
+
+    `history` has one row per (resource, snapshot), as returned by
+    HistoryStore.resource_costs(); resources are named by the `key` column
+    or list of columns, which index the result. Resources with fewer than
+    `min_snapshots` costs are dropped.
+    """
+    keys = [key] if isinstance(key, str) else list(key)
+    history = history[history[value].notna()]
+    values = history[value].astype("float64")
+    resource = [history[column] for column in keys]
+    grouped = values.groupby(resource, sort=False)
+    median = grouped.transform("median")
+    deviation = (values - median).abs().groupby(resource, sort=False)
+    baselines = pd.DataFrame({
+        "Baseline": grouped.median(),
+        "MAD": deviation.median(),
+        "MeanAD": deviation.mean(),
+        "Snapshots": grouped.size(),
+    })
+    baselines = baselines[baselines["Snapshots"] >= min_snapshots]
+    baselines["Sigma"] = _robust_sigma(baselines["Baseline"].to_numpy(), baselines["MAD"].to_numpy(),
+                                       baselines["MeanAD"].to_numpy())
+    return baselines[["Baseline", "Sigma", "Snapshots"]]
+
+
+def score(df, groups, key=None, history=None, value="CostUSD", threshold=ANOMALY_THRESHOLD,
+          min_group_size=MIN_GROUP_SIZE, min_snapshots=MIN_SNAPSHOTS):
+    """ANOMALY_COLUMNS for every row of `df`, aligned with df.index.
+
+    With a `history` frame (and the `key` column naming resources in both
+    frames, together with Account when both have one), resources with
+    enough snapshots are scored against their own history and the rest
+    against their peer group.
+    """
+    baseline = group_baselines(df, groups, value, min_group_size)
+    source = pd.Series(np.where(baseline["Baseline"].notna(), "peer group", None), index=df.index, dtype=object)
+    if history is not None and key is not None and not history.empty:
+        keys = resource_keys(df, history, key)
+        own = history_baselines(history, keys, value, min_snapshots)
+        matched = own.reindex(resource_index(df, keys))
+        has_history = matched["Baseline"].notna().to_numpy()
+        baseline.loc[has_history, "Baseline"] = matched["Baseline"].to_numpy()[has_history]
+        baseline.loc[has_history, "Sigma"] = matched["Sigma"].to_numpy()[has_history]
+        source[has_history] = "history"
+
+    cost = df[value].astype("float64")
+    deviation = cost - baseline["Baseline"]
+    z = deviation / baseline["Sigma"]
+    # Sigma is only missing for an all-zero baseline; a zero cost there is normal.
+    z = z.mask(baseline["Sigma"].isna() & (deviation == 0), 0.0)
+    return pd.DataFrame({
+        "BaselineCostUSD": baseline["Baseline"],
+        "DeviationUSD": deviation,
+        "AnomalyScore": z,
+        "BaselineSource": source.astype("category"),
+        "IsAnomaly": (z.abs() > threshold).fillna(False).astype(bool),
+    }, index=df.index)
+
+
+def anomaly_table(df, scores, columns, n=None):
+    """Flagged rows with `columns` and their scores, most anomalous first."""
+    flagged = scores[scores["IsAnomaly"]]
+    table = df.loc[flagged.index, [c for c in columns if c in df.columns]].join(
+        flagged.drop(columns="IsAnomaly")
+    )
+    order = table["AnomalyScore"].abs().sort_values(ascending=False, kind="stable").index
+    table = table.loc[order]
+    return table if n is None else table.head(n)
+
+
+def summary(scores):
+    """Counts of flagged resources (above and below baseline) and their excess cost."""
+    flagged = scores[scores["IsAnomaly"]]
+    above = flagged["DeviationUSD"] > 0
+    return {
+        "anomaly_count": int(len(flagged)),
+        "above_baseline": int(above.sum()),
+        "below_baseline": int((~above).sum()),
+        "excess_cost": float(flagged.loc[above, "DeviationUSD"].sum()),
+    }
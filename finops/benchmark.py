@@ -0,0 +1,326 @@
+"""
+Benchmark the dashboard's hot paths on synthetic data at several sizes.
+
+    python -m finops.benchmark run --sizes 10000 100000 1000000 --output bench/current.json
+    python -m finops.benchmark compare bench/baseline.json bench/current.json [--threshold 1.25]
+
+`run` generates (once, under --data-dir) a synthetic compute export of each
+size plus an S3 export a tenth of that size (see finops.synthetic), then
+replays what one dashboard rerun does against every query backend:
+
+- load: open the exports, parse tags and build the filter index
+- filter: select a fixed subset of regions and states
+- clean: keep the rows the default cleaning rules keep (see finops.quality)
+- aggregations: data-quality profiles, top-N tables, per-region groupings and
+  cost allocation for every tag key
+- insights: the Insights numbers, rightsizing recommendations, cost
+  anomalies and 30/60/90-day forecasts
+- tiering: building the S3 lifecycle simulator and evaluating one policy
+- charts: render every dashboard chart to PNG
+
+Each size/backend pair is run --repeat times from a cold start; the JSON
+output keeps the median and minimum seconds per stage along with library
+versions, so a run before and after an upgrade can be compared. `compare`
+prints a markdown table of the two runs and exits with status 1 when any
+stage got slower than --threshold times its baseline.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from finops import anomalies, forecast, quality, query, rightsizing, synthetic, tiering
+from finops.filter_index import COMPUTE_FILTER_COLUMNS, S3_FILTER_COLUMNS
+from finops.loader import (COMPUTE_DTYPES, COMPUTE_STEM, COMPUTE_TAB_COLUMNS, S3_DTYPES, S3_STEM, S3_TAB_COLUMNS,
+                           find_dataset, load_compute, load_s3, tab_columns)
+from finops.profiling import Profiler
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_DATA_DIR = Path("bench") / "data"
+DEFAULT_THRESHOLD = 1.25
+# Stages faster than this are too noisy to call a regression on their own.
+DEFAULT_MIN_SECONDS = 0.01
+DEFAULT_CATALOG = Path(__file__).resolve().parent.parent / rightsizing.CATALOG_FILENAME
+DEFAULT_PRICE_TABLE = Path(__file__).resolve().parent.parent / tiering.PRICE_TABLE_FILENAME
+
+EC2_COLUMNS = tab_columns(COMPUTE_TAB_COLUMNS, "filters", "ec2", "insights", "forecast", "tags")
+S3_COLUMNS = tab_columns(S3_TAB_COLUMNS, "filters", "s3", "insights", "tiering", "forecast", "tags")
+
+KEY_COLUMNS = ["backend", "size", "stage"]
+
+
+def prepare_dataset(data_dir, size, seed=0, file_format="csv"):
+    """Paths of the synthetic exports for `size`, generating them on first use."""
+    directory = Path(data_dir) / f"{file_format}-{size}-{seed}"
+    compute_path = find_dataset(directory, COMPUTE_STEM)
+    s3_path = find_dataset(directory, S3_STEM)
+    if compute_path is None or s3_path is None:
+        compute_path, s3_path = synthetic.write_dataset(directory, size, max(size // 10, 1), seed=seed,
+                                                        file_format=file_format)
+    return compute_path, s3_path
+
+
+def open_backend(name, compute_path, s3_path):
+    """A query backend over the exports, built the way the dashboard builds it."""
+    if name == "duckdb":
+        return query.DuckDBBackend(str(compute_path), str(s3_path), quality.cleaning_rules())
+    rules = quality.cleaning_rules()
+    return query.PandasBackend(
+        query.PandasDataset.projected(load_compute(compute_path), EC2_COLUMNS, COMPUTE_FILTER_COLUMNS,
+                                      rules["compute"], COMPUTE_DTYPES),
+        query.PandasDataset.projected(load_s3(s3_path), S3_COLUMNS, S3_FILTER_COLUMNS, rules["s3"], S3_DTYPES),
+    )
+
+
+def benchmark_filters(dataset, column, keep=0.5):
+    """A filter keeping the first `keep` share of `column`'s options (at least one)."""
+    options = dataset.options(column)
+    return {column: options[:max(1, int(len(options) * keep))]}
+
+
+def run_once(profiler, backend_name, compute_path, s3_path, catalog=None, price_table=None, render_charts=True):
+    """One cold pass over every benchmarked stage, recorded on `profiler`."""
+    with profiler.stage("load") as stage:
+        backend = open_backend(backend_name, compute_path, s3_path)
+        stage.rows = len(backend.ec2) + len(backend.s3)
+
+    with profiler.stage("filter") as stage:
+        ec2_selection = backend.ec2.select({**benchmark_filters(backend.ec2, "Region"),
+                                            "State": ["running", "stopped"]})
+        s3_selection = backend.s3.select(benchmark_filters(backend.s3, "Region"))
+        stage.rows = len(ec2_selection) + len(s3_selection)
+
+    with profiler.stage("clean") as stage:
+        ec2 = ec2_selection.complete()
+        s3 = s3_selection.complete()
+        stage.rows = len(ec2) + len(s3)
+
+    with profiler.stage("overview"):
+        ec2_selection.profile()
+        s3_selection.profile()
+        ec2_selection.cleaning_report()
+        s3_selection.cleaning_report()
+
+    with profiler.stage("aggregate:top_n"):
+        ec2.top_instances()
+        s3.top_buckets()
+
+    with profiler.stage("aggregate:by_region"):
+        ec2.avg_cost_by_region()
+        ec2.cost_by_region()
+        s3.storage_by_region()
+
+    with profiler.stage("aggregate:cost_by_tag") as stage:
+        for selection in (ec2, s3):
+            for key in selection.tag_keys():
+                selection.cost_by_tag(key)
+        stage.rows = len(ec2.tag_keys()) + len(s3.tag_keys())
+
+    recommendations = None
+    if catalog is not None:
+        with profiler.stage("insights:rightsizing") as stage:
+            rows = ec2.frame(COMPUTE_TAB_COLUMNS["insights"])
+            recommendations = rightsizing.rightsize(rows, catalog)
+            stage.rows = len(rows)
+
+    with profiler.stage("insights"):
+        ec2.ec2_insights(recommendations)
+
+    with profiler.stage("insights:anomalies") as stage:
+        ec2_rows = ec2.frame(COMPUTE_TAB_COLUMNS["insights"])
+        s3_rows = s3.frame(S3_TAB_COLUMNS["insights"])
+        anomalies.score(ec2_rows, anomalies.EC2_GROUPS)
+        anomalies.score(s3_rows, anomalies.S3_GROUPS)
+        stage.rows = len(ec2_rows) + len(s3_rows)
+
+    with profiler.stage("insights:forecast") as stage:
+        ec2_rows = ec2.frame(COMPUTE_TAB_COLUMNS["forecast"])
+        s3_rows = s3.frame(S3_TAB_COLUMNS["forecast"])
+        forecast.forecast_groups(ec2_rows, forecast.EC2_GROUPS, workers=forecast.forecast_workers())
+        forecast.forecast_groups(s3_rows, forecast.S3_GROUPS, workers=forecast.forecast_workers())
+        stage.rows = len(ec2_rows) + len(s3_rows)
+
+    if price_table is not None:
+        with profiler.stage("tiering:build") as stage:
+            simulator = tiering.TieringSimulator(s3.frame(S3_TAB_COLUMNS["tiering"]), price_table)
+            stage.rows = len(simulator)
+        with profiler.stage("tiering:simulate"):
+            tiering.summarize(simulator.simulate(tiering.DEFAULT_POLICY))
+
+    if render_charts:
+        from finops import charts
+
+        with profiler.stage("chart:data"):
+            specs = charts.dashboard_charts(ec2.frame(["ResourceId", "Region", "CostUSD", "CPUUtilization"]),
+                                            s3.frame(["Region", "TotalSizeGB", "CostUSD"]))
+        for filename, draw, data, params in specs:
+            with profiler.stage(f"chart:{Path(filename).stem}"):
+                charts.render_chart(draw, data, **params)
+
+
+def summarize(records):
+    """Median/min seconds, rows and RSS delta per backend, size and stage."""
+    grouped = pd.DataFrame(records).groupby(KEY_COLUMNS, sort=False)
+    summary = pd.DataFrame({
+        "seconds": grouped["seconds"].median(),
+        "min_seconds": grouped["seconds"].min(),
+        "rows": grouped["rows"].max(),
+        "rss_delta_mib": grouped["rss_delta_bytes"].median() / 2**20,
+    }).reset_index()
+    return summary.astype({"rows": "Int64"})
+
+
+def environment():
+    import matplotlib
+
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                "matplotlib": matplotlib.__version__}
+    for module in ("pyarrow", "duckdb"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return {"platform": platform.platform(), "machine": platform.machine(), "versions": versions}
+
+
+def run(sizes=DEFAULT_SIZES, backends=None, data_dir=DEFAULT_DATA_DIR, repeat=3, seed=0, file_format="csv",
+        catalog_path=DEFAULT_CATALOG, price_table_path=DEFAULT_PRICE_TABLE, render_charts=True, log=print):
+    """Benchmark every size and backend; returns {"meta": ..., "results": [...]}."""
+    if backends is None:
+        backends = [name for name in query.BACKENDS if name != "duckdb" or query.duckdb_supported()]
+    catalog = None
+    if catalog_path is not None and Path(catalog_path).exists():
+        catalog = rightsizing.load_catalog(catalog_path)
+    price_table = None
+    if price_table_path is not None and Path(price_table_path).exists():
+        price_table = tiering.load_price_table(price_table_path)
+    if render_charts:
+        from finops import charts
+
+        charts.apply_theme()
+
+    records = []
+    for size in sizes:
+        log(f"preparing {size:,} rows...")
+        compute_path, s3_path = prepare_dataset(data_dir, size, seed, file_format)
+        for backend_name in backends:
+            elapsed = 0.0
+            for _ in range(repeat):
+                profiler = Profiler(enabled=True)
+                run_once(profiler, backend_name, compute_path, s3_path, catalog, price_table, render_charts)
+                records.extend({**record, "backend": backend_name, "size": size} for record in profiler.records)
+                elapsed += profiler.total_seconds()
+            log(f"  {backend_name}: {elapsed / repeat:.2f}s per run")
+
+    meta = {"timestamp": time.time(), "seed": seed, "format": file_format, "repeat": repeat, **environment()}
+    results = summarize(records).astype(object).where(lambda df: df.notna(), None)
+    return {"meta": meta, "results": results.to_dict(orient="records")}
+
+
+def read_results(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """Per-stage baseline vs current seconds, with a `regressed` flag.
+
+    A stage regresses when it is more than `threshold` times slower and the
+    slowdown exceeds `min_seconds`.
+    """
+    columns = KEY_COLUMNS + ["seconds"]
+    merged = pd.merge(
+        pd.DataFrame(baseline["results"], columns=columns),
+        pd.DataFrame(current["results"], columns=columns),
+        on=KEY_COLUMNS, how="outer", suffixes=("_baseline", "_current"), sort=False,
+    )
+    merged["ratio"] = merged["seconds_current"] / merged["seconds_baseline"]
+    merged["regressed"] = ((merged["ratio"] > threshold)
+                           & (merged["seconds_current"] - merged["seconds_baseline"] > min_seconds))
+    return merged
+
+
+def _version_changes(baseline, current):
+    before = baseline.get("meta", {}).get("versions", {})
+    after = current.get("meta", {}).get("versions", {})
+    return {name: (before.get(name), after.get(name)) for name in sorted(set(before) | set(after))
+            if before.get(name) != after.get(name)}
+
+
+def comparison_report(baseline, current, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """Markdown report of compare(); regressions are marked and listed first."""
+    table = compare(baseline, current, threshold, min_seconds)
+    regressions = int(table["regressed"].sum())
+    lines = ["# Benchmark comparison", ""]
+    changes = _version_changes(baseline, current)
+    if changes:
+        lines.append("Library versions: " + ", ".join(f"{name} {old} → {new}" for name, (old, new) in changes.items()))
+        lines.append("")
+    lines.append(f"{regressions} regression(s) over {threshold:.2f}x (ignoring changes under {min_seconds * 1000:.0f} ms).")
+    lines.extend(["", "| backend | rows | stage | baseline (s) | current (s) | ratio | |", "|---|---:|---|---:|---:|---:|---|"])
+
+    def seconds(value):
+        return "—" if pd.isna(value) else f"{value:.4f}"
+
+    ordered = table.sort_values("regressed", ascending=False, kind="stable")
+    for row in ordered.itertuples(index=False):
+        ratio = "—" if pd.isna(row.ratio) else f"{row.ratio:.2f}x"
+        flag = "⚠️ regression" if row.regressed else ""
+        lines.append(f"| {row.backend} | {row.size:,} | {row.stage} | {seconds(row.seconds_baseline)} "
+                     f"| {seconds(row.seconds_current)} | {ratio} | {flag} |")
+    return "\n".join(lines) + "\n", regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's hot paths on synthetic data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmark and write a results JSON file")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="Compute rows per dataset (S3 gets a tenth as many)")
+    run_parser.add_argument("--backend", nargs="+", choices=query.BACKENDS, default=None,
+                            help="Query backends to run (default: every installed backend)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Cold runs per size and backend (default: 3)")
+    run_parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR),
+                            help="Where synthetic exports are generated and reused")
+    run_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--no-charts", action="store_true", help="Skip chart rendering")
+    run_parser.add_argument("--output", default="bench/results.json")
+
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Slowdown ratio counted as a regression (default: 1.25)")
+    compare_parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS,
+                                help="Ignore slowdowns smaller than this many seconds (default: 0.01)")
+    compare_parser.add_argument("--report", default=None, help="Also write the markdown report to this file")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.sizes, args.backend, args.data_dir, args.repeat, args.seed, args.format,
+                      render_charts=not args.no_charts)
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as fh:
+            json.dump(results, fh, indent=2, default=str)
+        print(f"Wrote {len(results['results'])} stage timings to {output}")
+        return 0
+
+    report, regressions = comparison_report(read_results(args.baseline), read_results(args.current),
+                                            args.threshold, args.min_seconds)
+    print(report)
+    if args.report:
+        Path(args.report).write_text(report)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Chart rendering for the dashboard, with an LRU cache of rendered PNGs.
+
+Figures are built with the object-oriented Matplotlib API (no pyplot state),
+so they can be rendered from Streamlit's script threads or a batch job. Each
+chart is keyed on its parameters plus a `signature` of where its data came
+from (the dashboard passes the loaded files and the filter selection), so
+a rerun with unchanged inputs finds the cached PNG bytes without reading
+the data at all. Without a signature the key falls back to a hash of the
+input data.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import seaborn as sns  # noqa: E402
+from matplotlib.colors import LogNorm  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from finops import analysis  # noqa: E402
+
+BACKGROUND = "#0E1117"
+EXPORT_DPI = 150
+
+# Scatter plots switch to a binned density view above this many points;
+# points above OUTLIER_PERCENTILE of cost are still drawn individually.
+DENSITY_THRESHOLD = 50_000
+DENSITY_BINS = 200
+OUTLIER_PERCENTILE = 99.0
+
+
+def apply_theme():
+    """Dark theme shared by the dashboard and the exported PNGs."""
+    sns.set_style("darkgrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['figure.facecolor'] = BACKGROUND
+    plt.rcParams['axes.facecolor'] = BACKGROUND
+    plt.rcParams['axes.labelcolor'] = 'white'
+    plt.rcParams['text.color'] = 'white'
+    plt.rcParams['xtick.color'] = 'white'
+    plt.rcParams['ytick.color'] = 'white'
+
+
+class FigureCache:
+    """Thread-safe LRU mapping of chart keys to rendered PNG bytes."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        png = self.get(key)
+        if png is None:
+            with self._lock:
+                self.misses += 1
+            png = render()
+            self.put(key, png)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def data_fingerprint(data):
+    """Stable digest of a Series/DataFrame (values, labels and dtypes) or a tuple of them."""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in data if isinstance(data, tuple) else (data,):
+        if isinstance(item, pd.DataFrame):
+            digest.update(repr(list(item.columns)).encode())
+            digest.update(repr(item.dtypes.astype(str).tolist()).encode())
+            digest.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+        elif isinstance(item, pd.Series):
+            digest.update(repr((item.name, str(item.dtype))).encode())
+            digest.update(pd.util.hash_pandas_object(item, index=True).to_numpy().tobytes())
+        else:
+            digest.update(repr(item).encode())
+    return digest.hexdigest()
+
+
+def chart_key(name, data, params, signature=None):
+    """Cache key of a chart: `signature` when given, else a fingerprint of `data`."""
+    source = ("signature", signature) if signature is not None else data_fingerprint(data)
+    return name, source, tuple(sorted(params.items()))
+
+
+def figure_to_png(fig, dpi=EXPORT_DPI):
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches='tight', facecolor=BACKGROUND)
+    return buffer.getvalue()
+
+
+def render_chart(draw, data, cache=None, signature=None, **params):
+    """Return PNG bytes for `draw(*data, **params)`, served from `cache` when possible.
+
+    `signature` is any hashable value that changes whenever `data` would;
+    see chart_key().
+    """
+    args = data if isinstance(data, tuple) else (data,)
+
+    def render():
+        return figure_to_png(draw(*args, **params))
+
+    if cache is None:
+        return render()
+    return cache.get_or_render(chart_key(draw.__name__, data, params, signature), render)
+
+
+def _new_axes(figsize=None):
+    fig = Figure(figsize=figsize, facecolor=BACKGROUND)
+    ax = fig.subplots()
+    ax.set_facecolor(BACKGROUND)
+    return fig, ax
+
+
+def cpu_histogram(cpu, bins=20, kde=True):
+    fig, ax = _new_axes()
+    sns.histplot(cpu, bins=bins, kde=kde, ax=ax, color='#4ECDC4')
+    ax.set_title("CPU Utilization Distribution", color='white', fontsize=14, fontweight='bold')
+    ax.set_xlabel("CPU Utilization (%)", color='white')
+    ax.set_ylabel("Frequency", color='white')
+    ax.tick_params(colors='white')
+    return fig
+
+
+def cost_boxplot(cost):
+    fig, ax = _new_axes()
+    sns.boxplot(y=cost, ax=ax, color='#FF6B6B')
+    ax.set_title("EC2 Cost Distribution (Outliers)", color='white', fontsize=14, fontweight='bold')
+    ax.set_ylabel("Cost (USD)", color='white')
+    ax.tick_params(colors='white')
+    return fig
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    """2D histogram of the finite (x, y) pairs: (counts, x_edges, y_edges)."""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    finite = np.isfinite(x) & np.isfinite(y)
+    return np.histogram2d(x[finite], y[finite], bins=bins)
+
+
+def _density_scatter(fig, ax, x, y, cmap, bins, outlier_percentile):
+    counts, x_edges, y_edges = density_grid(x, y, bins)
+    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap=cmap, norm=LogNorm())
+    fig.colorbar(mesh, ax=ax, label='Resources per cell')
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    cutoff = np.nanpercentile(y, outlier_percentile)
+    outliers = y > cutoff
+    ax.scatter(x[outliers], y[outliers], color='#FF6B6B', edgecolors='white', linewidths=0.3, s=14,
+               label=f"Cost above p{outlier_percentile:g} (${cutoff:,.2f})")
+    ax.legend(loc='upper right', facecolor=BACKGROUND, labelcolor='white')
+
+
+def cpu_vs_cost_scatter(cpu, cost, density_threshold=DENSITY_THRESHOLD, bins=DENSITY_BINS,
+                        outlier_percentile=OUTLIER_PERCENTILE):
+    fig, ax = _new_axes()
+    if len(cost) > density_threshold:
+        _density_scatter(fig, ax, cpu, cost, 'viridis', bins, outlier_percentile)
+    else:
+        scatter = ax.scatter(cpu, cost, c=cost, cmap='viridis', alpha=0.6, s=100)
+        fig.colorbar(scatter, ax=ax, label='Cost (USD)')
+    ax.set_title("CPU Utilization vs Cost Relationship", color='white', fontsize=16, fontweight='bold')
+    ax.set_xlabel("CPU Utilization (%)", color='white', fontsize=12)
+    ax.set_ylabel("Cost (USD)", color='white', fontsize=12)
+    ax.tick_params(colors='white')
+    return fig
+
+
+def top_instances_bars(top_ec2_data):
+    fig, ax = _new_axes(figsize=(10, 6))
+
+    x_pos = range(len(top_ec2_data))
+    ax.barh(x_pos, top_ec2_data["CostUSD"].values, color='#FF6B6B', alpha=0.8)
+
+    ax.set_yticks(x_pos)
+    ax.set_yticklabels([f"{row['ResourceId']}\n({row['Region']})" for _, row in top_ec2_data.iterrows()],
+                       color='white', fontsize=10)
+    ax.set_xlabel("Cost (USD)", color='white', fontsize=12, fontweight='bold')
+    ax.set_title("Top 5 Most Expensive EC2 Instances", color='white', fontsize=14, fontweight='bold')
+    ax.tick_params(colors='white')
+    ax.invert_yaxis()
+
+    for i, (idx, row) in enumerate(top_ec2_data.iterrows()):
+        ax.text(row["CostUSD"] + 0.01, i, f"${row['CostUSD']:.3f}\nCPU: {row['CPUUtilization']:.1f}%",
+                color='white', va='center', fontsize=9, fontweight='bold')
+
+    ax.grid(axis='x', alpha=0.3, color='gray')
+    fig.tight_layout()
+    return fig
+
+
+def s3_storage_by_region_bars(s3_region):
+    fig, ax = _new_axes()
+    ax.barh(range(len(s3_region)), s3_region.values, color='#45B7D1')
+    ax.set_yticks(range(len(s3_region)))
+    ax.set_yticklabels(s3_region.index, color='white')
+    ax.set_title("Total S3 Storage by Region", color='white', fontsize=14, fontweight='bold')
+    ax.set_xlabel("Total Size (GB)", color='white')
+    ax.tick_params(colors='white')
+    ax.invert_yaxis()
+    return fig
+
+
+def s3_cost_vs_storage_scatter(size, cost, density_threshold=DENSITY_THRESHOLD, bins=DENSITY_BINS,
+                               outlier_percentile=OUTLIER_PERCENTILE):
+    fig, ax = _new_axes()
+    if len(cost) > density_threshold:
+        _density_scatter(fig, ax, size, cost, 'plasma', bins, outlier_percentile)
+    else:
+        scatter = ax.scatter(size, cost, c=cost, cmap='plasma', alpha=0.7, s=120)
+        fig.colorbar(scatter, ax=ax, label='Cost (USD)')
+    ax.set_title("S3 Cost vs Storage", color='white', fontsize=14, fontweight='bold')
+    ax.set_xlabel("Total Size (GB)", color='white')
+    ax.set_ylabel("Cost (USD)", color='white')
+    ax.tick_params(colors='white')
+    return fig
+
+
+def dashboard_charts(ec2, s3, density_threshold=DENSITY_THRESHOLD, outlier_percentile=OUTLIER_PERCENTILE):
+    """(filename, draw, data, params) for every chart the dashboard exports."""
+    scatter_params = {"density_threshold": density_threshold, "outlier_percentile": outlier_percentile}
+    specs = [
+        ("cpu_utilization_distribution.png", cpu_histogram, ec2["CPUUtilization"], {"bins": 20, "kde": True}),
+        ("ec2_cost_outliers.png", cost_boxplot, ec2["CostUSD"], {}),
+        ("cpu_vs_cost.png", cpu_vs_cost_scatter, (ec2["CPUUtilization"], ec2["CostUSD"]), scatter_params),
+    ]
+    top_ec2 = analysis.top_instances(ec2)
+    if len(top_ec2) > 0:
+        specs.append(("top_5_expensive_instances.png", top_instances_bars, top_ec2, {}))
+    specs.extend([
+        ("s3_storage_by_region.png", s3_storage_by_region_bars, analysis.storage_by_region(s3), {}),
+        ("s3_cost_vs_storage.png", s3_cost_vs_storage_scatter, (s3["TotalSizeGB"], s3["CostUSD"]), scatter_params),
+    ])
+    return specs
@@ -0,0 +1,147 @@
+"""
+Streaming full exports of filtered results as gzip-compressed CSV or Parquet.
+
+A selection's rows are read in chunks (iter_full() on either query backend)
+and every chunk is encoded and compressed as it arrives, so the only thing
+that grows with the export is the compressed output, never a full frame
+plus its rendered CSV text. The writers are generators of bytes:
+
+    for block in iter_csv_gz(ec2_export_chunks(selection)):
+        sink.write(block)
+
+spool() drains one into a temporary file that stays in memory up to
+SPOOL_MAX_MEMORY and moves to disk past that, ready to hand to a download.
+EC2 exports carry the Insights tab's Underutilized and Stopped flags (see
+finops.analysis.with_insight_flags). Underutilized comes from the same
+source as the Insights card: rightsizing recommendations when a catalog is
+loaded (computed chunk by chunk, as they depend only on each row), else the
+low-CPU heuristic with the median cost taken over the whole selection
+rather than per chunk.
+"""
+
+import tempfile
+import zlib
+
+from finops import analysis
+from finops.loader import DEFAULT_CHUNKSIZE
+
+SPOOL_MAX_MEMORY = 64 * 2**20
+CSV_GZ_LEVEL = 6
+
+FORMATS = {
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def ec2_export_chunks(selection, chunksize=DEFAULT_CHUNKSIZE, rightsize=None):
+    """Chunks of the selection's full EC2 rows with insight flag columns.
+
+    `rightsize` maps a chunk to its rightsizing recommendations, e.g.
+    functools.partial(rightsizing.rightsize, catalog=catalog); without it
+    Underutilized uses the heuristic.
+    """
+    if rightsize is not None:
+        for chunk in selection.iter_full(chunksize):
+            yield analysis.with_insight_flags(chunk, recommendations=rightsize(chunk))
+        return
+    median_cost = selection.median("CostUSD")
+    for chunk in selection.iter_full(chunksize):
+        yield analysis.with_insight_flags(chunk, median_cost)
+
+
+def s3_export_chunks(selection, chunksize=DEFAULT_CHUNKSIZE):
+    """Chunks of the selection's full S3 rows."""
+    yield from selection.iter_full(chunksize)
+
+
+def iter_csv_gz(chunks, level=CSV_GZ_LEVEL):
+    """Gzip-compressed CSV bytes for frames `chunks`, header from the first."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 16 + 15: gzip framing
+    header = True
+    for chunk in chunks:
+        block = compressor.compress(chunk.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+        if block:
+            yield block
+    yield compressor.flush()
+
+
+class _Blocks:
+    """Write-only file object that hands written bytes back in blocks."""
+
+    def __init__(self):
+        self._blocks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._blocks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        blocks, self._blocks = self._blocks, []
+        return b"".join(blocks)
+
+
+def _arrow_schema(table):
+    import pyarrow as pa
+
+    # Chunks may encode a categorical with narrower or wider dictionary
+    # indices, so every dictionary column is written with int32 indices.
+    return pa.schema([
+        field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ])
+
+
+def iter_parquet(chunks, compression="zstd"):
+    """Parquet file bytes for frames `chunks`, one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Blocks()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, _arrow_schema(table), compression=compression)
+        writer.write_table(table.cast(writer.schema))
+        block = sink.drain()
+        if block:
+            yield block
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+WRITERS = {"csv.gz": iter_csv_gz, "parquet": iter_parquet}
+
+
+def spool(blocks, max_memory=SPOOL_MAX_MEMORY):
+    """Drain byte `blocks` into a temporary file, rewound for reading."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    for block in blocks:
+        spooled.write(block)
+    spooled.seek(0)
+    return spooled
+
+
+def deferred(chunks, file_format):
+    """Zero-argument callable producing the export, for a download on click.
+
+    `chunks` is a zero-argument callable returning the frames to write, so
+    nothing is read or encoded until the download is requested.
+    """
+    return lambda: spool(WRITERS[file_format](chunks()))
@@ -0,0 +1,80 @@
+"""
+Background export of dashboard charts to PNG files.
+
+Exports are opt-in and run on a thread pool, so rendering the dashboard never
+waits on disk. Each ChartExporter writes into its own directory (one per
+Streamlit session or batch run) and remembers the data/parameter key of the
+last file it wrote for every chart, so unchanged charts are not regenerated.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from finops import charts
+
+
+class ChartExporter:
+    """Write charts into `output_dir` using `executor`, skipping unchanged ones."""
+
+    def __init__(self, output_dir, executor, cache=None):
+        self.output_dir = Path(output_dir)
+        self.executor = executor
+        self.cache = cache
+        # Signature of the data behind the last full export (see aws_eda);
+        # an unchanged signature means every chart is already queued.
+        self.exported = None
+        self._keys = {}
+        self._futures = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def export(self, filename, draw, data, signature=None, **params):
+        """Queue `draw(*data, **params)` for writing to `filename`.
+
+        `signature` identifies the data as for charts.render_chart().
+        Returns the Future for the write, or None if the file already holds
+        this exact chart.
+        """
+        key = charts.chart_key(draw.__name__, data, params, signature)
+        with self._lock:
+            if self._keys.get(filename) == key:
+                return None
+            self._keys[filename] = key
+            future = self.executor.submit(self._write, filename, key, draw, data, signature, params)
+            self._futures[filename] = future
+        return future
+
+    def _write(self, filename, key, draw, data, signature, params):
+        try:
+            png = charts.render_chart(draw, data, self.cache, signature, **params)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            target = self.output_dir / filename
+            tmp_target = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+            tmp_target.write_bytes(png)
+            os.replace(tmp_target, target)
+        except Exception as exc:
+            with self._lock:
+                # Forget the key so the next rerun retries this chart.
+                if self._keys.get(filename) == key:
+                    del self._keys[filename]
+                self._errors[filename] = exc
+            raise
+        with self._lock:
+            self._errors.pop(filename, None)
+        return target
+
+    def pending(self):
+        with self._lock:
+            return sum(not future.done() for future in self._futures.values())
+
+    def errors(self):
+        with self._lock:
+            return dict(self._errors)
+
+    def wait(self, timeout=None):
+        """Block until every queued export has finished (for batch use)."""
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.exception(timeout=timeout)
@@ -0,0 +1,77 @@
+"""
+Precomputed filter index for the dashboard's sidebar multiselects.
+
+Built once per dataset load: every filterable column is encoded as a compact
+integer code array over its sorted option list. Turning a multiselect
+selection into a row mask is then a lookup-table gather over the codes, and
+masks are memoized per column so changing one filter only recomputes that
+column before the final AND.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+COMPUTE_FILTER_COLUMNS = ["Account", "Region", "InstanceType", "State", "ResourceType"]
+S3_FILTER_COLUMNS = ["Account", "Region", "StorageClass", "Encryption"]
+
+
+class FilterIndex:
+    """Sorted options and integer codes for the filterable columns of a frame."""
+
+    def __init__(self, df, columns, memo_size=16):
+        self.n_rows = len(df)
+        self.columns = [c for c in columns if c in df.columns]
+        self._options = {}
+        self._codes = {}
+        self._lookup = {}
+        self._memo = {}
+        self._memo_size = memo_size
+        for column in self.columns:
+            options = sorted(df[column].dropna().unique())
+            # Missing values get code -1, which indexes the always-False
+            # trailing slot of the lookup table built in column_mask().
+            self._codes[column] = pd.Categorical(df[column], categories=options).codes
+            self._options[column] = options
+            self._lookup[column] = {value: code for code, value in enumerate(options)}
+            self._memo[column] = OrderedDict()
+
+    def options(self, column):
+        """Sorted, non-null values of `column` (empty if the column is absent)."""
+        return list(self._options.get(column, []))
+
+    def column_mask(self, column, selected):
+        """Boolean row mask for `column` restricted to `selected` values."""
+        key = frozenset(selected)
+        memo = self._memo[column]
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+
+        table = np.zeros(len(self._options[column]) + 1, dtype=bool)
+        lookup = self._lookup[column]
+        table[[lookup[value] for value in key if value in lookup]] = True
+        mask = table[self._codes[column]]
+        mask.flags.writeable = False
+
+        memo[key] = mask
+        if len(memo) > self._memo_size:
+            memo.popitem(last=False)
+        return mask
+
+    def mask(self, selections):
+        """AND together the masks for {column: selected values}.
+
+        Empty selections and columns missing from the frame do not filter,
+        matching the dashboard's original `isin(...) if len(...) > 0` logic.
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for column, selected in selections.items():
+            if column in self._codes and len(selected) > 0:
+                mask &= self.column_mask(column, selected)
+        return mask
+
+    def positions(self, selections):
+        """Row positions passing the filters, for use with DataFrame.iloc."""
+        return np.flatnonzero(self.mask(selections))
@@ -0,0 +1,233 @@
+"""
+Batched 30/60/90-day cost forecasts per Region x InstanceType (EC2) and
+Region x StorageClass (S3).
+
+Every group's cost is a short time series, and all of them are fitted at
+once: the series are laid out as rows of a (series x dates) matrix, with NaN
+where a series has no point, and an ordinary least-squares line is fitted
+to every row with a handful of NumPy reductions. Each series' cost is
+projected HORIZONS days past the current export on the fitted line,
+yhat = mean(y) + slope * (h - mean(t)), with the usual OLS prediction
+interval yhat +/- z * s * sqrt(1 + 1/n + (h - mean(t))^2 / Sxx) (s the
+residual standard error, h the horizon day, n the series' points).
+
+A series is built from one of two bases:
+
+- history: the group's total CostUSD in each earlier snapshot of the history
+  store (finops.history), counting only the currently selected resources,
+  plus the current export. Used when the series has at least
+  MIN_HISTORY_POINTS points.
+- creation dates: otherwise, the group's cost as of weekly dates over the
+  last CREATION_LOOKBACK_DAYS, counting each current resource from its
+  CreationDate at today's cost. This reads fleet growth from when resources
+  were launched, but only resources still running are counted (deleted ones
+  are not in the export), so the series never falls and the basis always
+  projects flat or rising cost. Treat it as an upper-leaning estimate until
+  the history store has enough snapshots.
+
+Projections are in the unit of CostUSD (one export's cost for the group)
+and are clipped at zero. Fitting is plain array math, so very large batches
+can be split across a process pool (FINOPS_FORECAST_WORKERS, see
+forecast_workers()).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from finops.history import resource_index, resource_keys
+
+HORIZONS = (30, 60, 90)
+INTERVAL_LEVEL = 0.9
+MIN_HISTORY_POINTS = 3
+HISTORY_WINDOW = 90
+CREATION_LOOKBACK_DAYS = 182
+CREATION_STEP_DAYS = 7
+
+EC2_GROUPS = ["Region", "InstanceType"]
+S3_GROUPS = ["Region", "StorageClass"]
+
+WORKERS_ENV_VAR = "FINOPS_FORECAST_WORKERS"
+# Below this many series a process pool costs more to start than it saves
+# (200k series fit in-process in well under a second).
+PARALLEL_MIN_SERIES = 500_000
+
+
+def forecast_workers():
+    """Worker processes from FINOPS_FORECAST_WORKERS (0 or unset: fit in-process)."""
+    value = os.environ.get(WORKERS_ENV_VAR, "").strip()
+    return int(value) if value else 0
+
+
+def _fit_block(days, values, horizons, z):
+    """Least-squares line per row of `values` over `days`; see fit_series()."""
+    present = ~np.isnan(values)
+    weight = present.astype("float64")
+    y = np.where(present, values, 0.0)
+    t = np.broadcast_to(days, values.shape)
+
+    n = weight.sum(axis=1)
+    safe_n = np.where(n > 0, n, 1.0)
+    t_mean = (weight * t).sum(axis=1) / safe_n
+    y_mean = y.sum(axis=1) / safe_n
+    dt = np.where(present, t - t_mean[:, None], 0.0)
+    sxx = (dt * dt).sum(axis=1)
+    slope = np.where(sxx > 0, (dt * (y - y_mean[:, None])).sum(axis=1) / np.where(sxx > 0, sxx, 1.0), 0.0)
+
+    residual = np.where(present, y - (y_mean[:, None] + slope[:, None] * (t - t_mean[:, None])), 0.0)
+    dof = n - 2
+    s = np.sqrt(np.where(dof > 0, (residual * residual).sum(axis=1) / np.where(dof > 0, dof, 1.0), np.nan))
+
+    offset = np.asarray(horizons, dtype="float64")[None, :] - t_mean[:, None]
+    forecast = y_mean[:, None] + slope[:, None] * offset
+    stderr = s[:, None] * np.sqrt(1.0 + 1.0 / safe_n[:, None] + offset ** 2 / np.where(sxx > 0, sxx, np.inf)[:, None])
+    return {
+        "points": n.astype("int64"),
+        "slope": slope,
+        "forecast": np.maximum(forecast, 0.0),
+        "stderr": stderr,
+        "lower": np.maximum(forecast - z * stderr, 0.0),
+        "upper": np.maximum(forecast + z * stderr, 0.0),
+    }
+
+
+def fit_series(days, values, horizons=HORIZONS, level=INTERVAL_LEVEL, workers=0):
+    """Fit every row of `values` (series x dates, NaN = no point) against `days`.
+
+    `days` holds each column's date as days relative to the current export
+    (so <= 0). Returns arrays: points, slope (USD/day), and forecast,
+    stderr, lower, upper of shape (series, len(horizons)). With `workers`
+    > 1 and at least PARALLEL_MIN_SERIES rows, blocks of rows are fitted in
+    a process pool.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    days = np.asarray(days, dtype="float64")
+    values = np.asarray(values, dtype="float64")
+    if workers <= 1 or len(values) < PARALLEL_MIN_SERIES:
+        return _fit_block(days, values, horizons, z)
+    blocks = np.array_split(values, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        fitted = list(pool.map(_fit_block, [days] * len(blocks), blocks, [horizons] * len(blocks),
+                               [z] * len(blocks)))
+    return {key: np.concatenate([part[key] for part in fitted]) for key in fitted[0]}
+
+
+def creation_series(codes, n_groups, created, cost, as_of,
+                    lookback_days=CREATION_LOOKBACK_DAYS, step_days=CREATION_STEP_DAYS):
+    """(days, values): each group's cost as of weekly dates, counting resources from CreationDate.
+
+    Resources with no CreationDate count from the start; rows with code -1
+    are skipped.
+    """
+    days = -np.arange(0, lookback_days + 1, step_days, dtype="int64")[::-1]
+    age = (as_of - created).dt.days.to_numpy(dtype="float64", na_value=np.inf)
+    # Column of the first grid date on or after each resource's creation.
+    column = np.minimum(np.searchsorted(days, -age, side="left"), len(days) - 1)
+    keep = (codes >= 0) & ~np.isnan(cost)
+    values = np.zeros((n_groups, len(days)))
+    np.add.at(values, (codes[keep], column[keep]), cost[keep])
+    return days, np.cumsum(values, axis=1)
+
+
+def history_series(codes, n_groups, keys, cost, history, key, as_of):
+    """(days, values): each group's cost per history snapshot plus the current export.
+
+    Only resources in `keys` (an index of the current rows, see
+    finops.history.resource_index()) count, mapped to their current group;
+    `key` names the matching history columns. A group has no point (NaN) at
+    a snapshot where none of its resources appear.
+    """
+    current = np.zeros(n_groups)
+    valid = (codes >= 0) & ~np.isnan(cost)
+    np.add.at(current, codes[valid], cost[valid])
+
+    group_of = pd.Series(codes, index=keys)
+    group_of = group_of[~group_of.index.duplicated() & (group_of >= 0)]
+    snapshot = pd.to_datetime(history["snapshot_date"])
+    resource = resource_index(history, [key] if isinstance(key, str) else list(key))
+    keep = (resource.isin(group_of.index) & history["CostUSD"].notna().to_numpy()
+            & (snapshot < as_of).to_numpy())
+    history, snapshot, resource = history[keep], snapshot[keep], resource[keep]
+    dates = np.sort(snapshot.unique())
+    column = np.searchsorted(dates, snapshot.to_numpy())
+    group = group_of.reindex(resource).to_numpy()
+
+    totals = np.zeros((n_groups, len(dates) + 1))
+    present = np.zeros((n_groups, len(dates) + 1), dtype=bool)
+    np.add.at(totals, (group, column), history["CostUSD"].to_numpy(dtype="float64"))
+    present[group, column] = True
+    totals[:, -1] = current
+    present[:, -1] = True
+    days = np.append((pd.DatetimeIndex(dates) - as_of).days.to_numpy(dtype="int64"), 0)
+    return days, np.where(present, totals, np.nan)
+
+
+def forecast_groups(df, groups, key=None, history=None, as_of=None, horizons=HORIZONS,
+                    level=INTERVAL_LEVEL, workers=0, min_history_points=MIN_HISTORY_POINTS):
+    """One row per group of `df` with its current cost, trend and projections.
+
+    `df` needs the `groups` columns, CostUSD and CreationDate (and `key`
+    when a `history` frame from HistoryStore.resource_costs() is given;
+    resources are matched on Account too when both frames have it).
+    Columns: the group keys, Basis, Points, CurrentUSD, TrendUSDPerDay and,
+    for each horizon h, Forecast{h}dUSD, Lower{h}dUSD, Upper{h}dUSD and
+    StdErr{h}dUSD.
+    """
+    as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+    grouped = df.groupby(groups, observed=True, sort=True)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype="int64")
+    index = grouped.size().index
+    n_groups = len(index)
+    cost = df["CostUSD"].to_numpy(dtype="float64", na_value=np.nan)
+    created = pd.to_datetime(df["CreationDate"]) if "CreationDate" in df.columns else pd.Series(pd.NaT, index=df.index)
+
+    days, values = creation_series(codes, n_groups, created, cost, as_of)
+    fit = fit_series(days, values, horizons, level, workers)
+    basis = np.full(n_groups, "creation dates", dtype=object)
+    current = values[:, -1] if n_groups else np.zeros(0)
+
+    if history is not None and key is not None and not history.empty and n_groups:
+        keys = resource_keys(df, history, key)
+        days, values = history_series(codes, n_groups, resource_index(df, keys), cost, history, keys, as_of)
+        use = (~np.isnan(values)).sum(axis=1) >= min_history_points
+        if use.any():
+            own = fit_series(days, values[use], horizons, level, workers)
+            for name, array in own.items():
+                fit[name][use] = array
+            basis[use] = "history"
+
+    frame = index.to_frame(index=False)
+    frame["Basis"] = pd.Categorical(basis)
+    frame["Points"] = fit["points"]
+    frame["CurrentUSD"] = current
+    frame["TrendUSDPerDay"] = fit["slope"]
+    for i, h in enumerate(horizons):
+        frame[f"Forecast{h}dUSD"] = fit["forecast"][:, i]
+        frame[f"Lower{h}dUSD"] = fit["lower"][:, i]
+        frame[f"Upper{h}dUSD"] = fit["upper"][:, i]
+        frame[f"StdErr{h}dUSD"] = fit["stderr"][:, i]
+    return frame
+
+
+def rollup(forecasts, by=None, horizons=HORIZONS, level=INTERVAL_LEVEL):
+    """Sum group forecasts per `by` column (or overall when None).
+
+    Group errors are combined in quadrature, i.e. treated as independent.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    columns = ["CurrentUSD"] + [f"Forecast{h}dUSD" for h in horizons]
+    variance = forecasts[[f"StdErr{h}dUSD" for h in horizons]].fillna(0.0) ** 2
+    variance.columns = [f"Var{h}d" for h in horizons]
+    frame = pd.concat([forecasts[columns], variance], axis=1)
+    if by is None:
+        totals = frame.sum().to_frame().T
+    else:
+        totals = frame.groupby(forecasts[by], observed=True).sum()
+    for h in horizons:
+        stderr = np.sqrt(totals.pop(f"Var{h}d"))
+        totals[f"Lower{h}dUSD"] = (totals[f"Forecast{h}dUSD"] - z * stderr).clip(lower=0.0)
+        totals[f"Upper{h}dUSD"] = totals[f"Forecast{h}dUSD"] + z * stderr
+    return totals
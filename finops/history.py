@@ -0,0 +1,334 @@
+"""
+Local multi-period history store for daily FinOps exports.
+
+Snapshots live in a single SQLite file (standard library, no server). Each
+ingested export is tagged with a snapshot date and an account, and upserted
+on (snapshot_date, Account, ResourceId) / (snapshot_date, Account,
+BucketName), so re-dropping a day's file replaces that day instead of
+duplicating it, while two accounts' exports for the same day both stay.
+Files already ingested (same path, mtime and size) are skipped, so
+ingestion is incremental and never rebuilds history.
+
+The account is the export's Account column when it has one, else --account,
+else the 12-digit AWS account ID in the file's path, else empty.
+
+A small daily rollup (cost per snapshot date, service and region) is kept up
+to date at ingest time; trend queries only touch the rollup, which stays
+interactive over years of history. A period's cost is the average over the
+snapshots taken in it, so a month with more snapshots than the next does
+not look more expensive.
+
+Usage:
+    python -m finops.history ingest EXPORT_DIR_OR_FILE [...] [--db history.sqlite] [--date YYYY-MM-DD]
+                                    [--account NAME]
+    python -m finops.history trend [--db history.sqlite] [--freq month] [--by region]
+"""
+
+import argparse
+import re
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from finops.loader import (
+    COMPUTE_DTYPES,
+    COMPUTE_STEM,
+    DEFAULT_CHUNKSIZE,
+    S3_DTYPES,
+    S3_STEM,
+    file_signature,
+    find_dataset,
+    iter_dataset_chunks,
+)
+from finops.sources import ACCOUNT_COLUMN, account_id_for
+
+DEFAULT_DB_NAME = "history.sqlite"
+
+SERVICES = {
+    "EC2": {
+        "table": "ec2_snapshots",
+        "key": "ResourceId",
+        "dtypes": COMPUTE_DTYPES,
+        "columns": ["ResourceId", "ResourceType", "Region", "InstanceType", "State", "CostUSD",
+                    "CPUUtilization", "MemoryUtilization", "NetworkIn_Bps", "NetworkOut_Bps",
+                    "Tags", "CreationDate"],
+    },
+    "S3": {
+        "table": "s3_snapshots",
+        "key": "BucketName",
+        "dtypes": S3_DTYPES,
+        "columns": ["BucketName", "Region", "StorageClass", "Encryption", "CostUSD", "ObjectCount",
+                    "TotalSizeGB", "VersionEnabled", "Tags", "CreationDate"],
+    },
+}
+
+FILE_STEMS = {COMPUTE_STEM: "EC2", S3_STEM: "S3"}
+
+PERIOD_EXPRESSIONS = {
+    "day": "snapshot_date",
+    "week": "date(snapshot_date, '-6 days', 'weekday 1')",
+    "month": "strftime('%Y-%m-01', snapshot_date)",
+}
+
+_DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def snapshot_date_for(path):
+    """Snapshot date from a YYYY-MM-DD in the file or folder name, else the file's mtime."""
+    path = Path(path)
+    for part in (path.name, path.parent.name):
+        match = _DATE_PATTERN.search(part)
+        if match:
+            return date.fromisoformat(match.group(1))
+    return datetime.fromtimestamp(path.stat().st_mtime).date()
+
+
+class HistoryStore:
+    """SQLite-backed store of per-resource snapshots plus a daily cost rollup."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with closing(self._connect()) as conn, conn:
+            self._create_schema(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self, conn):
+        for spec in SERVICES.values():
+            columns = ", ".join(f'"{c}"' for c in spec["columns"])
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {spec["table"]} (snapshot_date TEXT NOT NULL, '
+                f'"{ACCOUNT_COLUMN}" TEXT NOT NULL, {columns}, '
+                f'PRIMARY KEY (snapshot_date, "{ACCOUNT_COLUMN}", "{spec["key"]}"))'
+            )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily_costs ("
+            "snapshot_date TEXT NOT NULL, service TEXT NOT NULL, region TEXT NOT NULL, "
+            "cost REAL NOT NULL, resources INTEGER NOT NULL, "
+            "PRIMARY KEY (snapshot_date, service, region))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingested_files ("
+            "path TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "service TEXT NOT NULL, snapshot_date TEXT NOT NULL, rows INTEGER NOT NULL, "
+            "ingested_at TEXT NOT NULL, PRIMARY KEY (path, mtime_ns, size))"
+        )
+
+    def already_ingested(self, path):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM ingested_files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                file_signature(Path(path).resolve()),
+            ).fetchone()
+        return row is not None
+
+    def ingest_file(self, path, service, snapshot_date=None, chunksize=DEFAULT_CHUNKSIZE, account=None):
+        """Upsert one export into the store. Returns rows written (0 if already ingested).
+
+        Rows without an Account column are stored under `account`, or the
+        account ID in the file's path, or "".
+        """
+        spec = SERVICES[service]
+        if self.already_ingested(path):
+            return 0
+        snapshot = (snapshot_date or snapshot_date_for(path)).isoformat()
+        account = account or account_id_for(path) or ""
+        columns = [ACCOUNT_COLUMN, *spec["columns"]]
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        insert = f'INSERT OR REPLACE INTO {spec["table"]} (snapshot_date, {column_list}) VALUES ({placeholders})'
+
+        rows = 0
+        with closing(self._connect()) as conn, conn:
+            for chunk in iter_dataset_chunks(path, spec["dtypes"], None, chunksize):
+                chunk = chunk[chunk[spec["key"]].notna()]
+                if ACCOUNT_COLUMN in chunk.columns:
+                    chunk = chunk.assign(**{ACCOUNT_COLUMN: chunk[ACCOUNT_COLUMN].astype(object).fillna(account)})
+                else:
+                    chunk = chunk.assign(**{ACCOUNT_COLUMN: account})
+                records = _to_records(chunk, columns)
+                conn.executemany(insert, ([snapshot, *record] for record in records))
+                rows += len(chunk)
+            self._refresh_rollup(conn, service, snapshot)
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*file_signature(Path(path).resolve()), service, snapshot, rows, datetime.now().isoformat(timespec="seconds")),
+            )
+        return rows
+
+    def ingest_directory(self, directory, snapshot_date=None, account=None):
+        """Ingest the compute and S3 exports found in `directory`; returns {service: rows}."""
+        written = {}
+        for stem, service in FILE_STEMS.items():
+            path = find_dataset(directory, stem)
+            if path is not None:
+                written[service] = self.ingest_file(path, service, snapshot_date, account=account)
+        return written
+
+    def _refresh_rollup(self, conn, service, snapshot):
+        table = SERVICES[service]["table"]
+        conn.execute("DELETE FROM daily_costs WHERE snapshot_date = ? AND service = ?", (snapshot, service))
+        conn.execute(
+            f"INSERT INTO daily_costs (snapshot_date, service, region, cost, resources) "
+            f"SELECT snapshot_date, ?, COALESCE(Region, 'unknown'), COALESCE(SUM(CostUSD), 0), COUNT(*) "
+            f"FROM {table} WHERE snapshot_date = ? GROUP BY snapshot_date, COALESCE(Region, 'unknown')",
+            (service, snapshot),
+        )
+
+    def snapshot_dates(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT snapshot_date FROM daily_costs ORDER BY snapshot_date").fetchall()
+        return [row[0] for row in rows]
+
+    def cost_trend(self, freq="month", by="region", service=None, start=None, end=None):
+        """Average cost per snapshot in each period, indexed by period with one column per region or service.
+
+        Each service's costs are divided by the number of that service's
+        snapshots in the period, so periods with different snapshot counts
+        compare like for like.
+        """
+        period = PERIOD_EXPRESSIONS[freq]
+        group = {"region": "region", "service": "service"}[by]
+        clauses, params = [], []
+        if service is not None:
+            clauses.append("service = ?")
+            params.append(service)
+        if start is not None:
+            clauses.append("snapshot_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            clauses.append("snapshot_date <= ?")
+            params.append(str(end))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            f"SELECT costs.period, costs.grp, SUM(costs.cost / snapshots.n) AS cost "
+            f"FROM (SELECT {period} AS period, service, {group} AS grp, cost FROM daily_costs {where}) AS costs "
+            f"JOIN (SELECT {period} AS period, service, COUNT(DISTINCT snapshot_date) AS n FROM daily_costs "
+            f"{where} GROUP BY period, service) AS snapshots USING (period, service) "
+            f"GROUP BY costs.period, costs.grp ORDER BY costs.period"
+        )
+        with closing(self._connect()) as conn:
+            long = pd.read_sql_query(query, conn, params=params * 2)
+        if long.empty:
+            return pd.DataFrame()
+        trend = long.pivot(index="period", columns="grp", values="cost").fillna(0.0)
+        trend.index = pd.to_datetime(trend.index)
+        trend.columns.name = by.capitalize()
+        return trend
+
+    def resource_costs(self, service, window, before=None):
+        """(Account, key, snapshot_date, CostUSD) rows for the latest `window` snapshots before `before`.
+
+        Used for per-resource cost baselines (see finops.anomalies) and
+        cost forecasts (see finops.forecast).
+        """
+        spec = SERVICES[service]
+        clauses, params = ["service = ?"], [service]
+        if before is not None:
+            clauses.append("snapshot_date < ?")
+            params.append(str(before))
+        with closing(self._connect()) as conn:
+            dates = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT snapshot_date FROM daily_costs WHERE {' AND '.join(clauses)} "
+                f"ORDER BY snapshot_date DESC LIMIT ?",
+                (*params, int(window)),
+            )]
+            placeholders = ", ".join("?" for _ in dates)
+            return pd.read_sql_query(
+                f'SELECT "{ACCOUNT_COLUMN}", "{spec["key"]}", snapshot_date, CostUSD FROM {spec["table"]} '
+                f"WHERE snapshot_date IN ({placeholders or 'NULL'})",
+                conn, params=dates,
+            )
+
+    def month_over_month(self, by="region", service=None):
+        """Average snapshot cost per month and group, with absolute and percentage change from the previous month."""
+        trend = self.cost_trend("month", by, service)
+        return period_deltas(trend)
+
+
+def period_deltas(trend):
+    """Long frame of (Period, Group, Cost, Previous, Delta, PctChange) from a cost_trend pivot."""
+    if trend.empty:
+        return pd.DataFrame(columns=["Period", "Group", "Cost", "Previous", "Delta", "PctChange"])
+    long = trend.rename_axis(index="Period", columns="Group").reset_index()
+    long = long.melt(id_vars="Period", var_name="Group", value_name="Cost").sort_values(["Group", "Period"])
+    long["Previous"] = long.groupby("Group")["Cost"].shift(1)
+    long["Delta"] = long["Cost"] - long["Previous"]
+    long["PctChange"] = long["Delta"] / long["Previous"].where(long["Previous"] != 0)
+    return long.reset_index(drop=True)
+
+
+def resource_keys(frame, history, key):
+    """Columns that name a resource in both `frame` and a resource_costs() `history`.
+
+    Two accounts may reuse a resource ID, so resources are matched on
+    (Account, key) when both frames have an Account column, else on `key`.
+    """
+    if ACCOUNT_COLUMN in frame.columns and ACCOUNT_COLUMN in history.columns:
+        return [ACCOUNT_COLUMN, key]
+    return [key]
+
+
+def resource_index(frame, columns):
+    """Index of `frame`'s rows on `columns` (a MultiIndex for more than one column)."""
+    arrays = [frame[column].astype(object).to_numpy() for column in columns]
+    return pd.Index(arrays[0]) if len(arrays) == 1 else pd.MultiIndex.from_arrays(arrays)
+
+
+def _to_records(chunk, columns):
+    frame = pd.DataFrame(index=chunk.index)
+    for column in columns:
+        if column not in chunk.columns:
+            frame[column] = None
+            continue
+        values = chunk[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%d")
+        frame[column] = values.astype(object).where(values.notna(), None)
+    return frame.itertuples(index=False, name=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain and query the FinOps history store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Add export directories or files to the store")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--db", default=DEFAULT_DB_NAME)
+    ingest.add_argument("--date", type=date.fromisoformat, default=None, help="Override the snapshot date")
+    ingest.add_argument("--account", default=None,
+                        help="Account for exports without an Account column (default: the account ID in the path)")
+
+    trend = sub.add_parser("trend", help="Print cost per period")
+    trend.add_argument("--db", default=DEFAULT_DB_NAME)
+    trend.add_argument("--freq", choices=list(PERIOD_EXPRESSIONS), default="month")
+    trend.add_argument("--by", choices=["region", "service"], default="region")
+    trend.add_argument("--service", choices=list(SERVICES), default=None)
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    if args.command == "ingest":
+        for raw in args.paths:
+            path = Path(raw)
+            if path.is_dir():
+                written = store.ingest_directory(path, args.date, args.account)
+            else:
+                service = next((svc for stem, svc in FILE_STEMS.items() if path.name.startswith(stem)), None)
+                if service is None:
+                    parser.error(f"cannot tell whether {path} is a compute or S3 export")
+                written = {service: store.ingest_file(path, service, args.date, account=args.account)}
+            for service, rows in written.items():
+                print(f"{path}: {service} {rows} rows" if rows else f"{path}: {service} already ingested")
+    else:
+        print(store.cost_trend(args.freq, args.by, args.service).to_string())
+
+
+if __name__ == "__main__":
+    main()
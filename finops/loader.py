@@ -0,0 +1,236 @@
+"""
+Typed ingestion for the compute and S3 exports.
+
+The schemas below are applied at parse time so low-cardinality text columns
+become categoricals and utilization metrics are stored as float32. CostUSD
+and TotalSizeGB stay float64 because they are summed into regional and fleet
+totals that need to add up to the cent.
+
+Numeric and date columns are parsed as they come and then coerced, so a
+stray "n/a" or "12%" becomes a missing value instead of failing the whole
+load. The positions of such cells are kept in the frame's attrs under
+INVALID_VALUES_ATTR (see invalid_values()) for the data-quality profile.
+
+Each CSV can be converted once into a compressed Parquet snapshot next to the
+source (see finops.snapshot). Snapshots are preferred over the CSV whenever
+they are at least as new, and are read with column projection and memory
+mapping so a tab only pays for the columns it uses.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COMPUTE_DTYPES = {
+    "ResourceType": "category",
+    "Region": "category",
+    "InstanceType": "category",
+    "State": "category",
+    "CostUSD": "float64",
+    "CPUUtilization": "float32",
+    "MemoryUtilization": "float32",
+    "NetworkIn_Bps": "float32",
+    "NetworkOut_Bps": "float32",
+}
+
+S3_DTYPES = {
+    "Region": "category",
+    "StorageClass": "category",
+    "Encryption": "category",
+    "CostUSD": "float64",
+    "ObjectCount": "float64",
+    "TotalSizeGB": "float64",
+    "VersionEnabled": "boolean",
+}
+
+DATE_COLUMNS = ["CreationDate"]
+
+INVALID_VALUES_ATTR = "invalid_values"
+
+COMPUTE_STEM = "aws_resources_compute"
+S3_STEM = "aws_resources_S3"
+SNAPSHOT_SUFFIX = ".parquet"
+DEFAULT_CHUNKSIZE = 250_000
+
+# Columns read by each part of the dashboard. None means every column.
+COMPUTE_TAB_COLUMNS = {
+    "filters": ["Region", "InstanceType", "State", "ResourceType"],
+    "overview": None,
+    "ec2": ["ResourceId", "Region", "CostUSD", "CPUUtilization"],
+    "insights": ["Account", "ResourceId", "Region", "State", "InstanceType", "CostUSD", "CPUUtilization",
+                 "MemoryUtilization", "NetworkIn_Bps", "NetworkOut_Bps"],
+    "forecast": ["Account", "ResourceId", "Region", "InstanceType", "CostUSD", "CreationDate"],
+    "tags": ["Tags"],
+}
+
+S3_TAB_COLUMNS = {
+    "filters": ["Region", "StorageClass", "Encryption"],
+    "overview": None,
+    "s3": ["BucketName", "Region", "TotalSizeGB", "CostUSD"],
+    "insights": ["Account", "BucketName", "Region", "StorageClass", "TotalSizeGB", "CostUSD"],
+    "tiering": ["BucketName", "Region", "StorageClass", "CreationDate", "ObjectCount", "TotalSizeGB"],
+    "forecast": ["Account", "BucketName", "Region", "StorageClass", "CostUSD", "CreationDate"],
+    "tags": ["Tags"],
+}
+
+
+def file_signature(path):
+    """Return a (path, mtime_ns, size) tuple that changes whenever the file does."""
+    stat = os.stat(path)
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def tab_columns(tab_columns_map, *tabs):
+    """Ordered union of the columns used by the given tabs, or None for all columns."""
+    columns = []
+    for tab in tabs:
+        wanted = tab_columns_map[tab]
+        if wanted is None:
+            return None
+        columns.extend(c for c in wanted if c not in columns)
+    return tuple(columns)
+
+
+def numeric_columns(dtypes):
+    """Columns of a schema with an integer or float type."""
+    return [column for column, dtype in dtypes.items() if pd.api.types.pandas_dtype(dtype).kind in "fiu"]
+
+
+def csv_dtypes(dtypes):
+    """The part of a schema safe to hand to read_csv: numeric columns are coerced afterwards."""
+    numeric = numeric_columns(dtypes)
+    return {column: dtype for column, dtype in dtypes.items() if column not in numeric}
+
+
+def invalid_values(df):
+    """{column: positions} of cells apply_schema() could not parse and left missing."""
+    return df.attrs.get(INVALID_VALUES_ATTR, {})
+
+
+def apply_schema(df, dtypes):
+    """Coerce an already-parsed frame to the given schema, skipping absent columns.
+
+    Numeric and date cells that do not parse become missing; their
+    positions are recorded for invalid_values().
+    """
+    invalid = {}
+
+    def coerce(column, parse):
+        values = df[column]
+        parsed = parse(values)
+        unparsed = np.flatnonzero((values.notna() & parsed.isna()).to_numpy())
+        if len(unparsed):
+            invalid[column] = unparsed
+        return parsed
+
+    numeric = numeric_columns(dtypes)
+    for column, dtype in dtypes.items():
+        if column in df.columns and str(df[column].dtype) != dtype:
+            values = df[column]
+            if column in numeric and not pd.api.types.is_numeric_dtype(values):
+                values = coerce(column, lambda v: pd.to_numeric(v, errors="coerce"))
+            df[column] = values.astype(dtype)
+    for column in DATE_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = coerce(column, lambda v: pd.to_datetime(v, errors="coerce"))
+    if invalid:
+        df.attrs[INVALID_VALUES_ATTR] = {**invalid_values(df), **invalid}
+    return df
+
+
+def read_typed_csv(source, dtypes, columns=None):
+    """Parse a CSV path or buffer with an explicit schema."""
+    usecols = None if columns is None else (lambda c: c in columns)
+    df = pd.read_csv(source, dtype=csv_dtypes(dtypes), usecols=usecols)
+    return apply_schema(df, dtypes)
+
+
+def snapshot_path(csv_path):
+    return Path(csv_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def snapshot_supported():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_snapshot(path, dtypes, columns=None):
+    """Read a Parquet snapshot, projecting to `columns` and memory-mapping the file."""
+    import pyarrow.parquet as pq
+
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    df = pd.read_parquet(path, columns=columns, engine="pyarrow", memory_map=True)
+    return apply_schema(df, dtypes)
+
+
+def read_dataset(path, dtypes, columns=None):
+    """Load a snapshot or CSV file depending on its suffix."""
+    if Path(path).suffix == SNAPSHOT_SUFFIX:
+        return read_snapshot(path, dtypes, columns)
+    return read_typed_csv(path, dtypes, columns)
+
+
+def iter_dataset_chunks(path, dtypes, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield typed frames of at most `chunksize` rows from a snapshot or CSV.
+
+    Chunks carry a RangeIndex that continues across chunks, so row labels
+    match what a single full read would produce.
+    """
+    if Path(path).suffix == SNAPSHOT_SUFFIX:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        if columns is not None:
+            columns = [c for c in columns if c in parquet_file.schema_arrow.names]
+        offset = 0
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield apply_schema(chunk, dtypes)
+        return
+
+    usecols = None if columns is None else (lambda c: c in columns)
+    with pd.read_csv(path, dtype=csv_dtypes(dtypes), usecols=usecols, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk, dtypes)
+
+
+def find_dataset(base_dir, stem):
+    """Locate `<stem>.parquet` or `<stem>.csv` under base_dir.
+
+    The snapshot wins when pyarrow is installed and it is not older than the
+    CSV it was built from; otherwise the CSV is used. Returns None if neither
+    file exists.
+    """
+    csv_path = Path(base_dir) / f"{stem}.csv"
+    parquet_path = snapshot_path(csv_path)
+    if parquet_path.exists() and snapshot_supported():
+        if not csv_path.exists() or parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return parquet_path
+    if csv_path.exists():
+        return csv_path
+    return None
+
+
+def load_compute_csv(source, columns=None):
+    return read_typed_csv(source, COMPUTE_DTYPES, columns)
+
+
+def load_s3_csv(source, columns=None):
+    return read_typed_csv(source, S3_DTYPES, columns)
+
+
+def load_compute(path, columns=None):
+    return read_dataset(path, COMPUTE_DTYPES, columns)
+
+
+def load_s3(path, columns=None):
+    return read_dataset(path, S3_DTYPES, columns)
@@ -0,0 +1,198 @@
+"""
+Stage timing for dashboard reruns.
+
+A Profiler records, for each named stage, the wall time, an optional row
+count and the change in resident memory (RSS) across the stage. Records can
+be shown in the dashboard's debug panel and appended to a JSON-lines file,
+one object per stage, for offline analysis:
+
+    {"run_id": "...", "timestamp": 1718000000.0, "stage": "filter:ec2",
+     "seconds": 0.0042, "rows": 120, "rss_delta_bytes": 0, ...}
+
+Profiling is off unless FINOPS_PROFILE is set: "1" enables the debug panel,
+and any other value is taken as the JSONL path to append to. A disabled
+Profiler hands out one shared no-op stage, so instrumented code costs an
+attribute lookup and a context-manager call per stage. Row counts can be
+given as zero-argument callables, which are only called when profiling is
+on, so counting rows (a query on the DuckDB backend) costs nothing otherwise.
+
+Usage:
+    python -m finops.profiling profile.jsonl [--top 20]
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+PROFILE_ENV_VAR = "FINOPS_PROFILE"
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss():
+    """Resident set size in bytes, or None where /proc is unavailable."""
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def profile_setting():
+    """(enabled, jsonl_path) from FINOPS_PROFILE."""
+    value = os.environ.get(PROFILE_ENV_VAR, "").strip()
+    if value in ("", "0"):
+        return False, None
+    if value == "1":
+        return True, None
+    return True, Path(value)
+
+
+class _NullStage:
+    """Stage handed out while profiling is disabled; accepts and drops row counts."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    def __init__(self, profiler, name, rows=None, **fields):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.fields = fields
+
+    def __enter__(self):
+        self._rss = current_rss()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        rss = current_rss()
+        if callable(self.rows):
+            self.rows = self.rows() if exc_type is None else None
+        self.profiler.records.append({
+            "run_id": self.profiler.run_id,
+            "timestamp": time.time(),
+            "stage": self.name,
+            "seconds": seconds,
+            "rows": None if self.rows is None else int(self.rows),
+            "rss_bytes": rss,
+            "rss_delta_bytes": None if rss is None or self._rss is None else rss - self._rss,
+            "error": None if exc_type is None else exc_type.__name__,
+            **self.fields,
+        })
+        return False
+
+
+class Profiler:
+    """Collects one record per stage for a single run.
+
+    `context` fields (e.g. the active section or query backend) are added
+    to every record when it is written out, so they can be filled in at
+    any point during the run.
+    """
+
+    def __init__(self, enabled=False, run_id=None, **context):
+        self.enabled = enabled
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.context = context
+        self.records = []
+
+    @classmethod
+    def from_env(cls, **context):
+        enabled, _ = profile_setting()
+        return cls(enabled, **context)
+
+    def stage(self, name, rows=None, **fields):
+        """Context manager timing `name`; set `.rows` on it to record a row count.
+
+        `rows` may be a zero-argument callable returning the count; it is
+        only called when profiling is enabled.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return Stage(self, name, rows, **fields)
+
+    def frame(self):
+        """Stage, milliseconds, rows and RSS delta (MiB) for display."""
+        records = pd.DataFrame(self.records, columns=["stage", "seconds", "rows", "rss_delta_bytes"])
+        return pd.DataFrame({
+            "stage": records["stage"],
+            "ms": records["seconds"] * 1000,
+            "rows": records["rows"].astype("Int64"),
+            "rss_delta_mib": records["rss_delta_bytes"].astype("float64") / 2**20,
+        })
+
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.records)
+
+    def write_jsonl(self, path):
+        """Append this run's records to `path`, one JSON object per line."""
+        if not self.records:
+            return
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as fh:
+            for record in self.records:
+                fh.write(json.dumps({**record, **self.context}, default=str) + "\n")
+
+
+def read_jsonl(path):
+    return pd.read_json(path, lines=True)
+
+
+def summarize_stages(records):
+    """Per-stage call count, total/mean/p95 seconds, mean rows and mean RSS delta."""
+    grouped = records.groupby("stage")
+    summary = pd.DataFrame({
+        "calls": grouped.size(),
+        "total_s": grouped["seconds"].sum(),
+        "mean_s": grouped["seconds"].mean(),
+        "p95_s": grouped["seconds"].quantile(0.95),
+        "mean_rows": grouped["rows"].mean(),
+        "mean_rss_delta_mib": grouped["rss_delta_bytes"].mean() / 2**20,
+    })
+    return summary.sort_values("total_s", ascending=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize dashboard stage timings from a profile JSONL file.")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=20, help="Number of stages to show (default: 20)")
+    args = parser.parse_args(argv)
+
+    records = read_jsonl(args.path)
+    print(f"{records['run_id'].nunique()} runs, {len(records)} stage records")
+    print(summarize_stages(records).head(args.top).to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+Single-pass data-quality profiles and per-column cleaning rules.
+
+profile_frame() reads every column of a frame once and records, per column:
+
+- null count and type conformance: how many non-null values fail to parse as
+  the schema's type (finops.loader dtypes, CreationDate as a date);
+- count, mean, variance, min and max of numeric columns (chunk variances
+  are combined with Chan's parallel formula, which stays exact where a
+  running sum of squares would lose precision);
+- a relative-error quantile sketch of numeric columns (log-spaced buckets,
+  every quantile within SKETCH_ACCURACY of the true value);
+- a HyperLogLog sketch of distinct values (2**HLL_PRECISION registers,
+  DISTINCT_ERROR standard error, under 1%).
+
+Every part is mergeable, so a profile of a large frame or of a DuckDB result
+is built chunk by chunk (profile_chunks()) and never needs all rows at once.
+
+Cleaning is no longer a blanket dropna(). Each column has a CleaningRule:
+
+- "drop": rows missing the column are left out of the analysis tabs;
+- "impute": missing values are filled with a fixed value, or with the
+  column's "median", "mean", "min" or "max" taken from the profile;
+- "keep": missing values stay missing (the default for unlisted columns).
+
+COMPUTE_CLEANING_RULES and S3_CLEANING_RULES drop rows missing a column the
+dashboard cannot do without and keep the rest. A cleaning_rules.json file
+next to the dashboard overrides them per column:
+
+    {"compute": {"MemoryUtilization": {"impute": "median"}},
+     "s3": {"Encryption": "keep"}}
+
+plan_cleaning() turns rules into a CleaningPlan of concrete fill values,
+which the query backends apply once per dataset load.
+"""
+
+import json
+import math
+from dataclasses import dataclass, field, replace
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from finops.loader import DATE_COLUMNS, DEFAULT_CHUNKSIZE
+
+RULES_FILENAME = "cleaning_rules.json"
+ACTIONS = ("impute", "drop", "keep")
+STATISTICS = ("median", "mean", "min", "max")
+
+QUANTILES = (0.25, 0.5, 0.75)
+SKETCH_ACCURACY = 0.01
+HLL_PRECISION = 14
+# Standard error of the HyperLogLog distinct count.
+DISTINCT_ERROR = 1.04 / math.sqrt(2 ** HLL_PRECISION)
+
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Magnitudes below this fall in the sketch's zero bucket.
+_MIN_MAGNITUDE = 1e-12
+_MIN_INDEX = math.ceil(math.log(_MIN_MAGNITUDE) / _LOG_GAMMA)
+_HLL_REGISTERS = 2 ** HLL_PRECISION
+_HLL_RANK_BITS = 64 - HLL_PRECISION
+
+
+@dataclass(frozen=True)
+class CleaningRule:
+    """What to do with a column's missing values: impute, drop or keep."""
+
+    action: str
+    value: object = None
+
+    def __post_init__(self):
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown cleaning action {self.action!r}; expected one of {', '.join(ACTIONS)}")
+        if self.action == "impute" and self.value is None:
+            raise ValueError("An impute rule needs a value or one of " + ", ".join(STATISTICS))
+
+    def describe(self):
+        if self.action == "impute":
+            return f"impute {self.value}"
+        return "drop rows" if self.action == "drop" else "keep"
+
+
+KEEP = CleaningRule("keep")
+DROP = CleaningRule("drop")
+
+COMPUTE_CLEANING_RULES = {
+    column: DROP for column in ["ResourceId", "Region", "InstanceType", "State", "CostUSD", "CPUUtilization"]
+}
+# Exports write an unencrypted bucket's Encryption as "None", which parses
+# as missing; imputing it keeps those buckets visible and filterable.
+S3_CLEANING_RULES = {
+    **{column: DROP for column in ["BucketName", "Region", "StorageClass", "TotalSizeGB", "CostUSD"]},
+    "Encryption": CleaningRule("impute", "None"),
+}
+DEFAULT_RULES = {"compute": COMPUTE_CLEANING_RULES, "s3": S3_CLEANING_RULES}
+
+
+def parse_rule(spec):
+    """CleaningRule from "drop", "keep" or {"impute": value}."""
+    if isinstance(spec, str):
+        return CleaningRule(spec)
+    if isinstance(spec, dict) and list(spec) == ["impute"]:
+        return CleaningRule("impute", spec["impute"])
+    raise ValueError(f"Invalid cleaning rule {spec!r}; use \"drop\", \"keep\" or {{\"impute\": value}}")
+
+
+def cleaning_rules(path=None):
+    """{"compute": rules, "s3": rules}: the defaults, overridden per column by the JSON file at `path`."""
+    rules = {service: dict(defaults) for service, defaults in DEFAULT_RULES.items()}
+    if path is None:
+        return rules
+    with open(path) as fh:
+        overrides = json.load(fh)
+    unknown = sorted(set(overrides) - set(rules))
+    if unknown:
+        raise ValueError(f"{path}: unknown dataset {', '.join(unknown)}; expected compute or s3")
+    for service, columns in overrides.items():
+        rules[service].update({column: parse_rule(spec) for column, spec in columns.items()})
+    return rules
+
+
+def needs_profile(rules):
+    """Whether any impute rule takes its value from a column statistic."""
+    return any(rule.action == "impute" and rule.value in STATISTICS for rule in (rules or {}).values())
+
+
+def _expected_kind(column, dtypes):
+    if column in DATE_COLUMNS:
+        return "datetime"
+    dtype = dtypes.get(column)
+    if dtype is None:
+        return None
+    if dtype == "category":
+        return "category"
+    if dtype == "boolean":
+        return "boolean"
+    return "numeric"
+
+
+def _conforming(series, kind):
+    """`series` as its expected kind, with values that do not parse turned missing."""
+    if kind == "numeric" and not pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors="coerce")
+    if kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(series):
+        return pd.to_datetime(series, errors="coerce", format="mixed")
+    if kind == "boolean" and not pd.api.types.is_bool_dtype(series):
+        text = series.astype("string").str.strip().str.lower()
+        return text.map({"true": True, "false": False, "1": True, "0": False}).astype("boolean")
+    return series
+
+
+def _sketch_keys(values):
+    """Bucket keys for finite `values`: +i / -i for positive / negative, 0 for near zero."""
+    magnitude = np.abs(values)
+    keys = np.zeros(len(values), dtype=np.int64)
+    large = magnitude >= _MIN_MAGNITUDE
+    # Offset so that every non-zero bucket key is at least 1.
+    index = np.ceil(np.log(magnitude[large]) / _LOG_GAMMA).astype(np.int64) - _MIN_INDEX + 1
+    keys[large] = np.where(values[large] > 0, index, -index)
+    return keys
+
+
+def _bucket_value(key):
+    if key == 0:
+        return 0.0
+    index = abs(key) + _MIN_INDEX - 1
+    value = 2 * _GAMMA ** index / (_GAMMA + 1)
+    return value if key > 0 else -value
+
+
+def _hll_update(registers, hashes):
+    """Fold uint64 `hashes` into HyperLogLog `registers` in place."""
+    index = (hashes >> np.uint64(_HLL_RANK_BITS)).astype(np.intp)
+    # The low bits pick the rank; an integer below 2**53 converts to float
+    # exactly, so frexp's exponent is its bit length.
+    rest = (hashes & np.uint64((1 << _HLL_RANK_BITS) - 1)).astype(np.float64)
+    rank = (_HLL_RANK_BITS + 1 - np.frexp(rest)[1]).astype(np.uint8)
+    np.maximum.at(registers, index, rank)
+
+
+def _hll_estimate(registers):
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    empty = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and empty:
+        estimate = m * math.log(m / empty)
+    return estimate
+
+
+@dataclass
+class ColumnProfile:
+    """Mergeable statistics of one column; see the module docstring."""
+
+    dtype: str
+    expected: str = None
+    rows: int = 0
+    nulls: int = 0
+    invalid: int = 0
+    count: int = 0
+    average: float = 0.0
+    m2: float = 0.0
+    minimum: object = None
+    maximum: object = None
+    sketch: pd.Series = None
+    registers: np.ndarray = field(default_factory=lambda: np.zeros(_HLL_REGISTERS, dtype=np.uint8))
+
+    @classmethod
+    def of(cls, series, expected=None):
+        profile = cls(str(series.dtype), expected, rows=len(series))
+        present = series.notna()
+        profile.nulls = int(len(series) - present.sum())
+        typed = _conforming(series, expected)
+        if typed is not series:
+            profile.invalid = int((present & typed.isna()).sum())
+        if len(series) > profile.nulls:
+            # categorize=False hashes values directly, which is faster for
+            # high-cardinality columns such as resource IDs.
+            hashes = pd.util.hash_pandas_object(series[present], index=False, categorize=False)
+            _hll_update(profile.registers, hashes.to_numpy())
+
+        if pd.api.types.is_numeric_dtype(typed) and not pd.api.types.is_bool_dtype(typed):
+            values = typed.to_numpy(dtype="float64", na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if len(values):
+                profile.count = len(values)
+                profile.average = float(values.mean())
+                profile.m2 = float(np.square(values - profile.average).sum())
+                profile.minimum = float(values.min())
+                profile.maximum = float(values.max())
+                keys, counts = np.unique(_sketch_keys(values), return_counts=True)
+                profile.sketch = pd.Series(counts, index=keys)
+        elif pd.api.types.is_datetime64_any_dtype(typed) and typed.notna().any():
+            profile.minimum = typed.min()
+            profile.maximum = typed.max()
+        return profile
+
+    def merge(self, other):
+        def pick(a, b, choose):
+            return b if a is None else a if b is None else choose(a, b)
+
+        count = self.count + other.count
+        delta = other.average - self.average
+        average = self.average + delta * other.count / count if count else 0.0
+        m2 = self.m2 + other.m2 + (delta * delta * self.count * other.count / count if count else 0.0)
+        if self.sketch is None or other.sketch is None:
+            sketch = self.sketch if other.sketch is None else other.sketch
+        else:
+            sketch = self.sketch.add(other.sketch, fill_value=0).astype("int64")
+        return ColumnProfile(
+            self.dtype if self.dtype == other.dtype else "mixed",
+            self.expected,
+            self.rows + other.rows,
+            self.nulls + other.nulls,
+            self.invalid + other.invalid,
+            count,
+            average,
+            m2,
+            pick(self.minimum, other.minimum, min),
+            pick(self.maximum, other.maximum, max),
+            sketch,
+            np.maximum(self.registers, other.registers),
+        )
+
+    @property
+    def numeric(self):
+        return self.sketch is not None
+
+    def distinct(self):
+        present = self.rows - self.nulls
+        return 0 if present == 0 else min(int(round(_hll_estimate(self.registers))), present)
+
+    def mean(self):
+        return self.average if self.count else np.nan
+
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def quantile(self, q):
+        """Value at quantile `q` (0..1) from the sketch, within SKETCH_ACCURACY."""
+        if not self.numeric:
+            return np.nan
+        # Keys sort in value order: negative buckets (largest magnitude first), zero, positive.
+        sketch = self.sketch.sort_index()
+        keys, counts = sketch.index.to_numpy(), sketch.to_numpy()
+        position = int(np.searchsorted(np.cumsum(counts), q * (self.count - 1), side="right"))
+        value = _bucket_value(int(keys[min(position, len(keys) - 1)]))
+        return min(max(value, self.minimum), self.maximum)
+
+    def statistic(self, name):
+        """One of STATISTICS, for numeric columns."""
+        if not self.numeric:
+            raise ValueError(f"Cannot impute the {name} of a non-numeric column")
+        if name == "median":
+            return self.quantile(0.5)
+        if name == "mean":
+            return self.mean()
+        return self.minimum if name == "min" else self.maximum
+
+
+@dataclass
+class DatasetProfile:
+    """Column profiles of a frame, mergeable with the profile of further rows."""
+
+    rows: int = 0
+    columns: dict = field(default_factory=dict)
+
+    def merge(self, other):
+        columns = dict(self.columns)
+        for name, profile in other.columns.items():
+            columns[name] = columns[name].merge(profile) if name in columns else profile
+        return DatasetProfile(self.rows + other.rows, columns)
+
+    def with_invalid(self, counts):
+        """This profile with `counts[column]` values moved from missing to invalid.
+
+        The loader turns cells that do not parse into missing values (see
+        finops.loader.invalid_values()); this restores them as present but
+        non-conforming, as a profile of the unparsed text would count them.
+        """
+        columns = dict(self.columns)
+        for name, count in counts.items():
+            if count and name in columns:
+                profile = columns[name]
+                columns[name] = replace(profile, nulls=profile.nulls - count, invalid=profile.invalid + count)
+        return DatasetProfile(self.rows, columns)
+
+    def missing_values(self):
+        return sum(profile.nulls for profile in self.columns.values())
+
+    def summary(self):
+        """One row per column: type, missing and non-conforming counts, distinct values."""
+        return pd.DataFrame(
+            [
+                {
+                    "Column": name,
+                    "Type": profile.dtype,
+                    "Expected": profile.expected or "",
+                    "NonNull": profile.rows - profile.nulls,
+                    "Missing": profile.nulls,
+                    "MissingPct": 100.0 * profile.nulls / profile.rows if profile.rows else 0.0,
+                    "Invalid": profile.invalid,
+                    "Distinct": profile.distinct(),
+                }
+                for name, profile in self.columns.items()
+            ],
+            columns=["Column", "Type", "Expected", "NonNull", "Missing", "MissingPct", "Invalid", "Distinct"],
+        )
+
+    def statistics(self):
+        """count/mean/std/min/quartiles/max per numeric column, laid out like DataFrame.describe()."""
+        index = ["count", "mean", "std", "min", *(f"{q:.0%}" for q in QUANTILES), "max"]
+        return pd.DataFrame(
+            {
+                name: [profile.count, profile.mean(), profile.std(), profile.minimum,
+                       *(profile.quantile(q) for q in QUANTILES), profile.maximum]
+                for name, profile in self.columns.items()
+                if profile.numeric
+            },
+            index=index,
+            dtype="float64",
+        )
+
+
+def profile_frame(df, dtypes=None):
+    """DatasetProfile of `df`, checking types against `dtypes`."""
+    dtypes = dtypes or {}
+    return DatasetProfile(
+        len(df), {column: ColumnProfile.of(df[column], _expected_kind(column, dtypes)) for column in df.columns}
+    )
+
+
+def profile_chunks(chunks, dtypes=None):
+    """Merged DatasetProfile of frames `chunks`."""
+    return reduce(DatasetProfile.merge, (profile_frame(chunk, dtypes) for chunk in chunks), DatasetProfile())
+
+
+def iter_slices(df, chunksize=DEFAULT_CHUNKSIZE):
+    """Consecutive row slices of `df`, at most `chunksize` rows each."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+@dataclass(frozen=True)
+class CleaningPlan:
+    """Rules resolved against one dataset: fill values and the columns rows must have."""
+
+    rules: dict = field(default_factory=dict)
+    fills: dict = field(default_factory=dict)
+    required: tuple = ()
+
+
+def plan_cleaning(rules, columns, profile=None):
+    """CleaningPlan for a dataset with `columns`; rules on absent columns are ignored.
+
+    `profile` is needed when an impute rule names a statistic (see needs_profile()).
+    """
+    rules = {column: rule for column, rule in (rules or {}).items() if column in columns}
+    fills = {}
+    for column, rule in rules.items():
+        if rule.action != "impute":
+            continue
+        if rule.value in STATISTICS:
+            if profile is None:
+                raise ValueError(f"Imputing the {rule.value} of {column} needs a profile of the data")
+            fills[column] = profile.columns[column].statistic(rule.value)
+        else:
+            fills[column] = rule.value
+    required = tuple(column for column, rule in rules.items() if rule.action == "drop")
+    return CleaningPlan(rules, fills, required)
+
+
+def apply_plan(df, plan):
+    """`df` with the plan's fill values, sharing every column it does not fill."""
+    if not plan.fills:
+        return df
+    cleaned = df.copy(deep=False)
+    for column, value in plan.fills.items():
+        series = cleaned[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+            series = series.cat.add_categories([value])
+        cleaned[column] = series.fillna(value)
+    return cleaned
+
+
+def required_mask(df, plan):
+    """Boolean array of rows that have every column the plan requires."""
+    if not plan.required:
+        return np.ones(len(df), dtype=bool)
+    return df[list(plan.required)].notna().all(axis=1).to_numpy()
+
+
+def _format_value(value):
+    return f"{value:.4g}" if isinstance(value, float) else repr(value)
+
+
+def cleaning_table(profile, plan):
+    """One row per column with missing values: how many, and the rule applied to them."""
+    rows = []
+    for column, column_profile in profile.columns.items():
+        if column_profile.nulls == 0:
+            continue
+        rule = plan.rules.get(column, KEEP)
+        action = f"impute {_format_value(plan.fills[column])}" if column in plan.fills else rule.describe()
+        rows.append({"Column": column, "Missing": column_profile.nulls, "Rule": action})
+    return pd.DataFrame(rows, columns=["Column", "Missing", "Rule"])
+
+
+def cleaning_report(profile, plan, records_after):
+    """Missing, imputed and dropped counts for a profiled selection."""
+    return {
+        "missing_values": profile.missing_values(),
+        "imputed_values": sum(profile.columns[c].nulls for c in plan.fills if c in profile.columns),
+        "records_before": profile.rows,
+        "records_after": int(records_after),
+        "rules": {column: rule.describe() for column, rule in plan.rules.items()},
+    }
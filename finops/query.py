@@ -0,0 +1,746 @@
+"""
+Pluggable query backends for the dashboard's filtered aggregations.
+
+The dashboard asks a backend for a *selection* (one dataset restricted to the
+sidebar filters) and reads every number, table and chart input from it:
+counts, totals, top-N tables, per-region groupings, insights, tag allocation
+and the data-quality overview. Two backends implement the same selection API:
+
+- "pandas" (default): the in-memory frames and FilterIndex masks, with every
+  query delegated to finops.analysis / finops.tags.
+- "duckdb": an embedded columnar SQL engine over the export files. Filter
+  selections become a parameterized WHERE clause that DuckDB pushes down into
+  the scan, and only aggregated results (or the projected columns a chart
+  plots) are pulled into Python. Parquet snapshots are queried in place; a
+  CSV is parsed once into a DuckDB table, which is far cheaper to rescan than
+  re-parsing text on every rerun.
+
+Pick the backend with FINOPS_QUERY_BACKEND=duckdb (see backend_name()).
+"""
+
+import functools
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from finops import analysis, quality, sources, tags
+from finops.filter_index import FilterIndex
+from finops.loader import (
+    COMPUTE_DTYPES,
+    DATE_COLUMNS,
+    DEFAULT_CHUNKSIZE,
+    S3_DTYPES,
+    SNAPSHOT_SUFFIX,
+    apply_schema,
+    invalid_values,
+    numeric_columns,
+)
+
+BACKEND_ENV_VAR = "FINOPS_QUERY_BACKEND"
+DEFAULT_BACKEND = "pandas"
+BACKENDS = ("pandas", "duckdb")
+SELECTION_CACHE_SIZE = 8
+# Prefix of the columns holding imputed columns' original values in DuckDB views.
+RAW_COLUMN_PREFIX = "__raw__"
+
+# pandas' default na_values, so both backends agree on what counts as missing
+# (e.g. Encryption="None" is missing in the pandas path too).
+CSV_NULL_STRINGS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def duckdb_supported():
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def backend_name(default=DEFAULT_BACKEND):
+    """Backend requested through FINOPS_QUERY_BACKEND, falling back to pandas."""
+    name = os.environ.get(BACKEND_ENV_VAR, default).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    if name == "duckdb" and not duckdb_supported():
+        return DEFAULT_BACKEND
+    return name
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def memoized(method):
+    """Cache a selection method's result on the selection, keyed by its arguments.
+
+    Calls with unhashable arguments (e.g. a recommendations frame) are not cached.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, _freeze(args), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self.cached(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+class Selection:
+    """Base for one dataset restricted to one set of filters.
+
+    Datasets hand out the same Selection object for the same filters (see
+    SelectionCache), and every query result is memoized on it, so reruns
+    that do not change the filters reuse earlier results instead of
+    recomputing them. Results are shared, so callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def cached(self, key, compute):
+        """Return the memoized value for `key`, computing it on first use."""
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        value = compute()
+        with self._lock:
+            return self._results.setdefault(key, value)
+
+
+class SelectionCache:
+    """Small LRU of selections keyed by their normalized filters."""
+
+    def __init__(self, max_entries=SELECTION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filters):
+        # Empty selections do not filter, so they are left out of the key.
+        return frozenset((column, frozenset(map(str, selected)))
+                         for column, selected in filters.items() if len(selected) > 0)
+
+    def get(self, filters, create):
+        key = self.key(filters)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        selection = create()
+        with self._lock:
+            selection = self._entries.setdefault(key, selection)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return selection
+
+
+class PandasDataset:
+    """An in-memory frame plus its FilterIndex.
+
+    `frame` is the projected frame the dashboard filters; `full` is the
+    frame with every column (or a zero-argument callable returning it),
+    used by full exports and the cleaning step, and `raw` is that frame as
+    loaded, before the cleaning `plan` filled anything in, which data
+    quality profiles read. All hold the same rows in the same order, and
+    are typically views of one shared frame (see finops.registry), so none
+    is modified here.
+    """
+
+    def __init__(self, frame, index, full=None, raw=None, plan=None, dtypes=None):
+        self.frame = frame
+        self.index = index
+        self._full = frame if full is None else full
+        self._raw = raw
+        self.plan = quality.CleaningPlan() if plan is None else plan
+        self.dtypes = dtypes or {}
+        self.invalid = {}
+        self._complete = None
+        self._profile = None
+        self._selections = SelectionCache()
+
+    @classmethod
+    def projected(cls, full, columns, filter_columns, rules=None, dtypes=None):
+        """Dataset over `full` cleaned by `rules` and projected to `columns`, with parsed tag columns.
+
+        The projection shares `full`'s memory; only imputed and tag columns
+        are new. `dtypes` is the schema profiles check types against.
+        """
+        invalid = invalid_values(full)
+        profile = None
+        if quality.needs_profile(rules):
+            profile = quality.profile_chunks(quality.iter_slices(full), dtypes)
+            profile = profile.with_invalid({column: len(positions) for column, positions in invalid.items()})
+        plan = quality.plan_cleaning(rules, full.columns, profile)
+        cleaned = quality.apply_plan(full, plan)
+        frame = tags.with_tag_columns(cleaned[[c for c in cleaned.columns if c in columns]])
+        dataset = cls(frame, FilterIndex(frame, filter_columns + tags.tag_columns(frame)), cleaned, full, plan, dtypes)
+        dataset.invalid = invalid
+        dataset._profile = profile
+        return dataset
+
+    def __len__(self):
+        return len(self.frame)
+
+    def full_frame(self):
+        if callable(self._full):
+            self._full = self._full()
+        return self._full
+
+    def raw_frame(self):
+        return self.full_frame() if self._raw is None else self._raw
+
+    def complete_mask(self):
+        """Positional mask of rows with every column the cleaning plan requires, computed once per dataset."""
+        if self._complete is None:
+            self._complete = quality.required_mask(self.full_frame(), self.plan)
+            self._complete.flags.writeable = False
+        return self._complete
+
+    def profile(self):
+        """Data-quality profile of every loaded row, computed once per dataset."""
+        if self._profile is None:
+            profile = quality.profile_chunks(quality.iter_slices(self.raw_frame()), self.dtypes)
+            self._profile = profile.with_invalid(self.invalid_counts())
+        return self._profile
+
+    def invalid_counts(self, rows=None):
+        """Per column, how many of `rows` (positions; None for all) held a value the loader could not parse."""
+        if rows is None:
+            return {column: len(positions) for column, positions in self.invalid.items()}
+        return {column: int(np.isin(positions, rows).sum()) for column, positions in self.invalid.items()}
+
+    def options(self, column):
+        return self.index.options(column)
+
+    def tag_columns(self):
+        return tags.tag_columns(self.frame)
+
+    def select(self, filters):
+        return self._selections.get(filters, lambda: PandasSelection(self, _positions(self.index.mask(filters))))
+
+
+def _positions(mask):
+    """Row positions kept by `mask`, or None when it keeps every row."""
+    if mask.all():
+        return None
+    rows = np.flatnonzero(mask).astype(np.int32 if len(mask) <= np.iinfo(np.int32).max else np.int64)
+    rows.flags.writeable = False
+    return rows
+
+
+class PandasSelection(Selection):
+    """Row positions into a PandasDataset.
+
+    The selection never keeps a filtered copy of the frame: each query takes
+    just the columns it reads at `rows` (or uses the dataset frame as is
+    when nothing is filtered out), and only its result is memoized.
+    """
+
+    def __init__(self, dataset, rows=None):
+        super().__init__()
+        self.dataset = dataset
+        self._rows = rows
+
+    def __len__(self):
+        return len(self.dataset) if self._rows is None else len(self._rows)
+
+    def _take(self, frame, columns=None):
+        if columns is not None:
+            frame = frame[[c for c in dict.fromkeys(columns) if c in frame.columns]]
+        return frame if self._rows is None else frame.take(self._rows)
+
+    def frame(self, columns=None):
+        return self._take(self.dataset.frame, columns)
+
+    def column(self, name):
+        series = self.dataset.frame[name]
+        return series if self._rows is None else series.take(self._rows)
+
+    @memoized
+    def total(self, column):
+        return float(self.column(column).sum())
+
+    @memoized
+    def mean(self, column):
+        return float(self.column(column).mean()) if len(self) > 0 else 0.0
+
+    @memoized
+    def median(self, column):
+        return float(self.column(column).median()) if len(self) > 0 else 0.0
+
+    def _iter_rows(self, frame, chunksize=DEFAULT_CHUNKSIZE):
+        if self._rows is None:
+            yield from quality.iter_slices(frame, chunksize)
+            return
+        for start in range(0, len(self), chunksize):
+            yield frame.take(self._rows[start:start + chunksize])
+
+    def iter_full(self, chunksize=DEFAULT_CHUNKSIZE):
+        """Rows of the full export passing the filters, in frames of at most `chunksize` rows."""
+        yield from self._iter_rows(self.dataset.full_frame(), chunksize)
+
+    @memoized
+    def complete(self):
+        """Rows that have every column the cleaning plan requires."""
+        keep = self.dataset.complete_mask()
+        if self._rows is None:
+            return PandasSelection(self.dataset, _positions(keep))
+        rows = self._rows[keep[self._rows]]
+        rows.flags.writeable = False
+        return PandasSelection(self.dataset, rows)
+
+    @memoized
+    def profile(self):
+        """Data-quality profile of the selected rows as loaded, before cleaning."""
+        if self._rows is None:
+            return self.dataset.profile()
+        profile = quality.profile_chunks(self._iter_rows(self.dataset.raw_frame()), self.dataset.dtypes)
+        return profile.with_invalid(self.dataset.invalid_counts(self._rows))
+
+    @memoized
+    def cleaning_report(self):
+        return quality.cleaning_report(self.profile(), self.dataset.plan, len(self.complete()))
+
+    @memoized
+    def top_instances(self, n=5, columns=analysis.TOP_EC2_COLUMNS):
+        return analysis.top_instances(self.frame([*columns, "CostUSD"]), n, columns)
+
+    @memoized
+    def top_buckets(self, n=5, columns=analysis.TOP_S3_COLUMNS):
+        return analysis.top_buckets(self.frame([*columns, "TotalSizeGB"]), n, columns)
+
+    @memoized
+    def avg_cost_by_region(self):
+        return analysis.avg_cost_by_region(self.frame(["Region", "CostUSD"]))
+
+    @memoized
+    def cost_by_region(self):
+        return analysis.cost_by_region(self.frame(["Region", "CostUSD"]))
+
+    @memoized
+    def storage_by_region(self):
+        return analysis.storage_by_region(self.frame(["Region", "TotalSizeGB"]))
+
+    @memoized
+    def ec2_insights(self, recommendations=None):
+        return analysis.ec2_insights(self.frame(["Region", "State", "CostUSD", "CPUUtilization"]), recommendations)
+
+    def tag_keys(self):
+        return tags.tag_keys(self.dataset.frame)
+
+    @memoized
+    def cost_by_tag(self, key):
+        return tags.cost_by_tag(self.frame([tags.TAG_COLUMN_PREFIX + key, "CostUSD"]), key)
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def __init__(self, ec2, s3):
+        self.ec2 = ec2
+        self.s3 = s3
+
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _value_literal(value):
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, np.number)):
+        return repr(float(value))
+    return _literal(value)
+
+
+def _tag_pattern(key):
+    # Captures "=value" so an empty match means the key is absent, while "Key=" still yields "".
+    # The greedy prefix makes a repeated key match its last pair, as tags.parse_tag_string keeps it.
+    return r"^(?:.*,)?\s*" + re.escape(key) + r"\s*(=[^,]*)"
+
+
+def _reader(path):
+    if path.suffix == SNAPSHOT_SUFFIX:
+        return f"read_parquet({_literal(path)})"
+    nulls = ", ".join(_literal(s) for s in CSV_NULL_STRINGS)
+    return f"read_csv({_literal(path)}, header=true, nullstr=[{nulls}])"
+
+
+class DuckDBDataset:
+    """One or more export files registered as a DuckDB view or table.
+
+    Several files are combined with UNION ALL BY NAME plus an Account
+    column, reconciling missing columns the way finops.sources does. The
+    loaded rows go into `<name>_raw`, and `<name>` is a view of them with
+    the cleaning rules' imputations applied (see finops.quality). Numeric
+    and date columns the CSV reader left as text because of a dirty cell
+    are cast there too. The view carries each imputed or cast column's
+    original values under RAW_COLUMN_PREFIX for data-quality profiles.
+    """
+
+    def __init__(self, backend, name, paths, dtypes, rules=None):
+        self.backend = backend
+        self.name = name
+        self.paths = [Path(p) for p in ([paths] if isinstance(paths, (str, Path)) else paths)]
+        self.dtypes = dtypes
+        if len(self.paths) == 1:
+            select = f"SELECT * FROM {_reader(self.paths[0])}"
+        else:
+            select = self._union_select()
+        # Parquet is queried in place; CSV text is parsed once into a table.
+        kind = "VIEW" if all(p.suffix == SNAPSHOT_SUFFIX for p in self.paths) else "TABLE"
+        raw = _quote(f"{name}_raw")
+        backend.execute(f"CREATE OR REPLACE {kind} {raw} AS {select}")
+        self._profile = None
+        if quality.needs_profile(rules):
+            self._profile = quality.profile_chunks(backend.iter_query(f"SELECT * FROM {raw}"), dtypes)
+        raw_schema = backend.query(f"DESCRIBE {raw}")
+        raw_types = dict(zip(raw_schema["column_name"], raw_schema["column_type"]))
+        self.plan = quality.plan_cleaning(rules, list(raw_types), self._profile)
+        # A column the CSV sniffer read as text because of a dirty cell is
+        # cast back, with cells that do not parse left missing, as the loader does.
+        self._casts = {
+            column: sql_type
+            for columns, sql_type in ((numeric_columns(dtypes), "DOUBLE"), (DATE_COLUMNS, "TIMESTAMP"))
+            for column in columns
+            if raw_types.get(column) == "VARCHAR"
+        }
+        backend.execute(f"CREATE OR REPLACE VIEW {_quote(name)} AS {self._cleaned_select(raw)}")
+        schema = backend.query(f"DESCRIBE {_quote(name)}")
+        self.schema = schema[~schema["column_name"].str.startswith(RAW_COLUMN_PREFIX)].reset_index(drop=True)
+        self.columns = list(self.schema["column_name"])
+        self._options = {}
+        self._tag_keys = None
+        self._count = None
+        self._selections = SelectionCache()
+
+    def _replaced(self):
+        """Cleaned-view expression of each column that differs from its loaded values."""
+        replaced = {c: f"TRY_CAST({_quote(c)} AS {sql_type})" for c, sql_type in self._casts.items()}
+        for c, value in self.plan.fills.items():
+            replaced[c] = f"coalesce({replaced.get(c, _quote(c))}, {_value_literal(value)})"
+        return replaced
+
+    def _cleaned_select(self, raw):
+        replaced = self._replaced()
+        if not replaced:
+            return f"SELECT * FROM {raw}"
+        cleaned = ", ".join(f"{expr} AS {_quote(c)}" for c, expr in replaced.items())
+        originals = ", ".join(f"{_quote(c)} AS {_quote(RAW_COLUMN_PREFIX + c)}" for c in replaced)
+        return f"SELECT * REPLACE ({cleaned}), {originals} FROM {raw}"
+
+    def raw_select(self):
+        """Select list of every column with its values as loaded, before casts and imputation."""
+        replaced = self._replaced()
+        return ", ".join(
+            f"{_quote(RAW_COLUMN_PREFIX + c)} AS {_quote(c)}" if c in replaced else _quote(c)
+            for c in self.columns
+        )
+
+    def profile(self):
+        """Data-quality profile of every loaded row, computed once per dataset."""
+        if self._profile is None:
+            self._profile = self.profile_rows(f"FROM {_quote(self.name)}")
+        return self._profile
+
+    def profile_rows(self, source, params=None):
+        """Profile of the raw rows selected by the FROM/WHERE clause `source`, read in chunks."""
+        chunks = self.backend.iter_query(f"SELECT {self.raw_select()} {source}", params)
+        return quality.profile_chunks(chunks, self.dtypes)
+
+    def _union_select(self):
+        file_columns = [
+            list(self.backend.query(f"DESCRIBE SELECT * FROM {_reader(path)}")["column_name"])
+            for path in self.paths
+        ]
+        present = set().union(*file_columns)
+        selects = []
+        for path, columns in zip(self.paths, file_columns):
+            defaults = "".join(
+                f", {_literal(value)} AS {_quote(column)}"
+                for column, value in sources.RECONCILE_DEFAULTS.items()
+                if column in present and column not in columns
+            )
+            account = _literal(sources.account_for(path))
+            selects.append(f"SELECT *{defaults}, {account} AS {_quote(sources.ACCOUNT_COLUMN)} FROM {_reader(path)}")
+        return " UNION ALL BY NAME ".join(selects)
+
+    def __len__(self):
+        if self._count is None:
+            self._count = int(self.backend.query(f"SELECT count(*) FROM {_quote(self.name)}").iloc[0, 0])
+        return self._count
+
+    def column_expr(self, column):
+        """SQL expression for a real column or a derived "Tag:<key>" column."""
+        if column.startswith(tags.TAG_COLUMN_PREFIX):
+            pattern = _literal(_tag_pattern(column[len(tags.TAG_COLUMN_PREFIX):]))
+            raw = _quote(tags.TAGS_COLUMN)
+            return f"trim(nullif(regexp_extract({raw}, {pattern}, 1), '')[2:])"
+        return _quote(column)
+
+    def has_column(self, column):
+        if column.startswith(tags.TAG_COLUMN_PREFIX):
+            return column in self.tag_columns()
+        return column in self.columns
+
+    def options(self, column):
+        if not self.has_column(column):
+            return []
+        if column not in self._options:
+            expr = self.column_expr(column)
+            result = self.backend.query(
+                f"SELECT DISTINCT {expr} AS value FROM {_quote(self.name)} WHERE {expr} IS NOT NULL ORDER BY value"
+            )
+            self._options[column] = list(result["value"])
+        return list(self._options[column])
+
+    def tag_keys(self):
+        if self._tag_keys is None:
+            if tags.TAGS_COLUMN not in self.columns:
+                self._tag_keys = []
+            else:
+                result = self.backend.query(f"""
+                    SELECT DISTINCT key FROM (
+                        SELECT trim(split_part(pair, '=', 1)) AS key
+                        FROM (SELECT unnest(string_split({_quote(tags.TAGS_COLUMN)}, ',')) AS pair
+                              FROM {_quote(self.name)})
+                        WHERE contains(pair, '=')
+                    ) WHERE key <> '' ORDER BY key
+                """)
+                self._tag_keys = list(result["key"])
+        return list(self._tag_keys)
+
+    def tag_columns(self):
+        return [tags.TAG_COLUMN_PREFIX + key for key in self.tag_keys()]
+
+    def select(self, filters):
+        return self._selections.get(filters, lambda: self._build_selection(filters))
+
+    def _build_selection(self, filters):
+        clauses, params = [], []
+        for column, selected in filters.items():
+            if len(selected) > 0 and self.has_column(column):
+                clauses.append(f"{self.column_expr(column)} IN ({', '.join('?' for _ in selected)})")
+                params.extend(str(value) for value in selected)
+        return DuckDBSelection(self, clauses, params)
+
+
+class DuckDBSelection(Selection):
+    """A filtered dataset; every method runs one SQL query with the filters pushed down."""
+
+    def __init__(self, dataset, clauses, params):
+        super().__init__()
+        self.dataset = dataset
+        self.clauses = clauses
+        self.params = params
+
+    def _from(self, extra=()):
+        clauses = self.clauses + list(extra)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return f"FROM {_quote(self.dataset.name)}{where}"
+
+    def _query(self, select, suffix="", extra=()):
+        return self.dataset.backend.query(f"SELECT {select} {self._from(extra)} {suffix}", self.params)
+
+    def _scalar(self, select):
+        return self._query(select).iloc[0, 0]
+
+    def __len__(self):
+        return self._count()
+
+    @memoized
+    def _count(self):
+        return int(self._scalar("count(*)"))
+
+    @memoized
+    def frame(self, columns=None):
+        """Rows passing the filters, projected to `columns` and typed like the loaders."""
+        if columns is None:
+            columns = self.dataset.columns + self.dataset.tag_columns()
+        columns = [c for c in columns if self.dataset.has_column(c)]
+        select = ", ".join(f"{self.dataset.column_expr(c)} AS {_quote(c)}" for c in columns)
+        df = self._query(select or "NULL AS _")
+        df = df[columns]
+        for column in columns:
+            if column.startswith(tags.TAG_COLUMN_PREFIX):
+                df[column] = df[column].astype("category")
+        return apply_schema(df, self.dataset.dtypes)
+
+    def column(self, name):
+        return self.frame([name])[name]
+
+    @memoized
+    def total(self, column):
+        value = self._scalar(f"sum({_quote(column)})")
+        return 0.0 if pd.isna(value) else float(value)
+
+    @memoized
+    def mean(self, column):
+        value = self._scalar(f"avg({_quote(column)})")
+        return 0.0 if pd.isna(value) else float(value)
+
+    @memoized
+    def median(self, column):
+        value = self._scalar(f"median({_quote(column)})")
+        return 0.0 if pd.isna(value) else float(value)
+
+    def iter_full(self, chunksize=DEFAULT_CHUNKSIZE):
+        """Rows of the export passing the filters, fetched in frames of at most `chunksize` rows."""
+        select = ", ".join(_quote(c) for c in self.dataset.columns)
+        for df in self.dataset.backend.iter_query(f"SELECT {select} {self._from()}", self.params, chunksize):
+            yield apply_schema(df, self.dataset.dtypes)
+
+    @memoized
+    def complete(self):
+        """Rows that have every column the cleaning plan requires."""
+        not_null = [f"{_quote(c)} IS NOT NULL" for c in self.dataset.plan.required]
+        return DuckDBSelection(self.dataset, self.clauses + not_null, self.params)
+
+    @memoized
+    def profile(self):
+        """Data-quality profile of the selected rows as loaded, before cleaning."""
+        if not self.clauses:
+            return self.dataset.profile()
+        return self.dataset.profile_rows(self._from(), self.params)
+
+    @memoized
+    def cleaning_report(self):
+        return quality.cleaning_report(self.profile(), self.dataset.plan, len(self.complete()))
+
+    def _top(self, by, n, columns):
+        select = ", ".join(_quote(c) for c in columns)
+        df = self._query(select, f"ORDER BY {_quote(by)} DESC NULLS LAST LIMIT {int(n)}")
+        return apply_schema(df, self.dataset.dtypes)
+
+    @memoized
+    def top_instances(self, n=5, columns=analysis.TOP_EC2_COLUMNS):
+        return self._top("CostUSD", n, columns)
+
+    @memoized
+    def top_buckets(self, n=5, columns=analysis.TOP_S3_COLUMNS):
+        return self._top("TotalSizeGB", n, columns)
+
+    def _by_region(self, aggregate, column):
+        df = self._query(f"Region, {aggregate}({_quote(column)}) AS value",
+                         "GROUP BY Region ORDER BY value DESC", extra=["Region IS NOT NULL"])
+        return pd.Series(df["value"].to_numpy(dtype="float64"), index=pd.Index(df["Region"], name="Region"),
+                         name=column)
+
+    @memoized
+    def avg_cost_by_region(self):
+        return self._by_region("avg", "CostUSD")
+
+    @memoized
+    def cost_by_region(self):
+        return self._by_region("sum", "CostUSD")
+
+    @memoized
+    def storage_by_region(self):
+        return self._by_region("sum", "TotalSizeGB")
+
+    @memoized
+    def _insight_counts(self):
+        underutilized = f"CPUUtilization < {analysis.UNDERUTILIZED_CPU_THRESHOLD} AND CostUSD > median_cost"
+        sql = f"""
+            WITH selected AS (SELECT CostUSD, CPUUtilization, State {self._from()}),
+                 median AS (SELECT median(CostUSD) AS median_cost FROM selected)
+            SELECT count(*) FILTER (WHERE {underutilized}) AS underutilized_count,
+                   coalesce(sum(CostUSD) FILTER (WHERE {underutilized}), 0) AS potential_savings,
+                   count(*) FILTER (WHERE State = 'stopped') AS stopped_count
+            FROM selected, median
+        """
+        return self.dataset.backend.query(sql, self.params).iloc[0]
+
+    def ec2_insights(self, recommendations=None):
+        """Same keys and rules as analysis.ec2_insights, computed in SQL."""
+        row = self._insight_counts()
+        if recommendations is not None:
+            underutilized_count = int(recommendations["RecommendedType"].notna().sum())
+            potential_savings = float(recommendations["SavingsUSD"].sum())
+            savings_source = "rightsizing"
+        else:
+            underutilized_count = int(row["underutilized_count"])
+            potential_savings = float(row["potential_savings"])
+            savings_source = "heuristic"
+        regions = self.cost_by_region()
+        return {
+            "underutilized_count": underutilized_count,
+            "potential_savings": potential_savings,
+            "savings_source": savings_source,
+            "stopped_count": int(row["stopped_count"]),
+            "highest_cost_region": regions.index[0] if len(regions) else None,
+            "highest_cost_region_total": float(regions.iloc[0]) if len(regions) else 0.0,
+        }
+
+    def tag_keys(self):
+        return self.dataset.tag_keys()
+
+    @memoized
+    def cost_by_tag(self, key, value="CostUSD"):
+        """Same columns and ordering as tags.cost_by_tag."""
+        column = tags.TAG_COLUMN_PREFIX + key
+        label = self.dataset.column_expr(column) if self.dataset.has_column(column) else "NULL"
+        df = self._query(
+            f"coalesce({label}, {_literal(tags.UNTAGGED)}) AS label, sum({_quote(value)}) AS Total, "
+            f"count({_quote(value)}) AS Count",
+            f"GROUP BY label HAVING count({_quote(value)}) > 0 ORDER BY Total DESC",
+        )
+        total = df["Total"].sum()
+        return pd.DataFrame({
+            key: df["label"].astype(str).to_numpy(),
+            "Total": df["Total"].to_numpy(dtype="float64"),
+            "Count": df["Count"].to_numpy(dtype="int64"),
+            "Share": (df["Total"] / total).to_numpy() if total else 0.0,
+        })
+
+
+class DuckDBBackend:
+    """DuckDB over the compute and S3 export files (CSV or Parquet snapshot).
+
+    `compute_paths` and `s3_paths` are each one path or a list of paths;
+    `rules` maps "compute" and "s3" to their cleaning rules (see
+    finops.quality.cleaning_rules()).
+    """
+
+    name = "duckdb"
+
+    def __init__(self, compute_paths, s3_paths, rules=None):
+        import duckdb
+
+        rules = rules or {}
+        self.connection = duckdb.connect()
+        self.ec2 = DuckDBDataset(self, "ec2", compute_paths, COMPUTE_DTYPES, rules.get("compute"))
+        self.s3 = DuckDBDataset(self, "s3", s3_paths, S3_DTYPES, rules.get("s3"))
+
+    def execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params or [])
+
+    def query(self, sql, params=None):
+        # A cursor per query keeps concurrent Streamlit sessions off each other's result sets.
+        with self.connection.cursor() as cursor:
+            return cursor.execute(sql, params or []).df()
+
+    def iter_query(self, sql, params=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Yield the result of `sql` as frames of at most `chunksize` rows."""
+        with self.connection.cursor() as cursor:
+            for batch in cursor.execute(sql, params or []).to_arrow_reader(chunksize):
+                yield batch.to_pandas()
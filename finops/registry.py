@@ -0,0 +1,98 @@
+"""
+Process-wide registry of loaded datasets, shared read-only by every session.
+
+Streamlit runs the dashboard script once per browser session, and
+st.cache_data hands every caller its own unpickled copy of a cached frame,
+so memory grew with each analyst who opened the dashboard. The registry
+keeps exactly one loaded frame per dataset for the whole process instead:
+
+- A dataset is a name ("compute", "s3") plus the file signatures of the
+  exports behind it. acquire() loads it on first use, once even when several
+  sessions ask at the same time, and returns a copy-on-write view of the
+  shared frame: a holder that modifies its view copies only the columns it
+  touches and never changes what other sessions see.
+- Views are reference-counted. Each live view counts as one reference and
+  drops it when garbage collected, so stats() shows how many holders share
+  each copy.
+- When any export changes, so do its signatures. The next acquire() loads
+  the new data and evicts the stale entry; its memory is freed as soon as
+  the last session still showing the old data moves on. prune() drops
+  datasets nobody holds a view of, such as uploads from closed sessions.
+
+Sessions then filter through row positions (see PandasSelection) rather
+than keeping their own filtered copies.
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass, field
+
+
+@dataclass
+class _Entry:
+    signatures: tuple
+    frame: object
+    refs: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class DatasetRegistry:
+    """One shared frame per dataset name, replaced when its files change."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, name, signatures, load):
+        """A copy-on-write view of dataset `name` at `signatures`.
+
+        `load` is called with no arguments to read the data when no current
+        copy is registered.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.signatures != signatures:
+                # A changed file replaces the entry; sessions still holding
+                # views of the old frame keep it alive until they drop them.
+                entry = _Entry(signatures, None)
+                self._entries[name] = entry
+        with entry.lock:
+            if entry.frame is None:
+                entry.frame = load()
+        view = entry.frame.copy(deep=False)
+        with self._lock:
+            entry.refs += 1
+        weakref.finalize(view, self._release, entry)
+        return view
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+
+    def evict(self, name):
+        """Forget dataset `name`; existing views stay valid."""
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def prune(self, prefix=""):
+        """Forget datasets whose name starts with `prefix` and that no view refers to."""
+        with self._lock:
+            for name in [name for name, entry in self._entries.items()
+                         if name.startswith(prefix) and entry.refs == 0]:
+                del self._entries[name]
+
+    def stats(self):
+        """One dict per registered dataset: files, rows, bytes and live views."""
+        with self._lock:
+            entries = list(self._entries.items())
+        return [
+            {
+                "dataset": name,
+                "files": len(entry.signatures),
+                "rows": len(entry.frame),
+                "bytes": int(entry.frame.memory_usage(deep=True).sum()),
+                "views": entry.refs,
+            }
+            for name, entry in entries
+            if entry.frame is not None
+        ]
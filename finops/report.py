@@ -0,0 +1,201 @@
+"""
+Headless batch report: run the dashboard's analysis for many accounts.
+
+Usage:
+    python -m finops.report ACCOUNT_DIR [ACCOUNT_DIR ...] --output reports [--workers 4] [--no-charts]
+
+Each account directory holds that account's compute and S3 exports (CSV or
+Parquet snapshot, same file names as the dashboard expects). Accounts are
+processed in parallel on a process pool, and for each one the report writes
+into `<output>/<account>/`:
+
+- summary.json: cleaning report, totals and the Insights tab numbers
+- ec2_data_quality.csv, s3_data_quality.csv: the Data Overview tab's
+  per-column profile (missing, non-conforming and distinct values)
+- top_instances.csv, top_buckets.csv
+- avg_cost_by_region.csv, storage_by_region.csv
+- rightsizing_recommendations.csv (when an instance-type catalog is available)
+- ec2_cost_anomalies.csv, s3_cost_anomalies.csv: resources whose cost deviates
+  sharply from their Region x type/class peers (see finops.anomalies)
+- ec2_cost_by_tag_<key>.csv, s3_cost_by_tag_<key>.csv for every tag key
+  (characters not safe in a file name are replaced by "_", and such names get
+  a short hash of the key so two keys never share a file)
+- the dashboard charts as PNG files (unless --no-charts)
+
+An `accounts_summary.csv` with one row per account is written to `<output>`.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from finops import analysis, anomalies, quality, rightsizing, tags
+from finops.loader import COMPUTE_DTYPES, COMPUTE_STEM, S3_DTYPES, S3_STEM, find_dataset, load_compute, load_s3
+
+DEFAULT_CATALOG = Path(__file__).resolve().parent.parent / rightsizing.CATALOG_FILENAME
+DEFAULT_CLEANING_RULES = Path(__file__).resolve().parent.parent / quality.RULES_FILENAME
+
+
+def load_account(account_dir):
+    """Load one account's exports, raising FileNotFoundError if either is missing."""
+    compute_path = find_dataset(account_dir, COMPUTE_STEM)
+    s3_path = find_dataset(account_dir, S3_STEM)
+    missing = [stem for stem, path in ((COMPUTE_STEM, compute_path), (S3_STEM, s3_path)) if path is None]
+    if missing:
+        raise FileNotFoundError(f"{account_dir}: missing {', '.join(missing)} export")
+    return load_compute(compute_path), load_s3(s3_path)
+
+
+def clean(df, rules, dtypes):
+    """(rows kept by the cleaning rules with imputed values, profile, cleaning report)."""
+    profile = quality.profile_chunks(quality.iter_slices(df), dtypes)
+    plan = quality.plan_cleaning(rules, df.columns, profile)
+    cleaned = quality.apply_plan(df, plan)
+    keep = quality.required_mask(cleaned, plan)
+    return cleaned[keep], profile, quality.cleaning_report(profile, plan, keep.sum())
+
+
+def filename_slug(text):
+    """`text` made safe for a file name, unique per `text`.
+
+    Unsafe characters are replaced by "_"; when any were, a short hash of
+    `text` is appended so that e.g. "a/b" and "a:b" do not share a name.
+    """
+    slug = re.sub(r"[^\w.-]", "_", text)
+    if slug == text:
+        return slug
+    return f"{slug}_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
+
+
+def build_account_report(account_dir, output_dir, include_charts=True, density_threshold=None,
+                         catalog_path=None, rules_path=None):
+    """Write the full report for one account and return its summary dict.
+
+    With a `catalog_path` the underutilized/savings insight comes from the
+    rightsizing engine and rightsizing_recommendations.csv is written.
+    `rules_path` is a cleaning_rules.json overriding the default cleaning
+    rules (see finops.quality).
+    """
+    account_dir = Path(account_dir)
+    output_dir = Path(output_dir)
+
+    ec2_df, s3_df = load_account(account_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rules = quality.cleaning_rules(rules_path)
+    ec2, ec2_profile, ec2_cleaning = clean(ec2_df, rules["compute"], COMPUTE_DTYPES)
+    s3, s3_profile, s3_cleaning = clean(s3_df, rules["s3"], S3_DTYPES)
+    cleaning = {"ec2": ec2_cleaning, "s3": s3_cleaning}
+    ec2_profile.summary().to_csv(output_dir / "ec2_data_quality.csv", index=False)
+    s3_profile.summary().to_csv(output_dir / "s3_data_quality.csv", index=False)
+
+    recommendations = None
+    if catalog_path is not None:
+        recommendations = rightsizing.rightsize(ec2, rightsizing.load_catalog(catalog_path))
+        rightsizing.recommendation_table(ec2, recommendations).to_csv(
+            output_dir / "rightsizing_recommendations.csv", index=False
+        )
+
+    summary = {"account": account_dir.name, "cleaning": cleaning, **analysis.summarize(ec2, s3, recommendations)}
+
+    ec2_anomalies = anomalies.score(ec2, anomalies.EC2_GROUPS)
+    s3_anomalies = anomalies.score(s3, anomalies.S3_GROUPS)
+    anomalies.anomaly_table(ec2, ec2_anomalies, ["ResourceId", "Region", "InstanceType", "CostUSD"]).to_csv(
+        output_dir / "ec2_cost_anomalies.csv", index=False
+    )
+    anomalies.anomaly_table(s3, s3_anomalies, ["BucketName", "Region", "StorageClass", "CostUSD"]).to_csv(
+        output_dir / "s3_cost_anomalies.csv", index=False
+    )
+    summary["anomalies"] = {"ec2": anomalies.summary(ec2_anomalies), "s3": anomalies.summary(s3_anomalies)}
+
+    analysis.top_instances(ec2).to_csv(output_dir / "top_instances.csv", index=False)
+    analysis.top_buckets(s3).to_csv(output_dir / "top_buckets.csv", index=False)
+    analysis.avg_cost_by_region(ec2).to_frame(name="AvgCostUSD").to_csv(output_dir / "avg_cost_by_region.csv")
+    analysis.storage_by_region(s3).to_frame(name="TotalSizeGB").to_csv(output_dir / "storage_by_region.csv")
+
+    ec2_tagged = tags.with_tag_columns(ec2)
+    s3_tagged = tags.with_tag_columns(s3)
+    for key in sorted(set(tags.tag_keys(ec2_tagged)) | set(tags.tag_keys(s3_tagged))):
+        slug = filename_slug(key)
+        tags.cost_by_tag(ec2_tagged, key).to_csv(output_dir / f"ec2_cost_by_tag_{slug}.csv", index=False)
+        tags.cost_by_tag(s3_tagged, key).to_csv(output_dir / f"s3_cost_by_tag_{slug}.csv", index=False)
+
+    if include_charts:
+        from finops import charts
+
+        charts.apply_theme()
+        threshold = charts.DENSITY_THRESHOLD if density_threshold is None else density_threshold
+        for filename, draw, data, params in charts.dashboard_charts(ec2, s3, density_threshold=threshold):
+            (output_dir / filename).write_bytes(charts.render_chart(draw, data, **params))
+
+    with open(output_dir / "summary.json", "w") as fh:
+        json.dump(summary, fh, indent=2, default=str)
+    return summary
+
+
+def _run_one(args):
+    account_dir, output_dir, options = args
+    try:
+        return build_account_report(account_dir, output_dir, **options)
+    except Exception as exc:
+        return {"account": Path(account_dir).name, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def run(account_dirs, output_root, workers=None, **options):
+    """Build reports for every account directory; returns the list of summaries.
+
+    `options` are passed through to build_account_report.
+    """
+    output_root = Path(output_root)
+    jobs = [(str(d), str(output_root / Path(d).name), options) for d in account_dirs]
+    if workers == 1 or len(jobs) <= 1:
+        summaries = [_run_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(_run_one, jobs))
+
+    output_root.mkdir(parents=True, exist_ok=True)
+    rows = []
+    for summary in summaries:
+        row = {k: v for k, v in summary.items() if k not in ("cleaning", "insights", "anomalies")}
+        row.update(summary.get("insights", {}))
+        for service, counts in summary.get("anomalies", {}).items():
+            row[f"{service}_anomalies"] = counts["anomaly_count"]
+        rows.append(row)
+    pd.DataFrame(rows).convert_dtypes().to_csv(output_root / "accounts_summary.csv", index=False)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate FinOps reports for many account directories.")
+    parser.add_argument("accounts", nargs="+", help="Account directories containing the exports")
+    parser.add_argument("--output", default="reports", help="Output directory (default: reports)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-charts", action="store_true", help="Skip PNG chart generation")
+    parser.add_argument("--density-threshold", type=int, default=None,
+                        help="Draw scatter plots as density heatmaps above this many points")
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG) if DEFAULT_CATALOG.exists() else None,
+                        help="Instance-type catalog CSV for rightsizing (default: the bundled catalog)")
+    parser.add_argument("--cleaning-rules",
+                        default=str(DEFAULT_CLEANING_RULES) if DEFAULT_CLEANING_RULES.exists() else None,
+                        help=f"Per-column cleaning rules JSON (default: {quality.RULES_FILENAME} next to the "
+                             "dashboard, if present)")
+    args = parser.parse_args(argv)
+
+    summaries = run(args.accounts, args.output, args.workers, include_charts=not args.no_charts,
+                    density_threshold=args.density_threshold, catalog_path=args.catalog,
+                    rules_path=args.cleaning_rules)
+    failed = [s for s in summaries if "error" in s]
+    for summary in summaries:
+        status = summary.get("error", "ok")
+        print(f"{summary['account']}: {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
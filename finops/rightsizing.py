@@ -0,0 +1,122 @@
+"""
+Vectorized EC2 rightsizing against a local instance-type catalog.
+
+For every running instance the engine works out the capacity it actually
+needs (vCPU, memory and network, each scaled by observed utilization and a
+target utilization ceiling) and picks the cheapest catalog type that still
+fits. Projected cost scales the observed CostUSD by the price ratio of the
+recommended and current types.
+
+The catalog (instance_type_catalog.csv) has one row per InstanceType with
+Family, vCPU, MemoryGiB, NetworkMbps (baseline bandwidth) and
+HourlyPriceUSD. Instances are scored in blocks of rows against the whole
+catalog with NumPy broadcasting, so there are no per-row Python loops.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATALOG_FILENAME = "instance_type_catalog.csv"
+DEFAULT_TARGET_UTILIZATION = 0.8
+BLOCK_SIZE = 200_000
+
+CATALOG_DTYPES = {
+    "InstanceType": "str",
+    "Family": "str",
+    "vCPU": "float32",
+    "MemoryGiB": "float32",
+    "NetworkMbps": "float32",
+    "HourlyPriceUSD": "float64",
+}
+
+RECOMMENDATION_COLUMNS = ["RecommendedType", "CurrentHourlyUSD", "RecommendedHourlyUSD",
+                          "ProjectedCostUSD", "SavingsUSD"]
+
+
+def load_catalog(path):
+    return pd.read_csv(path, dtype=CATALOG_DTYPES)
+
+
+def required_capacity(ec2, specs, target_utilization=DEFAULT_TARGET_UTILIZATION):
+    """(vCPU, GiB, Mbps) each instance needs to stay under `target_utilization`."""
+    cpu = ec2["CPUUtilization"].to_numpy(dtype="float64") / 100.0
+    memory = ec2["MemoryUtilization"].to_numpy(dtype="float64") / 100.0
+    network_bps = ec2["NetworkIn_Bps"].to_numpy(dtype="float64") + ec2["NetworkOut_Bps"].to_numpy(dtype="float64")
+    return (
+        specs["vCPU"] * cpu / target_utilization,
+        specs["MemoryGiB"] * memory / target_utilization,
+        network_bps * 8 / 1e6 / target_utilization,
+    )
+
+
+def rightsize(ec2, catalog, target_utilization=DEFAULT_TARGET_UTILIZATION, same_family=True,
+              block_size=BLOCK_SIZE):
+    """Recommend the cheapest fitting instance type for every row of `ec2`.
+
+    Returns a frame aligned with ec2.index holding RECOMMENDATION_COLUMNS.
+    RecommendedType is missing (and SavingsUSD is 0) for instances that are
+    not running, whose type is not in the catalog, or that already run on
+    the cheapest type that fits.
+    """
+    catalog = catalog.sort_values("HourlyPriceUSD", kind="stable").reset_index(drop=True)
+    cat_vcpu = catalog["vCPU"].to_numpy(dtype="float64")
+    cat_memory = catalog["MemoryGiB"].to_numpy(dtype="float64")
+    cat_network = catalog["NetworkMbps"].to_numpy(dtype="float64")
+    cat_price = catalog["HourlyPriceUSD"].to_numpy(dtype="float64")
+    cat_family = pd.factorize(catalog["Family"])[0]
+
+    type_codes = pd.Index(catalog["InstanceType"]).get_indexer(ec2["InstanceType"].astype(object))
+    known = type_codes >= 0
+    safe_codes = np.where(known, type_codes, 0)
+    specs = {
+        "vCPU": cat_vcpu[safe_codes],
+        "MemoryGiB": cat_memory[safe_codes],
+    }
+    current_price = np.where(known, cat_price[safe_codes], np.nan)
+    current_family = np.where(known, cat_family[safe_codes], -1)
+
+    need_vcpu, need_memory, need_network = required_capacity(ec2, specs, target_utilization)
+    eligible = known & np.isfinite(need_vcpu) & np.isfinite(need_memory) & np.isfinite(need_network)
+    if "State" in ec2.columns:
+        eligible &= (ec2["State"] == "running").to_numpy()
+
+    recommended = np.full(len(ec2), -1, dtype=np.int64)
+    for start in range(0, len(ec2), block_size):
+        rows = slice(start, start + block_size)
+        fits = (
+            (cat_vcpu[None, :] >= need_vcpu[rows, None])
+            & (cat_memory[None, :] >= need_memory[rows, None])
+            & (cat_network[None, :] >= need_network[rows, None])
+            & (cat_price[None, :] < current_price[rows, None])
+        )
+        if same_family:
+            fits &= cat_family[None, :] == current_family[rows, None]
+        # The catalog is sorted by price, so the first fitting column is the cheapest.
+        cheapest = fits.argmax(axis=1)
+        recommended[rows] = np.where(fits.any(axis=1) & eligible[rows], cheapest, -1)
+
+    has_recommendation = recommended >= 0
+    safe_recommended = np.where(has_recommendation, recommended, 0)
+    recommended_price = np.where(has_recommendation, cat_price[safe_recommended], current_price)
+    cost = ec2["CostUSD"].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected = np.where(has_recommendation, cost * recommended_price / current_price, cost)
+
+    return pd.DataFrame({
+        "RecommendedType": pd.Categorical.from_codes(
+            np.where(has_recommendation, recommended, -1), categories=catalog["InstanceType"]
+        ),
+        "CurrentHourlyUSD": current_price,
+        "RecommendedHourlyUSD": np.where(has_recommendation, recommended_price, np.nan),
+        "ProjectedCostUSD": projected,
+        "SavingsUSD": np.where(has_recommendation, cost - projected, 0.0),
+    }, index=ec2.index)
+
+
+def recommendation_table(ec2, recommendations, n=None):
+    """Instances with a recommendation, largest savings first."""
+    columns = [c for c in ["ResourceId", "Region", "InstanceType", "CPUUtilization", "MemoryUtilization", "CostUSD"]
+               if c in ec2.columns]
+    table = ec2[columns].join(recommendations[["RecommendedType", "ProjectedCostUSD", "SavingsUSD"]])
+    table = table[table["RecommendedType"].notna()].sort_values("SavingsUSD", ascending=False)
+    return table if n is None else table.head(n)
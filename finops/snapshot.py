@@ -0,0 +1,55 @@
+"""
+Convert the compute and S3 CSV exports into compressed Parquet snapshots.
+
+Usage:
+    python -m finops.snapshot [DIRECTORY ...] [--compression zstd]
+
+Each `<name>.csv` is written to `<name>.parquet` in the same folder. The
+dashboard picks the snapshot up automatically on the next run.
+"""
+
+import argparse
+from pathlib import Path
+
+from finops.loader import (
+    COMPUTE_STEM,
+    S3_STEM,
+    load_compute_csv,
+    load_s3_csv,
+    snapshot_path,
+)
+
+
+def write_snapshot(csv_path, loader, compression="zstd"):
+    """Parse `csv_path` with its typed loader and write the Parquet snapshot."""
+    df = loader(csv_path)
+    target = snapshot_path(csv_path)
+    tmp_target = target.with_suffix(target.suffix + ".tmp")
+    df.to_parquet(tmp_target, engine="pyarrow", compression=compression, index=False)
+    tmp_target.replace(target)
+    return target
+
+
+def convert_directory(base_dir, compression="zstd"):
+    """Snapshot whichever of the two exports exist in base_dir."""
+    written = []
+    for stem, loader in ((COMPUTE_STEM, load_compute_csv), (S3_STEM, load_s3_csv)):
+        csv_path = Path(base_dir) / f"{stem}.csv"
+        if csv_path.exists():
+            written.append(write_snapshot(csv_path, loader, compression))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert FinOps CSV exports to Parquet snapshots.")
+    parser.add_argument("directories", nargs="*", default=[str(Path(__file__).resolve().parent.parent)])
+    parser.add_argument("--compression", default="zstd", help="Parquet codec (zstd, snappy, gzip, ...)")
+    args = parser.parse_args(argv)
+
+    for directory in args.directories:
+        for target in convert_directory(directory, args.compression):
+            print(f"Wrote {target}")
+
+
+if __name__ == "__main__":
+    main()
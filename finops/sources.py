@@ -0,0 +1,197 @@
+"""
+Multi-account, multi-file inputs.
+
+An organization usually has one compute and one S3 export per account (and
+often per region). FINOPS_DATA lists directories and glob patterns,
+separated by os.pathsep (":" on Linux/macOS):
+
+    FINOPS_DATA="exports/:archive/2025-*/**/aws_resources_*.parquet" streamlit run aws_eda.py
+
+Directories are searched recursively. A file is a compute export if its name
+starts with aws_resources_compute and an S3 export if it starts with
+aws_resources_S3 (e.g. aws_resources_compute_us-east-1.csv). When both a CSV
+and its Parquet snapshot match, the snapshot wins under the same rule as
+find_dataset().
+
+Files are read concurrently on a thread pool (the CSV and Parquet readers
+release the GIL for most of the parse) and concatenated column by column
+into one frame with an Account column:
+
+- Account is the nearest 12-digit AWS account ID in the file's path, or
+  else the name of the directory holding the file, skipping region-named
+  directories such as us-east-1/ (see account_for()).
+- Columns a file lacks are filled with RECONCILE_DEFAULTS where there is
+  one, and left missing otherwise.
+- Categorical columns are combined with union_categoricals, so they stay
+  compact codes, and each file's columns are released as soon as they have
+  been copied into the result.
+"""
+
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from finops.loader import INVALID_VALUES_ATTR, SNAPSHOT_SUFFIX, invalid_values, read_dataset, snapshot_supported
+
+DATA_ENV_VAR = "FINOPS_DATA"
+ACCOUNT_COLUMN = "Account"
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Values for a column an export omits entirely: compute exports only list
+# EC2. A bucket's encryption is not implied by anything, so it is marked
+# "Unknown" rather than left missing, which the S3 cleaning rules would
+# read as an unencrypted bucket (see finops.quality).
+RECONCILE_DEFAULTS = {"ResourceType": "EC2", "Encryption": "Unknown"}
+
+_ACCOUNT_ID = re.compile(r"(?<!\d)(\d{12})(?!\d)")
+_REGION = re.compile(r"^[a-z]{2}(-gov)?-[a-z]+-\d+$")
+_EXTENSIONS = (".csv", SNAPSHOT_SUFFIX)
+
+
+def data_patterns():
+    """Directories and globs from FINOPS_DATA (empty when unset)."""
+    value = os.environ.get(DATA_ENV_VAR, "")
+    return [part for part in value.split(os.pathsep) if part.strip()]
+
+
+def _matches(path, stem):
+    return path.is_file() and path.name.startswith(stem) and path.suffix in _EXTENSIONS
+
+
+def expand_inputs(patterns, stem):
+    """Sorted export files for `stem` matching any directory or glob pattern."""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern).expanduser()
+        if path.is_dir():
+            candidates = path.rglob(f"{stem}*")
+        else:
+            candidates = (Path(p) for p in glob.glob(str(path), recursive=True))
+        found.update(p.resolve() for p in candidates if _matches(p, stem))
+
+    if snapshot_supported():
+        # Prefer a snapshot over the CSV it was built from unless the CSV is newer.
+        for parquet in [p for p in found if p.suffix == SNAPSHOT_SUFFIX]:
+            csv = parquet.with_suffix(".csv")
+            if csv in found and parquet.stat().st_mtime_ns >= csv.stat().st_mtime_ns:
+                found.discard(csv)
+            elif csv in found:
+                found.discard(parquet)
+    else:
+        found = {p for p in found if p.suffix != SNAPSHOT_SUFFIX}
+    return sorted(found)
+
+
+def account_id_for(path):
+    """The nearest 12-digit AWS account ID in an export file's path, or None."""
+    path = Path(path)
+    for part in reversed(path.parts[:-1] + (path.stem,)):
+        match = _ACCOUNT_ID.search(part)
+        if match:
+            return match.group(1)
+    return None
+
+
+def account_for(path):
+    """Account name for an export file: a 12-digit ID in its path, else its folder name."""
+    path = Path(path)
+    account_id = account_id_for(path)
+    if account_id is not None:
+        return account_id
+    for part in reversed(path.parts[:-1]):
+        if not _REGION.match(part):
+            return part
+    return path.stem
+
+
+def _filled(length, dtype, value=None):
+    """A column of `length` copies of `value` (missing when None) for a file that lacks it."""
+    if dtype == "category":
+        categories = [] if value is None else [value]
+        code = -1 if value is None else 0
+        return pd.Series(pd.Categorical.from_codes(np.full(length, code, dtype=np.int8), categories=categories))
+    if value is None:
+        return pd.Series(index=pd.RangeIndex(length), dtype=dtype or "object")
+    return pd.Series(np.full(length, value, dtype=object), dtype=dtype)
+
+
+def _combine_column(pieces):
+    # An all-missing piece (e.g. a chunk of blank rows) parses as float or
+    # with empty object categories; give it the type of the other pieces so
+    # the column keeps its dtype and union_categoricals accepts it.
+    present = [piece for piece in pieces if piece.notna().any()]
+    kinds = {str(piece.dtype) for piece in present}
+    if len(kinds) == 1 and len(present) < len(pieces):
+        dtype = present[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            empty = pd.CategoricalDtype(pd.Index([], dtype=dtype.categories.dtype))
+            pieces = [piece if piece.notna().any() else piece.astype(empty) for piece in pieces]
+        elif not pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            pieces = [piece if piece.notna().any() else piece.astype(dtype) for piece in pieces]
+    if all(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+        return pd.Series(union_categoricals([piece.array for piece in pieces], sort_categories=True))
+    return pd.concat(pieces, ignore_index=True)
+
+
+def combine_frames(frames, dtypes, accounts=None, columns=None):
+    """Concatenate typed frames with differing columns into one frame.
+
+    The frames are consumed: each column is popped from its frame once it
+    has been copied into the result, so peak memory stays near one extra
+    column rather than a second copy of every file. With `accounts` (one
+    name per frame) an Account categorical is added.
+    """
+    if columns is None:
+        columns = []
+        for frame in frames:
+            columns.extend(c for c in frame.columns if c not in columns)
+    lengths = [len(frame) for frame in frames]
+    offsets = np.cumsum([0, *lengths[:-1]])
+    invalid = {}
+    for frame, offset in zip(frames, offsets):
+        for column, positions in invalid_values(frame).items():
+            if column in columns:
+                invalid.setdefault(column, []).append(positions + offset)
+
+    data = {}
+    for column in columns:
+        dtype = dtypes.get(column)
+        pieces = []
+        for frame, length in zip(frames, lengths):
+            if column in frame.columns:
+                pieces.append(frame.pop(column).reset_index(drop=True))
+            else:
+                pieces.append(_filled(length, dtype, RECONCILE_DEFAULTS.get(column)))
+        data[column] = _combine_column(pieces)
+
+    if accounts is not None:
+        names = sorted(set(accounts))
+        codes = np.repeat([names.index(account) for account in accounts], lengths)
+        data[ACCOUNT_COLUMN] = pd.Categorical.from_codes(codes.astype(np.int32), categories=names)
+    combined = pd.DataFrame(data, columns=list(data), copy=False)
+    if invalid:
+        combined.attrs[INVALID_VALUES_ATTR] = {column: np.concatenate(parts) for column, parts in invalid.items()}
+    return combined
+
+
+def load_sources(paths, dtypes, columns=None, workers=None):
+    """Load one or more export files into a single typed frame.
+
+    A single file loads exactly as read_dataset() would; several files are
+    read concurrently and combined with an Account column.
+    """
+    paths = [Path(p) for p in paths]
+    if len(paths) == 1:
+        return read_dataset(paths[0], dtypes, columns)
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as pool:
+        frames = list(pool.map(lambda path: read_dataset(path, dtypes, columns), paths))
+    wanted = None if columns is None else [c for c in columns if any(c in f.columns for f in frames)
+                                           or c in RECONCILE_DEFAULTS]
+    return combine_frames(frames, dtypes, [account_for(p) for p in paths], wanted)
+
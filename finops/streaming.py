@@ -0,0 +1,296 @@
+"""
+Streaming, chunked aggregation for exports that do not fit in memory.
+
+The input is read in fixed-size chunks and folded into small, mergeable
+partial aggregates:
+
+- GroupTotals: per-group sum and count of a value column (and so the mean)
+- TopK: a bounded heap that reproduces DataFrame.nlargest
+- Histogram: counts over fixed bin edges
+
+Peak memory is one chunk plus the aggregates, independent of file size.
+Partials built from different files or workers can be combined with merge().
+Rows are cleaned with the same per-column rules as the dashboard (see
+finops.quality) before they are aggregated.
+
+This is a command-line tool for exports too large to load at all; the
+dashboard's own large-file path is the DuckDB query backend
+(FINOPS_QUERY_BACKEND=duckdb, see finops.query).
+
+Usage:
+    python -m finops.streaming aws_resources_compute.csv --kind compute
+"""
+
+import argparse
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from finops import quality
+from finops.analysis import TOP_EC2_COLUMNS, TOP_S3_COLUMNS
+from finops.loader import (
+    COMPUTE_DTYPES,
+    DEFAULT_CHUNKSIZE,
+    S3_DTYPES,
+    iter_dataset_chunks,
+)
+
+CPU_HISTOGRAM_EDGES = np.linspace(0.0, 100.0, 21)
+
+# Final tiebreaker of TopK heap entries, so two entries never compare their records.
+_sequence = itertools.count()
+
+
+class GroupTotals:
+    """Running sum and non-null count of `value` per `by` group."""
+
+    def __init__(self, by, value):
+        self.by = [by] if isinstance(by, str) else list(by)
+        self.value = value
+        self._partial = None
+
+    def update(self, chunk):
+        if chunk.empty or self.value not in chunk.columns:
+            return
+        if any(column not in chunk.columns for column in self.by):
+            return
+        partial = chunk.groupby(self.by, observed=True)[self.value].agg(["sum", "count"])
+        self._combine(partial)
+
+    def merge(self, other):
+        if other._partial is not None:
+            self._combine(other._partial)
+        return self
+
+    def _combine(self, partial):
+        # Chunks carry their own categorical levels, so normalize the keys
+        # to plain values before re-aggregating.
+        partial = partial.copy()
+        if isinstance(partial.index, pd.MultiIndex):
+            partial.index = pd.MultiIndex.from_tuples(partial.index.tolist(), names=partial.index.names)
+        else:
+            partial.index = pd.Index(partial.index.tolist(), name=partial.index.name, dtype=object)
+        if self._partial is None:
+            self._partial = partial
+        else:
+            combined = pd.concat([self._partial, partial])
+            self._partial = combined.groupby(level=list(range(combined.index.nlevels))).sum()
+
+    def _frame(self):
+        if self._partial is None:
+            return pd.DataFrame({"sum": pd.Series(dtype="float64"), "count": pd.Series(dtype="int64")})
+        return self._partial
+
+    def sums(self):
+        return self._frame()["sum"].rename(self.value)
+
+    def counts(self):
+        return self._frame()["count"].rename(self.value)
+
+    def means(self):
+        frame = self._frame()
+        frame = frame[frame["count"] > 0]
+        return (frame["sum"] / frame["count"]).rename(self.value)
+
+
+class TopK:
+    """Keep the k rows with the largest `column`, matching DataFrame.nlargest.
+
+    Ties are broken in favour of the earlier row label, which is what
+    nlargest(keep="first") does on a frame with a RangeIndex. Partials of
+    different files repeat row labels, so each is given a `source` number
+    and, when merged, ties go to the lower source first.
+    """
+
+    def __init__(self, column, k=5, columns=None, source=0):
+        self.column = column
+        self.k = k
+        self.columns = list(columns) if columns is not None else None
+        self.source = source
+        self._heap = []
+        self._dtypes = {}
+
+    def update(self, chunk):
+        if chunk.empty or self.column not in chunk.columns:
+            return
+        columns = self.columns or list(chunk.columns)
+        columns = [c for c in columns if c in chunk.columns]
+        candidates = chunk.nlargest(self.k, self.column)[columns]
+        if not self._dtypes:
+            self._dtypes = {c: ("category" if isinstance(t, pd.CategoricalDtype) else t)
+                            for c, t in candidates.dtypes.items()}
+        for label, record in zip(candidates.index, candidates.to_dict("records")):
+            self._push((record[self.column], -self.source, -label, next(_sequence), label, record))
+
+    def merge(self, other):
+        for entry in other._heap:
+            self._push(entry)
+        self._dtypes = self._dtypes or other._dtypes
+        return self
+
+    def _push(self, entry):
+        key = entry[:3]
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif key > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def result(self):
+        entries = sorted(self._heap, key=lambda entry: entry[:3], reverse=True)
+        result = pd.DataFrame(
+            [entry[5] for entry in entries],
+            index=[entry[4] for entry in entries],
+            columns=self.columns,
+        )
+        return result.astype({c: t for c, t in self._dtypes.items() if c in result.columns})
+
+
+class Histogram:
+    """Counts of `column` over fixed bin edges (np.histogram semantics)."""
+
+    def __init__(self, column, edges=CPU_HISTOGRAM_EDGES):
+        self.column = column
+        self.edges = np.asarray(edges, dtype="float64")
+        self.counts = np.zeros(len(self.edges) - 1, dtype="int64")
+
+    def update(self, chunk):
+        if chunk.empty or self.column not in chunk.columns:
+            return
+        values = chunk[self.column].dropna().to_numpy(dtype="float64")
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def result(self):
+        return pd.DataFrame({
+            "left": self.edges[:-1],
+            "right": self.edges[1:],
+            "count": self.counts,
+        })
+
+
+def histogram_counts(values, edges=CPU_HISTOGRAM_EDGES):
+    """In-memory counterpart of Histogram, for comparing the two paths."""
+    values = pd.Series(values).dropna().to_numpy(dtype="float64")
+    return np.histogram(values, bins=np.asarray(edges, dtype="float64"))[0]
+
+
+def filter_chunk(chunk, filters):
+    """Apply {column: allowed values} filters; empty selections are ignored."""
+    mask = np.ones(len(chunk), dtype=bool)
+    for column, allowed in (filters or {}).items():
+        if column in chunk.columns and len(allowed) > 0:
+            mask &= chunk[column].isin(allowed).to_numpy()
+    return chunk[mask]
+
+
+def clean_chunk(chunk, rules):
+    """`chunk` with the cleaning `rules` applied: fills imputed, rows missing a required column left out."""
+    plan = quality.plan_cleaning(rules, chunk.columns)
+    chunk = quality.apply_plan(chunk, plan)
+    return chunk[quality.required_mask(chunk, plan)]
+
+
+def stream_aggregate(chunks, aggregators, filters=None, rules=None):
+    """Fold an iterable of chunks, cleaned by `rules` and then filtered, into the given aggregators."""
+    for chunk in chunks:
+        if rules:
+            chunk = clean_chunk(chunk, rules)
+        chunk = filter_chunk(chunk, filters)
+        for aggregator in aggregators:
+            aggregator.update(chunk)
+    return aggregators
+
+
+def compute_aggregators(top_k=5):
+    return {
+        "cost_by_region": GroupTotals("Region", "CostUSD"),
+        "cost_by_instance_type": GroupTotals("InstanceType", "CostUSD"),
+        "top_instances": TopK("CostUSD", top_k, TOP_EC2_COLUMNS),
+        "cpu_histogram": Histogram("CPUUtilization"),
+    }
+
+
+def s3_aggregators(top_k=5):
+    return {
+        "cost_by_region": GroupTotals("Region", "CostUSD"),
+        "storage_by_region": GroupTotals("Region", "TotalSizeGB"),
+        "cost_by_storage_class": GroupTotals("StorageClass", "CostUSD"),
+        "top_buckets": TopK("TotalSizeGB", top_k, TOP_S3_COLUMNS),
+    }
+
+
+def merge_aggregators(left, right):
+    """Merge two dicts of partial aggregates built with the same factory."""
+    for name, aggregator in right.items():
+        left[name].merge(aggregator)
+    return left
+
+
+def summarize_compute(path, chunksize=DEFAULT_CHUNKSIZE, filters=None, rules=quality.COMPUTE_CLEANING_RULES,
+                      top_k=5):
+    """Stream the compute export and return its partial aggregates.
+
+    Rows are cleaned by `rules` first, as the dashboard cleans them; with
+    rules=None every row is aggregated as loaded. Rules that impute a
+    column statistic need a profile of the whole export and are rejected.
+    """
+    aggregators = compute_aggregators(top_k)
+    chunks = iter_dataset_chunks(path, COMPUTE_DTYPES, _needed_columns(aggregators, filters, rules), chunksize)
+    stream_aggregate(chunks, aggregators.values(), filters, rules)
+    return aggregators
+
+
+def summarize_s3(path, chunksize=DEFAULT_CHUNKSIZE, filters=None, rules=quality.S3_CLEANING_RULES, top_k=5):
+    """Stream the S3 export and return its partial aggregates."""
+    aggregators = s3_aggregators(top_k)
+    chunks = iter_dataset_chunks(path, S3_DTYPES, _needed_columns(aggregators, filters, rules), chunksize)
+    stream_aggregate(chunks, aggregators.values(), filters, rules)
+    return aggregators
+
+
+def _needed_columns(aggregators, filters, rules=None):
+    columns = list(filters or {}) + list(rules or {})
+    for aggregator in aggregators.values():
+        if isinstance(aggregator, GroupTotals):
+            columns.extend(aggregator.by + [aggregator.value])
+        elif isinstance(aggregator, TopK):
+            columns.extend(aggregator.columns or [])
+            columns.append(aggregator.column)
+        else:
+            columns.append(aggregator.column)
+    return tuple(dict.fromkeys(columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate a FinOps export chunk by chunk.")
+    parser.add_argument("path")
+    parser.add_argument("--kind", choices=["compute", "s3"], required=True)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--cleaning-rules",
+                        help=f"Per-column cleaning rules JSON, like {quality.RULES_FILENAME} (default: built-in rules)")
+    parser.add_argument("--keep-missing", action="store_true", help="Aggregate every row as loaded, without cleaning")
+    args = parser.parse_args(argv)
+
+    rules = None if args.keep_missing else quality.cleaning_rules(args.cleaning_rules)[args.kind]
+    summarize = summarize_compute if args.kind == "compute" else summarize_s3
+    aggregators = summarize(args.path, args.chunksize, rules=rules)
+    for name, aggregator in aggregators.items():
+        print(f"== {name}")
+        if isinstance(aggregator, GroupTotals):
+            print(pd.DataFrame({
+                "sum": aggregator.sums(),
+                "count": aggregator.counts(),
+                "mean": aggregator.means(),
+            }).to_string())
+        else:
+            print(aggregator.result().to_string())
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Synthetic compute and S3 exports for benchmarking at scale.
+
+The generated files have the same columns, formats and quirks as
+aws_resources_compute.csv and aws_resources_S3.csv:
+
+- skewed regions, instance types, states and storage classes
+- tag strings drawn from a small vocabulary, so they repeat heavily, with
+  some rows untagged and some carrying an extra CostCenter tag
+- fully blank rows (as in the sample compute export), plus scattered
+  missing fields and Encryption="None"
+- costs tied to the instance type's hourly price or the storage class's
+  GB-month price, so rightsizing and tiering have something to find, with a
+  few cost spikes for anomaly detection
+
+Rows are generated in fixed-size chunks, each from its own seeded RNG, so
+a 10M-row file streams to disk with bounded memory and the same seed always
+yields the same data.
+
+Usage:
+    python -m finops.synthetic OUTPUT_DIR [--compute-rows 1000000] [--s3-rows 100000] [--format csv]
+"""
+
+import argparse
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from finops.loader import COMPUTE_DTYPES, COMPUTE_STEM, S3_DTYPES, S3_STEM, SNAPSHOT_SUFFIX, read_typed_csv
+
+CHUNK_ROWS = 500_000
+DEFAULT_MISSING_RATE = 0.01
+DEFAULT_BLANK_ROW_RATE = 0.02
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-south-1", "eu-central-1", "ap-northeast-1"]
+REGION_WEIGHTS = [0.38, 0.24, 0.16, 0.12, 0.06, 0.04]
+
+# (type, weight, on-demand hourly USD); types match instance_type_catalog.csv.
+INSTANCE_TYPES = [
+    ("t3.micro", 0.16, 0.0104), ("t3.small", 0.14, 0.0208), ("t3.medium", 0.10, 0.0416),
+    ("t3.large", 0.06, 0.0832), ("m5.large", 0.12, 0.096), ("m5.xlarge", 0.07, 0.192),
+    ("m5.2xlarge", 0.03, 0.384), ("c5.large", 0.07, 0.085), ("c5.xlarge", 0.08, 0.17),
+    ("c5.2xlarge", 0.03, 0.34), ("r5.large", 0.08, 0.126), ("r5.xlarge", 0.04, 0.252),
+    ("r5.2xlarge", 0.02, 0.504),
+]
+STATES = ["running", "stopped", "terminated"]
+STATE_WEIGHTS = [0.70, 0.20, 0.10]
+
+OWNERS = ["Alice", "Bob", "Charlie", "David", "Erin", "Frank", "Grace", "Heidi", "Ivan", "Judy"]
+ENVIRONMENTS = ["Prod", "Dev", "Test", "Staging"]
+ENVIRONMENT_WEIGHTS = [0.40, 0.30, 0.20, 0.10]
+PURPOSES = ["Analytics", "Backup", "Logs", "DataLake", "Media", "Archive"]
+COST_CENTERS = [f"CC-{1000 + i}" for i in range(40)]
+COST_CENTER_RATE = 0.3
+UNTAGGED_RATE = 0.05
+SPIKE_RATE = 0.002
+
+# (class, weight, USD per GB-month)
+STORAGE_CLASSES = [
+    ("STANDARD", 0.40, 0.023), ("STANDARD_IA", 0.22, 0.0125), ("INTELLIGENT_TIERING", 0.10, 0.023),
+    ("GLACIER", 0.20, 0.004), ("DEEP_ARCHIVE", 0.08, 0.00099),
+]
+ENCRYPTIONS = ["AES256", "aws:kms", "None"]
+ENCRYPTION_WEIGHTS = [0.60, 0.15, 0.25]
+
+COMPUTE_COLUMNS = ["ResourceId", "ResourceType", "Region", "CostUSD", "Tags", "CreationDate", "InstanceType",
+                   "State", "CPUUtilization", "MemoryUtilization", "NetworkIn_Bps", "NetworkOut_Bps"]
+S3_COLUMNS = ["BucketName", "Region", "CostUSD", "Tags", "CreationDate", "StorageClass", "ObjectCount",
+              "TotalSizeGB", "VersionEnabled", "Encryption"]
+
+# Fields that may be missing individually (identifiers never are).
+COMPUTE_SPARSE_COLUMNS = ["Tags", "CreationDate", "CPUUtilization", "MemoryUtilization", "NetworkIn_Bps",
+                          "NetworkOut_Bps"]
+S3_SPARSE_COLUMNS = ["Tags", "CreationDate", "ObjectCount", "VersionEnabled"]
+
+
+def _weights(values):
+    weights = np.asarray(values, dtype="float64")
+    return weights / weights.sum()
+
+
+def _pick(rng, options, weights, size):
+    return np.asarray(options, dtype=object)[rng.choice(len(options), size=size, p=_weights(weights))]
+
+
+def _dates(rng, start, end, size):
+    start, end = np.datetime64(start), np.datetime64(end)
+    days = rng.integers(0, int((end - start).astype(int)) + 1, size=size)
+    return np.datetime_as_string(start + days.astype("timedelta64[D]"), unit="D").astype(object)
+
+
+def _tag_strings(rng, size, second_key, second_values, second_weights=None):
+    """"Owner=..,<second_key>=..[,CostCenter=..]" strings; some rows untagged."""
+    owner_weights = 1.0 / np.arange(1, len(OWNERS) + 1)
+    owners = _pick(rng, OWNERS, owner_weights, size)
+    seconds = _pick(rng, second_values, second_weights or [1] * len(second_values), size)
+    tags = "Owner=" + owners + f",{second_key}=" + seconds
+    with_cost_center = rng.random(size) < COST_CENTER_RATE
+    tags[with_cost_center] = (tags[with_cost_center] + ",CostCenter="
+                              + _pick(rng, COST_CENTERS, [1] * len(COST_CENTERS), int(with_cost_center.sum())))
+    tags[rng.random(size) < UNTAGGED_RATE] = None
+    return tags
+
+
+def _spikes(rng, size):
+    """Cost multipliers: 1 for most rows, 5-20x for a SPIKE_RATE share."""
+    return np.where(rng.random(size) < SPIKE_RATE, rng.uniform(5, 20, size), 1.0)
+
+
+def _punch_holes(rng, df, columns, missing_rate, blank_row_rate):
+    """Blank out individual fields and whole rows, like the real exports."""
+    # Nullable integers keep the counters written as integers once they have gaps.
+    for column in df.columns:
+        if df[column].dtype == "int64":
+            df[column] = df[column].astype("Int64")
+    if missing_rate > 0:
+        for column in columns:
+            df.loc[rng.random(len(df)) < missing_rate, column] = None
+    if blank_row_rate > 0:
+        df.loc[rng.random(len(df)) < blank_row_rate, :] = None
+    return df
+
+
+def compute_chunk(rng, start, size, missing_rate=DEFAULT_MISSING_RATE, blank_row_rate=DEFAULT_BLANK_ROW_RATE):
+    """`size` compute rows whose ResourceIds start at `start`."""
+    type_index = rng.choice(len(INSTANCE_TYPES), size=size, p=_weights([w for _, w, _ in INSTANCE_TYPES]))
+    types = np.array([t for t, _, _ in INSTANCE_TYPES], dtype=object)[type_index]
+    prices = np.array([p for _, _, p in INSTANCE_TYPES])[type_index]
+    states = _pick(rng, STATES, STATE_WEIGHTS, size)
+    running = states == "running"
+    hours = np.where(running, rng.uniform(4, 24, size), rng.uniform(0, 4, size))
+    cpu = np.where(running, rng.beta(2.0, 3.0, size) * 100, rng.beta(1.0, 8.0, size) * 100)
+    memory = np.clip(cpu * rng.uniform(0.6, 1.4, size) + rng.normal(10, 8, size), 1, 99)
+
+    df = pd.DataFrame({
+        "ResourceId": "i-" + pd.Series(np.arange(start, start + size) + 1000).astype(str).to_numpy(object),
+        "ResourceType": "EC2",
+        "Region": _pick(rng, REGIONS, REGION_WEIGHTS, size),
+        "CostUSD": np.round(prices * hours * rng.uniform(0.9, 1.1, size) * _spikes(rng, size), 3),
+        "Tags": _tag_strings(rng, size, "Environment", ENVIRONMENTS, ENVIRONMENT_WEIGHTS),
+        "CreationDate": _dates(rng, "2023-01-01", "2025-10-31", size),
+        "InstanceType": types,
+        "State": states,
+        "CPUUtilization": np.round(cpu, 2),
+        "MemoryUtilization": np.round(memory, 2),
+        "NetworkIn_Bps": rng.lognormal(12.5, 1.2, size).astype("int64"),
+        "NetworkOut_Bps": rng.lognormal(12.3, 1.2, size).astype("int64"),
+    }, columns=COMPUTE_COLUMNS)
+    return _punch_holes(rng, df, COMPUTE_SPARSE_COLUMNS, missing_rate, blank_row_rate)
+
+
+def s3_chunk(rng, start, size, missing_rate=DEFAULT_MISSING_RATE, blank_row_rate=0.0):
+    """`size` bucket rows whose BucketNames start at `start`."""
+    class_index = rng.choice(len(STORAGE_CLASSES), size=size, p=_weights([w for _, w, _ in STORAGE_CLASSES]))
+    classes = np.array([c for c, _, _ in STORAGE_CLASSES], dtype=object)[class_index]
+    gb_month = np.array([p for _, _, p in STORAGE_CLASSES])[class_index]
+    size_gb = np.round(rng.lognormal(6.5, 1.5, size), 2)
+
+    df = pd.DataFrame({
+        "BucketName": "bucket-" + pd.Series(np.arange(start, start + size)).astype(str).to_numpy(object),
+        "Region": _pick(rng, REGIONS, REGION_WEIGHTS, size),
+        "CostUSD": np.round(size_gb * gb_month * rng.uniform(0.9, 1.3, size) * _spikes(rng, size), 2),
+        "Tags": _tag_strings(rng, size, "Purpose", PURPOSES),
+        "CreationDate": _dates(rng, "2018-01-01", "2025-10-31", size),
+        "StorageClass": classes,
+        "ObjectCount": np.maximum(1, (size_gb * rng.lognormal(5.0, 1.0, size))).astype("int64"),
+        "TotalSizeGB": size_gb,
+        "VersionEnabled": np.where(rng.random(size) < 0.6, "TRUE", "FALSE").astype(object),
+        "Encryption": _pick(rng, ENCRYPTIONS, ENCRYPTION_WEIGHTS, size),
+    }, columns=S3_COLUMNS)
+    return _punch_holes(rng, df, S3_SPARSE_COLUMNS, missing_rate, blank_row_rate)
+
+
+def iter_chunks(make_chunk, n_rows, seed=0, chunk_rows=CHUNK_ROWS, **options):
+    """Yield frames of at most `chunk_rows` rows, `n_rows` in total."""
+    for index, start in enumerate(range(0, n_rows, chunk_rows)):
+        rng = np.random.default_rng([seed, index])
+        yield make_chunk(rng, start, min(chunk_rows, n_rows - start), **options)
+
+
+def generate_compute(n_rows, seed=0, **options):
+    return pd.concat(iter_chunks(compute_chunk, n_rows, seed, **options), ignore_index=True)
+
+
+def generate_s3(n_rows, seed=0, **options):
+    return pd.concat(iter_chunks(s3_chunk, n_rows, seed, **options), ignore_index=True)
+
+
+def _as_parsed(chunk, dtypes):
+    """The chunk as the CSV loader would parse it, with categoricals as plain strings."""
+    buffer = StringIO()
+    chunk.to_csv(buffer, index=False)
+    buffer.seek(0)
+    parsed = read_typed_csv(buffer, dtypes)
+    for column in parsed.columns:
+        if isinstance(parsed[column].dtype, pd.CategoricalDtype):
+            parsed[column] = parsed[column].astype(object)
+    return parsed
+
+
+def write_chunks(chunks, path, dtypes):
+    """Stream chunks to a CSV or (by suffix) Parquet file; returns the row count.
+
+    Parquet chunks go through the CSV parser first so a snapshot holds
+    exactly what loading the equivalent CSV would (e.g. Encryption="None"
+    becomes missing).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    rows = 0
+    if path.suffix == SNAPSHOT_SUFFIX:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(_as_parsed(chunk, dtypes), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression="zstd")
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(tmp_path, "w", newline="") as fh:
+            for index, chunk in enumerate(chunks):
+                chunk.to_csv(fh, index=False, header=index == 0)
+                rows += len(chunk)
+    tmp_path.replace(path)
+    return rows
+
+
+def write_dataset(output_dir, compute_rows, s3_rows, seed=0, file_format="csv", **options):
+    """Write `<stem>.<format>` for both exports into output_dir; returns the two paths."""
+    suffix = ".csv" if file_format == "csv" else SNAPSHOT_SUFFIX
+    output_dir = Path(output_dir)
+    compute_path = output_dir / f"{COMPUTE_STEM}{suffix}"
+    s3_path = output_dir / f"{S3_STEM}{suffix}"
+    write_chunks(iter_chunks(compute_chunk, compute_rows, seed, **options), compute_path, COMPUTE_DTYPES)
+    s3_options = {k: v for k, v in options.items() if k != "blank_row_rate"}
+    write_chunks(iter_chunks(s3_chunk, s3_rows, seed + 1, **s3_options), s3_path, S3_DTYPES)
+    return compute_path, s3_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic compute and S3 exports.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--compute-rows", type=int, default=100_000)
+    parser.add_argument("--s3-rows", type=int, default=None, help="Default: a tenth of --compute-rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--missing-rate", type=float, default=DEFAULT_MISSING_RATE,
+                        help="Chance that an individual optional field is blank")
+    parser.add_argument("--blank-row-rate", type=float, default=DEFAULT_BLANK_ROW_RATE,
+                        help="Chance that a compute row is entirely blank")
+    args = parser.parse_args(argv)
+
+    s3_rows = args.s3_rows if args.s3_rows is not None else max(1, args.compute_rows // 10)
+    for path in write_dataset(args.output_dir, args.compute_rows, s3_rows, args.seed, args.format,
+                              missing_rate=args.missing_rate, blank_row_rate=args.blank_row_rate):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
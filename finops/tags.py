@@ -0,0 +1,79 @@
+"""
+Parsed Tags dimension for cost allocation.
+
+The raw `Tags` column holds strings like "Owner=Alice,Environment=Dev". Tag
+strings repeat heavily, so they are parsed once per *distinct* string and the
+result is broadcast back to every row through factorize codes. Each tag key
+becomes a categorical column named "Tag:<key>"; rows without that key are
+missing (shown as "(untagged)" in breakdowns).
+"""
+
+import numpy as np
+import pandas as pd
+
+TAGS_COLUMN = "Tags"
+TAG_COLUMN_PREFIX = "Tag:"
+UNTAGGED = "(untagged)"
+
+
+def parse_tag_string(text):
+    """Parse "k1=v1,k2=v2" into a dict; malformed pairs and empty keys are skipped."""
+    tags = {}
+    for pair in str(text).split(","):
+        key, sep, value = pair.partition("=")
+        key = key.strip()
+        if sep and key:
+            tags[key] = value.strip()
+    return tags
+
+
+def explode_tags(tags, prefix=TAG_COLUMN_PREFIX):
+    """One categorical column per tag key, aligned with `tags`' index."""
+    codes, uniques = pd.factorize(tags, use_na_sentinel=True)
+    parsed = [parse_tag_string(text) for text in uniques]
+    keys = sorted({key for item in parsed for key in item})
+
+    columns = {}
+    for key in keys:
+        values = [item.get(key) for item in parsed]
+        categories = sorted({value for value in values if value is not None})
+        lookup = {value: code for code, value in enumerate(categories)}
+        # Trailing -1 slot so rows with a missing Tags string (code -1) map to NaN.
+        value_codes = np.array([lookup.get(value, -1) for value in values] + [-1], dtype=np.int32)
+        columns[prefix + key] = pd.Categorical.from_codes(value_codes[codes], categories=categories)
+    return pd.DataFrame(columns, index=tags.index)
+
+
+def with_tag_columns(df, drop_raw=True):
+    """Return df with parsed tag columns appended (and the raw Tags column dropped)."""
+    if TAGS_COLUMN not in df.columns:
+        return df
+    exploded = explode_tags(df[TAGS_COLUMN])
+    base = df.drop(columns=[TAGS_COLUMN]) if drop_raw else df
+    return pd.concat([base, exploded], axis=1)
+
+
+def tag_columns(df):
+    return [c for c in df.columns if str(c).startswith(TAG_COLUMN_PREFIX)]
+
+
+def tag_keys(df):
+    return [c[len(TAG_COLUMN_PREFIX):] for c in tag_columns(df)]
+
+
+def cost_by_tag(df, key, value="CostUSD"):
+    """Total/count/share of `value` per value of tag `key`, untagged rows included."""
+    column = TAG_COLUMN_PREFIX + key
+    if column in df.columns:
+        labels = df[column].cat.add_categories([UNTAGGED]).fillna(UNTAGGED)
+    else:
+        labels = pd.Series(UNTAGGED, index=df.index)
+    grouped = df[value].groupby(labels, observed=True).agg(["sum", "count"])
+    grouped = grouped[grouped["count"] > 0].sort_values("sum", ascending=False)
+    total = grouped["sum"].sum()
+    return pd.DataFrame({
+        key: grouped.index.astype(str),
+        "Total": grouped["sum"].to_numpy(),
+        "Count": grouped["count"].to_numpy(),
+        "Share": (grouped["sum"] / total).to_numpy() if total else 0.0,
+    })
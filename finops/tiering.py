@@ -0,0 +1,157 @@
+"""
+Vectorized S3 lifecycle (storage-class tiering) what-if simulator.
+
+A lifecycle policy maps storage classes to a minimum age in days, e.g.
+{"STANDARD_IA": 90, "GLACIER": 365}: buckets older than 90 days move to
+STANDARD_IA, and those older than 365 days go straight to GLACIER. Buckets
+only ever move to a colder class than the one they are in, and a bucket's
+age (from CreationDate) stands in for the age of its objects.
+
+Prices come from a local price table (s3_price_table.csv) with one row per
+Region and StorageClass: StorageGBMonthUSD (storage list price) and
+TransitionPer1000USD (lifecycle transition request fee into that class).
+Current and projected monthly costs are TotalSizeGB at list price, and each
+move costs ObjectCount / 1000 transition requests once.
+
+TieringSimulator does the per-bucket work once per dataset (ages, price
+lookups, the monthly and transition cost of every bucket in every class);
+simulate() then only picks a target class per bucket and gathers, so a
+policy change is a few array operations even over hundreds of thousands of
+buckets.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_TABLE_FILENAME = "s3_price_table.csv"
+
+# Warmest to coldest; a policy can only move a bucket to the right.
+STORAGE_TIERS = ["STANDARD", "INTELLIGENT_TIERING", "STANDARD_IA", "GLACIER", "DEEP_ARCHIVE"]
+POLICY_CLASSES = ["INTELLIGENT_TIERING", "STANDARD_IA", "GLACIER", "DEEP_ARCHIVE"]
+DEFAULT_POLICY = {"STANDARD_IA": 90, "GLACIER": 365}
+
+PRICE_TABLE_DTYPES = {
+    "Region": "str",
+    "StorageClass": "str",
+    "StorageGBMonthUSD": "float64",
+    "TransitionPer1000USD": "float64",
+}
+
+SIMULATION_COLUMNS = ["AgeDays", "TargetClass", "CurrentMonthlyUSD", "ProjectedMonthlyUSD",
+                      "MonthlySavingsUSD", "TransitionCostUSD"]
+
+
+def load_price_table(path):
+    return pd.read_csv(path, dtype=PRICE_TABLE_DTYPES)
+
+
+def _price_matrix(prices, column, regions):
+    """(len(regions), len(STORAGE_TIERS)) array of `column`; NaN where not priced."""
+    matrix = prices.pivot_table(index="Region", columns="StorageClass", values=column, aggfunc="first")
+    return matrix.reindex(index=regions, columns=STORAGE_TIERS).to_numpy(dtype="float64")
+
+
+class TieringSimulator:
+    """Per-bucket tier costs for `s3`, precomputed for fast policy what-ifs.
+
+    Buckets with an unpriced region or class, or a missing CreationDate,
+    ObjectCount or TotalSizeGB, never move.
+    """
+
+    def __init__(self, s3, prices, as_of=None):
+        self.index = s3.index
+        as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+        regions = sorted(prices["Region"].unique())
+        region = pd.Index(regions).get_indexer(s3["Region"].astype(object))
+        self.current = pd.Index(STORAGE_TIERS).get_indexer(s3["StorageClass"].astype(object)).astype(np.int64)
+
+        created = pd.to_datetime(s3["CreationDate"])
+        self.age_days = ((as_of - created).dt.days).to_numpy(dtype="float64", na_value=np.nan)
+        size_gb = s3["TotalSizeGB"].to_numpy(dtype="float64", na_value=np.nan)
+        objects = s3["ObjectCount"].to_numpy(dtype="float64", na_value=np.nan)
+
+        # An extra all-NaN row prices buckets whose region is not in the table (code -1).
+        unpriced = np.full((1, len(STORAGE_TIERS)), np.nan)
+        storage = np.vstack([_price_matrix(prices, "StorageGBMonthUSD", regions), unpriced])[region]
+        transition = np.vstack([_price_matrix(prices, "TransitionPer1000USD", regions), unpriced])[region]
+        # Monthly and one-off transition cost of every bucket in every class: (buckets, tiers).
+        self.monthly = size_gb[:, None] * storage
+        self.transition = objects[:, None] / 1000.0 * transition
+
+        rows = np.arange(len(s3))
+        safe_current = np.where(self.current >= 0, self.current, 0)
+        self.current_monthly = np.where(self.current >= 0, self.monthly[rows, safe_current], np.nan)
+        self.movable = ((region >= 0) & (self.current >= 0) & np.isfinite(self.age_days)
+                        & np.isfinite(self.current_monthly) & np.isfinite(objects))
+        self.priced = np.isfinite(self.monthly) & np.isfinite(self.transition)
+
+    def __len__(self):
+        return len(self.index)
+
+    def target_tiers(self, policy):
+        """Index into STORAGE_TIERS of each bucket's class under `policy` (-1 if unknown)."""
+        target = self.current.copy()
+        for name in sorted(policy, key=STORAGE_TIERS.index):
+            days = policy[name]
+            if days is None:
+                continue
+            tier = STORAGE_TIERS.index(name)
+            # Rules are applied warm to cold, so the coldest matching rule wins.
+            target[self.movable & self.priced[:, tier] & (self.age_days >= days) & (tier > target)] = tier
+        return target
+
+    def simulate(self, policy):
+        """SIMULATION_COLUMNS for every bucket under `policy`, aligned with the input index."""
+        target = self.target_tiers(policy)
+        moved = target != self.current
+        rows = np.arange(len(target))
+        safe_target = np.where(target >= 0, target, 0)
+        projected = np.where(moved, self.monthly[rows, safe_target], self.current_monthly)
+        return pd.DataFrame({
+            "AgeDays": self.age_days,
+            "TargetClass": pd.Categorical.from_codes(np.where(moved, target, -1), categories=STORAGE_TIERS),
+            "CurrentMonthlyUSD": self.current_monthly,
+            "ProjectedMonthlyUSD": projected,
+            "MonthlySavingsUSD": np.where(moved, self.current_monthly - projected, 0.0),
+            "TransitionCostUSD": np.where(moved, self.transition[rows, safe_target], 0.0),
+        }, index=self.index)
+
+
+def summarize(simulation):
+    """Buckets moved, monthly list cost before/after, one-off transition cost and payback."""
+    moved = simulation["TargetClass"].notna()
+    savings = float(simulation["MonthlySavingsUSD"].sum())
+    transition_cost = float(simulation["TransitionCostUSD"].sum())
+    return {
+        "buckets_moved": int(moved.sum()),
+        "current_monthly": float(simulation["CurrentMonthlyUSD"].sum()),
+        "projected_monthly": float(simulation["ProjectedMonthlyUSD"].sum()),
+        "monthly_savings": savings,
+        "transition_cost": transition_cost,
+        "payback_months": transition_cost / savings if savings > 0 else None,
+    }
+
+
+def transition_table(s3, simulation):
+    """Buckets, GB, monthly savings and transition cost per (from, to) class move."""
+    moved = simulation["TargetClass"].notna()
+    frame = pd.DataFrame({
+        "From": s3.loc[moved, "StorageClass"].astype(object),
+        "To": simulation.loc[moved, "TargetClass"].astype(object),
+        "TotalSizeGB": s3.loc[moved, "TotalSizeGB"].astype("float64"),
+        "MonthlySavingsUSD": simulation.loc[moved, "MonthlySavingsUSD"],
+        "TransitionCostUSD": simulation.loc[moved, "TransitionCostUSD"],
+    })
+    grouped = frame.groupby(["From", "To"])
+    table = grouped.agg(Buckets=("TotalSizeGB", "size"), TotalSizeGB=("TotalSizeGB", "sum"),
+                        MonthlySavingsUSD=("MonthlySavingsUSD", "sum"),
+                        TransitionCostUSD=("TransitionCostUSD", "sum"))
+    return table.reset_index().sort_values("MonthlySavingsUSD", ascending=False, ignore_index=True)
+
+
+def bucket_table(s3, simulation, n=None):
+    """Buckets that move, largest monthly savings first."""
+    columns = [c for c in ["BucketName", "Region", "StorageClass", "TotalSizeGB", "ObjectCount"] if c in s3.columns]
+    table = s3[columns].join(simulation[["AgeDays", "TargetClass", "MonthlySavingsUSD", "TransitionCostUSD"]])
+    table = table[table["TargetClass"].notna()].sort_values("MonthlySavingsUSD", ascending=False)
+    return table if n is None else table.head(n)
@@ -0,0 +1,162 @@
+"""
+Ingestion of exports uploaded through the dashboard's file uploader.
+
+Uploads may be plain CSV or gzip/zstd-compressed CSV (.csv.gz, .csv.zst);
+the compression is detected from the file's magic bytes rather than its
+name. Each upload is:
+
+1. checked for the columns the dashboard needs, from its header alone, so a
+   wrong file is rejected before any of the body is parsed;
+2. parsed in DEFAULT_CHUNKSIZE-row chunks, reporting the share of (possibly
+   compressed) bytes consumed so far to a progress callback;
+3. combined into one typed frame (categoricals merged with
+   union_categoricals, see finops.sources.combine_frames).
+
+content_hash() fingerprints the uploaded bytes, so the dashboard can keep
+the parsed result keyed by content and parse a given upload only once, no
+matter how many reruns or sessions see it. zstd needs the optional
+zstandard package; gzip is in the standard library.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from finops.loader import DEFAULT_CHUNKSIZE, apply_schema, csv_dtypes
+from finops.sources import DEFAULT_WORKERS, account_for, combine_frames
+
+COMPUTE_REQUIRED_COLUMNS = ["ResourceId", "Region", "InstanceType", "State", "CostUSD", "CPUUtilization"]
+S3_REQUIRED_COLUMNS = ["BucketName", "Region", "StorageClass", "TotalSizeGB", "CostUSD"]
+
+UPLOAD_TYPES = ["csv", "gz", "zst"]
+HASH_BLOCK_SIZE = 8 * 2**20
+PROGRESS_INTERVAL = 0.25
+
+_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def zstd_supported():
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def detect_compression(buffer):
+    """"gzip", "zstd" or None (plain text) from the first bytes of a seekable buffer."""
+    position = buffer.tell()
+    head = buffer.read(4)
+    buffer.seek(position)
+    for magic, compression in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def content_hash(files):
+    """SHA-256 over the bytes of every file in order, as a hex string."""
+    digest = hashlib.sha256()
+    for upload in files:
+        upload.seek(0)
+        size = 0
+        while block := upload.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+            size += len(block)
+        upload.seek(0)
+        # Separate files so that ["ab", "c"] and ["a", "bc"] hash differently.
+        digest.update(b"\0" + str(size).encode())
+    return digest.hexdigest()
+
+
+def _name(upload):
+    return getattr(upload, "name", "upload")
+
+
+def _size(upload):
+    size = getattr(upload, "size", None)
+    if size is None:
+        position = upload.seek(0, 2)
+        upload.seek(0)
+        size = position
+    return size
+
+
+def _account_path(upload):
+    """The upload's name without a .gz/.zst suffix, for account_for()."""
+    path = Path(_name(upload))
+    return path.with_suffix("") if path.suffix in (".gz", ".zst") else path
+
+
+def _compression(upload):
+    compression = detect_compression(upload)
+    if compression == "zstd" and not zstd_supported():
+        raise ValueError(f"{_name(upload)} is zstd-compressed; install the zstandard package to read it")
+    return compression
+
+
+def check_columns(upload, required):
+    """Raise ValueError if the upload's header lacks any `required` column."""
+    upload.seek(0)
+    header = pd.read_csv(upload, compression=_compression(upload), nrows=0)
+    upload.seek(0)
+    missing = [column for column in required if column not in header.columns]
+    if missing:
+        raise ValueError(f"{_name(upload)} is missing required column{'s' if len(missing) > 1 else ''} "
+                         f"{', '.join(missing)}")
+
+
+def read_upload(upload, dtypes, chunksize=DEFAULT_CHUNKSIZE, on_bytes=None):
+    """Parse one uploaded export in chunks into a typed frame.
+
+    `on_bytes(n)` is called after each chunk with the number of upload bytes
+    consumed since the previous call.
+    """
+    upload.seek(0)
+    compression = _compression(upload)
+    chunks, consumed = [], 0
+    with pd.read_csv(upload, compression=compression, dtype=csv_dtypes(dtypes), chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunks.append(apply_schema(chunk, dtypes))
+            if on_bytes is not None:
+                position = upload.tell()
+                on_bytes(position - consumed)
+                consumed = position
+    if len(chunks) == 1:
+        return chunks[0]
+    return combine_frames(chunks, dtypes)
+
+
+def load_uploads(files, dtypes, required=(), progress=None, chunksize=DEFAULT_CHUNKSIZE, workers=None):
+    """Like finops.sources.load_sources() for uploaded buffers, named by their file name.
+
+    Every file's header is checked against `required` before any is parsed.
+    Files are parsed concurrently; `progress(fraction)` is called from the
+    calling thread as bytes are consumed, so it may update UI elements.
+    """
+    for upload in files:
+        check_columns(upload, required)
+
+    total = sum(_size(upload) for upload in files) or 1
+    consumed = [0]
+    lock = threading.Lock()
+
+    def on_bytes(n):
+        with lock:
+            consumed[0] += n
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as pool:
+        futures = [pool.submit(read_upload, upload, dtypes, chunksize, on_bytes) for upload in files]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            if progress is not None:
+                progress(min(consumed[0] / total, 1.0))
+        frames = [future.result() for future in futures]
+
+    if len(frames) == 1:
+        return frames[0]
+    return combine_frames(frames, dtypes, [account_for(_account_path(upload)) for upload in files])
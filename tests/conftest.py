@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from finops import synthetic  # noqa: E402
+from finops.loader import COMPUTE_STEM, S3_STEM  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def sample_paths():
+    """The sample exports shipped next to the dashboard."""
+    return ROOT / f"{COMPUTE_STEM}.csv", ROOT / f"{S3_STEM}.csv"
+
+
+@pytest.fixture(scope="session")
+def synthetic_paths(tmp_path_factory):
+    """A seeded synthetic pair of exports, large enough to span several chunks."""
+    return synthetic.write_dataset(tmp_path_factory.mktemp("synthetic"), 30_000, 6_000, seed=3)
+
+
+@pytest.fixture(scope="session", params=["sample", "synthetic"])
+def export_paths(request):
+    return request.getfixturevalue(f"{request.param}_paths")
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import anomalies
+
+
+def _history(costs_by_account, key="ResourceId", resource="i-1"):
+    return pd.DataFrame(
+        [
+            {"Account": account, key: resource, "snapshot_date": f"2025-10-0{day}", "CostUSD": cost}
+            for account, costs in costs_by_account.items()
+            for day, cost in enumerate(costs, start=1)
+        ]
+    )
+
+
+def test_accounts_sharing_a_resource_id_keep_separate_history():
+    history = _history({"111111111111": [1.0, 1.0, 1.0], "222222222222": [100.0, 100.0, 100.0]})
+    current = pd.DataFrame({
+        "Account": pd.Categorical(["111111111111", "222222222222"]),
+        "ResourceId": ["i-1", "i-1"],
+        "Region": "us-east-1",
+        "InstanceType": "m5.large",
+        "CostUSD": [100.0, 100.0],
+    })
+
+    scores = anomalies.score(current, anomalies.EC2_GROUPS, "ResourceId", history)
+
+    assert scores["BaselineCostUSD"].tolist() == [1.0, 100.0]
+    assert scores["BaselineSource"].tolist() == ["history", "history"]
+    assert scores["IsAnomaly"].tolist() == [True, False]
+    baselines = anomalies.history_baselines(history, ["Account", "ResourceId"])
+    assert baselines["Snapshots"].tolist() == [3, 3]
+
+
+def _group(costs, region="us-east-1"):
+    return pd.DataFrame({
+        "ResourceId": [f"i-{region}-{i}" for i in range(len(costs))],
+        "Region": region,
+        "InstanceType": "m5.large",
+        "CostUSD": costs,
+    })
+
+
+def test_peer_group_uses_median_and_mad():
+    # Median 10, MAD 0.5: sigma = 1.4826 * 0.5.
+    scores = anomalies.score(_group([10.0, 10.0, 11.0, 9.0, 10.0, 100.0]), anomalies.EC2_GROUPS)
+
+    assert (scores["BaselineCostUSD"] == 10.0).all()
+    assert (scores["BaselineSource"] == "peer group").all()
+    assert scores["AnomalyScore"].tolist() == pytest.approx(np.array([0, 0, 1, -1, 0, 90]) / (anomalies.MAD_SCALE * 0.5))
+    assert scores["IsAnomaly"].tolist() == [False] * 5 + [True]
+
+
+def test_zero_mad_falls_back_to_mean_absolute_deviation():
+    # MAD 0; mean absolute deviation 3 / 6 = 0.5.
+    scores = anomalies.score(_group([10.0, 10.0, 10.0, 10.0, 10.0, 13.0]), anomalies.EC2_GROUPS)
+    assert scores["AnomalyScore"].iloc[-1] == pytest.approx(3.0 / (anomalies.MEAN_AD_SCALE * 0.5))
+    assert scores["IsAnomaly"].tolist() == [False] * 5 + [True]
+
+    # A cent of rounding stays below the MIN_RELATIVE_SIGMA floor (0.5 here).
+    rounding = anomalies.score(_group([10.0] * 5 + [10.01]), anomalies.EC2_GROUPS)
+    assert rounding["AnomalyScore"].iloc[-1] == pytest.approx(0.01 / (anomalies.MIN_RELATIVE_SIGMA * 10.0))
+    assert not rounding["IsAnomaly"].any()
+
+
+def test_small_groups_have_no_baseline():
+    scores = anomalies.score(_group([1.0, 1.0, 1.0, 50.0]), anomalies.EC2_GROUPS)
+    assert scores["BaselineCostUSD"].isna().all()
+    assert scores["BaselineSource"].isna().all()
+    assert not scores["IsAnomaly"].any()
+
+
+def test_history_needs_min_snapshots():
+    current = _group([10.0, 10.0, 10.0, 10.0, 10.0, 10.0])
+    resource = current["ResourceId"].iloc[0]
+    two = _history({"": [40.0, 40.0]}, resource=resource).drop(columns="Account")
+    three = _history({"": [40.0, 40.0, 40.0]}, resource=resource).drop(columns="Account")
+
+    peer = anomalies.score(current, anomalies.EC2_GROUPS, "ResourceId", two)
+    assert peer["BaselineSource"].iloc[0] == "peer group"
+    assert not peer["IsAnomaly"].iloc[0]
+
+    own = anomalies.score(current, anomalies.EC2_GROUPS, "ResourceId", three)
+    assert own["BaselineSource"].tolist() == ["history"] + ["peer group"] * 5
+    assert own["BaselineCostUSD"].iloc[0] == 40.0
+    assert own["IsAnomaly"].tolist() == [True] + [False] * 5
+
+    relaxed = anomalies.score(current, anomalies.EC2_GROUPS, "ResourceId", two, min_snapshots=2)
+    assert relaxed["BaselineSource"].iloc[0] == "history"
@@ -0,0 +1,38 @@
+import functools
+
+import pandas as pd
+import pytest
+
+from finops import benchmark, downloads, rightsizing
+from finops.benchmark import DEFAULT_CATALOG
+
+
+@pytest.fixture(scope="module", params=["pandas", "duckdb"])
+def ec2_selection(request, sample_paths):
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    return benchmark.open_backend(request.param, *sample_paths).ec2.select({}).complete()
+
+
+def _exported(selection, **options):
+    return pd.concat(downloads.ec2_export_chunks(selection, chunksize=37, **options), ignore_index=True)
+
+
+def test_export_flags_agree_with_rightsizing_card(ec2_selection):
+    catalog = rightsizing.load_catalog(DEFAULT_CATALOG)
+    recommendations = rightsizing.rightsize(ec2_selection.frame(), catalog)
+    card = ec2_selection.ec2_insights(recommendations)
+
+    exported = _exported(ec2_selection, rightsize=functools.partial(rightsizing.rightsize, catalog=catalog))
+
+    assert len(exported) == len(ec2_selection)
+    assert int(exported["Underutilized"].sum()) == card["underutilized_count"]
+    assert int(exported["Stopped"].sum()) == card["stopped_count"]
+
+
+def test_export_flags_agree_with_heuristic_card(ec2_selection):
+    card = ec2_selection.ec2_insights()
+
+    exported = _exported(ec2_selection)
+
+    assert int(exported["Underutilized"].sum()) == card["underutilized_count"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops.filter_index import COMPUTE_FILTER_COLUMNS, FilterIndex
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Region": pd.Categorical(["us-east-1", "eu-west-1", None, "us-east-1", "ap-south-1"]),
+        "State": ["running", "stopped", "running", np.nan, "running"],
+        "CostUSD": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def test_options_skip_missing_values_and_absent_columns(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS)
+
+    assert index.columns == ["Region", "State"]
+    assert index.options("Region") == ["ap-south-1", "eu-west-1", "us-east-1"]
+    assert index.options("State") == ["running", "stopped"]
+    assert index.options("InstanceType") == []
+
+
+def test_column_mask_matches_isin(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS)
+
+    for column, selected in [("Region", ["us-east-1"]), ("Region", ["eu-west-1", "ap-south-1"]),
+                             ("State", ["running"])]:
+        np.testing.assert_array_equal(index.column_mask(column, selected), frame[column].isin(selected).to_numpy())
+
+
+def test_missing_rows_never_match(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS)
+
+    assert not index.column_mask("Region", index.options("Region"))[2]
+    assert not index.column_mask("State", index.options("State"))[3]
+    assert not index.column_mask("State", [np.nan])[3]
+
+
+def test_values_not_in_the_index_select_nothing(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS)
+
+    assert not index.column_mask("Region", ["mars-north-1"]).any()
+    np.testing.assert_array_equal(index.column_mask("Region", ["mars-north-1", "us-east-1"]),
+                                  [True, False, False, True, False])
+
+
+def test_empty_selections_and_absent_columns_do_not_filter(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS)
+
+    assert index.mask({"Region": [], "State": []}).all()
+    assert index.mask({"InstanceType": ["t3.micro"]}).all()
+    np.testing.assert_array_equal(index.positions({"Region": ["us-east-1"], "State": ["running"]}), [0])
+
+
+def test_masks_are_memoized_per_column(frame):
+    index = FilterIndex(frame, COMPUTE_FILTER_COLUMNS, memo_size=2)
+
+    first = index.column_mask("Region", ["us-east-1", "eu-west-1"])
+    # Same values in a different order hit the memo and return the same read-only array.
+    assert index.column_mask("Region", ["eu-west-1", "us-east-1"]) is first
+    assert not first.flags.writeable
+    # A selection on another column does not evict it.
+    index.column_mask("State", ["running"])
+    index.column_mask("State", ["stopped"])
+    index.column_mask("State", ["running", "stopped"])
+    assert index.column_mask("Region", ["us-east-1", "eu-west-1"]) is first
+
+    # Past memo_size selections on the same column, the least recently used is dropped.
+    index.column_mask("Region", ["ap-south-1"])
+    index.column_mask("Region", ["eu-west-1"])
+    recomputed = index.column_mask("Region", ["us-east-1", "eu-west-1"])
+    assert recomputed is not first
+    np.testing.assert_array_equal(recomputed, first)
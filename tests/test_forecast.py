@@ -0,0 +1,64 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops.forecast import EC2_GROUPS, fit_series, forecast_groups
+
+
+def test_projection_and_interval_match_textbook_ols():
+    rng = np.random.default_rng(0)
+    days = np.arange(-84, 1, 7, dtype="float64")
+    values = 50.0 + 0.8 * days + rng.normal(0.0, 3.0, size=(4, len(days)))
+    values[1, [2, 5]] = np.nan
+
+    fit = fit_series(days, values, horizons=(30, 90), level=0.9)
+
+    z = NormalDist().inv_cdf(0.95)
+    for row, series in enumerate(values):
+        present = ~np.isnan(series)
+        t, y = days[present], series[present]
+        n = len(t)
+        slope, intercept = np.polyfit(t, y, 1)
+        s = np.sqrt(((y - (intercept + slope * t)) ** 2).sum() / (n - 2))
+        sxx = ((t - t.mean()) ** 2).sum()
+        for i, h in enumerate((30, 90)):
+            yhat = intercept + slope * h
+            stderr = s * np.sqrt(1 + 1 / n + (h - t.mean()) ** 2 / sxx)
+            assert fit["forecast"][row, i] == pytest.approx(max(yhat, 0.0))
+            assert fit["stderr"][row, i] == pytest.approx(stderr)
+            assert fit["upper"][row, i] == pytest.approx(max(yhat + z * stderr, 0.0))
+        assert fit["slope"][row] == pytest.approx(slope)
+        assert fit["points"][row] == n
+
+
+def test_single_point_and_empty_series_stay_flat():
+    fit = fit_series(np.array([-7.0, 0.0]), np.array([[np.nan, 12.0], [np.nan, np.nan]]), horizons=(30,))
+    assert fit["forecast"][:, 0].tolist() == [12.0, 0.0]
+    assert fit["slope"].tolist() == [0.0, 0.0]
+    assert np.isnan(fit["stderr"]).all()
+
+
+def test_history_is_matched_on_account_and_resource_id():
+    history = pd.DataFrame({
+        "Account": ["111111111111"] * 3 + ["222222222222"] * 3,
+        "ResourceId": ["i-1"] * 6,
+        "snapshot_date": ["2025-09-01", "2025-09-15", "2025-10-01"] * 2,
+        "CostUSD": [10.0, 10.0, 10.0, 500.0, 250.0, 0.0],
+    })
+    current = pd.DataFrame({
+        "Account": pd.Categorical(["111111111111", "333333333333"]),
+        "ResourceId": ["i-1", "i-1"],
+        "Region": ["us-east-1", "eu-west-1"],
+        "InstanceType": "m5.large",
+        "CostUSD": [10.0, 40.0],
+        "CreationDate": pd.Timestamp("2025-01-01"),
+    })
+
+    forecasts = forecast_groups(current, EC2_GROUPS, "ResourceId", history, as_of="2025-10-15").set_index("Region")
+
+    assert forecasts.loc["us-east-1", "Basis"] == "history"
+    assert forecasts.loc["us-east-1", "Points"] == 4
+    assert forecasts.loc["us-east-1", "TrendUSDPerDay"] == pytest.approx(0.0)
+    assert forecasts.loc["eu-west-1", "Basis"] == "creation dates"
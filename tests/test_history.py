@@ -0,0 +1,41 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from finops.history import HistoryStore
+
+
+def _write_export(path, cost, resources=("i-1", "i-2"), region="us-east-1"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        "ResourceId": list(resources),
+        "Region": region,
+        "CostUSD": cost / len(resources),
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_month_over_month_averages_snapshots_per_month(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite")
+    for day, cost in [("2025-09-10", 100.0), ("2025-09-20", 100.0), ("2025-10-10", 110.0)]:
+        store.ingest_file(_write_export(tmp_path / day / "aws_resources_compute.csv", cost), "EC2",
+                          date.fromisoformat(day))
+
+    trend = store.cost_trend("month")
+    assert trend["us-east-1"].tolist() == pytest.approx([100.0, 110.0])
+    changes = store.month_over_month()
+    assert changes["PctChange"].iloc[-1] == pytest.approx(0.10)
+
+
+def test_accounts_sharing_resource_ids_are_kept_apart(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite")
+    snapshot = date(2025, 9, 10)
+    store.ingest_file(_write_export(tmp_path / "111111111111" / "aws_resources_compute.csv", 10.0), "EC2", snapshot)
+    store.ingest_file(_write_export(tmp_path / "222222222222" / "aws_resources_compute.csv", 30.0), "EC2", snapshot)
+
+    costs = store.resource_costs("EC2", window=5)
+    assert sorted(costs["Account"].unique()) == ["111111111111", "222222222222"]
+    assert len(costs) == 4
+    assert store.cost_trend("day")["us-east-1"].tolist() == pytest.approx([40.0])
+
@@ -0,0 +1,20 @@
+from finops.profiling import Profiler
+
+
+def _never_called():
+    raise AssertionError("row count evaluated while profiling is off")
+
+
+def test_disabled_profiler_does_not_count_rows():
+    with Profiler(enabled=False).stage("filter") as stage:
+        stage.rows = _never_called
+
+
+def test_enabled_profiler_records_callable_row_count():
+    profiler = Profiler(enabled=True)
+    with profiler.stage("filter") as stage:
+        stage.rows = lambda: 42
+    with profiler.stage("chart", rows=lambda: 7):
+        pass
+
+    assert [record["rows"] for record in profiler.records] == [42, 7]
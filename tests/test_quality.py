@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import quality
+from finops.loader import COMPUTE_DTYPES, S3_DTYPES, load_compute, load_s3
+
+# Headroom over the one-standard-error HyperLogLog bound.
+DISTINCT_TOLERANCE = 4 * quality.DISTINCT_ERROR
+
+
+@pytest.fixture(scope="module", params=["compute", "s3"])
+def frame(request, export_paths):
+    compute_path, s3_path = export_paths
+    if request.param == "compute":
+        return load_compute(compute_path), COMPUTE_DTYPES
+    return load_s3(s3_path), S3_DTYPES
+
+
+@pytest.mark.parametrize("chunksize", [None, 1_000])
+def test_statistics_match_describe(frame, chunksize):
+    df, dtypes = frame
+    if chunksize is None:
+        profile = quality.profile_frame(df, dtypes)
+    else:
+        profile = quality.profile_chunks(quality.iter_slices(df, chunksize), dtypes)
+    statistics = profile.statistics()
+    # The profile accumulates in float64; float32 columns would make describe() the less precise side.
+    numeric = df[statistics.columns].astype("float64")
+    expected = numeric.describe()
+
+    for row in ["count", "mean", "std", "min", "max"]:
+        np.testing.assert_allclose(statistics.loc[row], expected.loc[row], rtol=1e-9)
+    for q in quality.QUANTILES:
+        # describe() interpolates between order statistics; the sketch returns the
+        # lower one, to within SKETCH_ACCURACY of its value.
+        lower = numeric.quantile(q, interpolation="lower")
+        higher = numeric.quantile(q, interpolation="higher")
+        got = statistics.loc[f"{q:.0%}"]
+        np.testing.assert_allclose(got, lower, rtol=quality.SKETCH_ACCURACY, atol=1e-12)
+        assert (expected.loc[f"{q:.0%}"] >= lower).all() and (expected.loc[f"{q:.0%}"] <= higher).all()
+
+
+def test_summary_matches_nunique_and_isna(frame):
+    df, dtypes = frame
+    summary = quality.profile_chunks(quality.iter_slices(df, 1_000), dtypes).summary().set_index("Column")
+
+    assert summary["Missing"].to_dict() == df.isna().sum().to_dict()
+    assert (summary["Invalid"] == 0).all()
+    nunique = df.nunique()
+    for column, estimate in summary["Distinct"].items():
+        assert estimate == pytest.approx(nunique[column], rel=DISTINCT_TOLERANCE, abs=1)
+
+
+def test_values_that_do_not_parse_count_as_invalid():
+    df = pd.DataFrame({
+        "CostUSD": ["1.5", "n/a", None, "2"],
+        "CreationDate": ["2025-01-01", "yesterday", "2025-02-01", None],
+    })
+    summary = quality.profile_frame(df, COMPUTE_DTYPES).summary().set_index("Column")
+    assert summary.loc["CostUSD", ["Missing", "Invalid"]].tolist() == [1, 1]
+    assert summary.loc["CreationDate", ["Missing", "Invalid"]].tolist() == [1, 1]
+    assert quality.profile_frame(df, COMPUTE_DTYPES).statistics()["CostUSD"]["mean"] == pytest.approx(1.75)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import benchmark
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def backends(export_paths):
+    compute_path, s3_path = export_paths
+    return (benchmark.open_backend("pandas", compute_path, s3_path),
+            benchmark.open_backend("duckdb", compute_path, s3_path))
+
+
+def _filters(dataset, column, keep):
+    options = dataset.options(column)
+    return {column: options[:max(1, len(options) // keep)]}
+
+
+EC2_FILTERS = [{}, ("Region", 2), ("InstanceType", 3), ("State", 2)]
+S3_FILTERS = [{}, ("Region", 2), ("StorageClass", 2), ("Encryption", 2)]
+
+
+def _resolve(dataset, spec):
+    return spec if isinstance(spec, dict) else _filters(dataset, *spec)
+
+
+def _plain(frame):
+    """`frame` with categoricals as plain values: the backends differ in which categories they carry."""
+    return frame.reset_index(drop=True).astype({c: object for c in frame.columns
+                                                if isinstance(frame[c].dtype, pd.CategoricalDtype)})
+
+
+def _assert_series_close(left, right):
+    left = left.sort_index()
+    right = right.sort_index()
+    assert list(left.index.astype(str)) == list(right.index.astype(str))
+    np.testing.assert_allclose(left.to_numpy(dtype="float64"), right.to_numpy(dtype="float64"), rtol=1e-9)
+
+
+def test_filter_options_match(backends):
+    pandas_backend, duckdb_backend = backends
+    for column in ["Region", "InstanceType", "State", "ResourceType"]:
+        assert pandas_backend.ec2.options(column) == duckdb_backend.ec2.options(column)
+    for column in ["Region", "StorageClass", "Encryption"]:
+        assert pandas_backend.s3.options(column) == duckdb_backend.s3.options(column)
+
+
+@pytest.mark.parametrize("spec", EC2_FILTERS)
+def test_ec2_selection_aggregates_match(backends, spec):
+    pandas_backend, duckdb_backend = backends
+    filters = _resolve(pandas_backend.ec2, spec)
+    expected = pandas_backend.ec2.select(filters)
+    result = duckdb_backend.ec2.select(filters)
+
+    assert len(result) == len(expected)
+    expected, result = expected.complete(), result.complete()
+    assert len(result) == len(expected)
+    for column in ["CostUSD", "CPUUtilization"]:
+        assert result.total(column) == pytest.approx(expected.total(column), rel=1e-6)
+        assert result.mean(column) == pytest.approx(expected.mean(column), rel=1e-6)
+        assert result.median(column) == pytest.approx(expected.median(column), rel=1e-6)
+    _assert_series_close(result.cost_by_region(), expected.cost_by_region())
+    _assert_series_close(result.avg_cost_by_region(), expected.avg_cost_by_region())
+    pd.testing.assert_frame_equal(_plain(result.top_instances()), _plain(expected.top_instances()), check_dtype=False)
+    assert result.ec2_insights() == pytest.approx(expected.ec2_insights())
+
+
+@pytest.mark.parametrize("spec", S3_FILTERS)
+def test_s3_selection_aggregates_match(backends, spec):
+    pandas_backend, duckdb_backend = backends
+    filters = _resolve(pandas_backend.s3, spec)
+    expected = pandas_backend.s3.select(filters).complete()
+    result = duckdb_backend.s3.select(filters).complete()
+
+    assert len(result) == len(expected)
+    _assert_series_close(result.cost_by_region(), expected.cost_by_region())
+    _assert_series_close(result.storage_by_region(), expected.storage_by_region())
+    pd.testing.assert_frame_equal(_plain(result.top_buckets()), _plain(expected.top_buckets()), check_dtype=False)
+
+
+def test_tag_queries_match(backends):
+    pandas_backend, duckdb_backend = backends
+    for service in ["ec2", "s3"]:
+        expected_dataset = getattr(pandas_backend, service)
+        result_dataset = getattr(duckdb_backend, service)
+        assert result_dataset.tag_columns() == expected_dataset.tag_columns()
+        for column in expected_dataset.tag_columns():
+            assert result_dataset.options(column) == expected_dataset.options(column)
+            key = column.split(":", 1)[1]
+            tag_filter = {column: expected_dataset.options(column)[:1]}
+            expected = expected_dataset.select(tag_filter).complete()
+            result = result_dataset.select(tag_filter).complete()
+            assert len(result) == len(expected)
+            for selection_key in [key, *expected.tag_keys()[:2]]:
+                pd.testing.assert_frame_equal(
+                    result.cost_by_tag(selection_key).sort_values(selection_key, ignore_index=True),
+                    expected.cost_by_tag(selection_key).sort_values(selection_key, ignore_index=True),
+                    check_exact=False, rtol=1e-9,
+                )
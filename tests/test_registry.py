@@ -0,0 +1,89 @@
+import gc
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from finops.registry import DatasetRegistry
+
+
+class _Loader:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return pd.DataFrame({"CostUSD": np.arange(1_000, dtype="float64"), "Region": "us-east-1"})
+
+
+def _views(registry, name="compute"):
+    return {entry["dataset"]: entry["views"] for entry in registry.stats()}.get(name)
+
+
+def test_sessions_share_one_copy():
+    registry, load = DatasetRegistry(), _Loader()
+
+    first = registry.acquire("compute", ("a.csv",), load)
+    second = registry.acquire("compute", ("a.csv",), load)
+
+    assert load.calls == 1
+    assert first is not second
+    assert np.shares_memory(first["CostUSD"].to_numpy(), second["CostUSD"].to_numpy())
+    assert _views(registry) == 2
+
+
+def test_concurrent_acquires_load_once():
+    registry, load = DatasetRegistry(), _Loader(delay=0.05)
+    views = []
+    threads = [threading.Thread(target=lambda: views.append(registry.acquire("s3", ("b.csv",), load)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load.calls == 1
+    assert _views(registry, "s3") == 8
+
+
+def test_writes_to_a_view_stay_private():
+    registry, load = DatasetRegistry(), _Loader()
+    first = registry.acquire("compute", ("a.csv",), load)
+    second = registry.acquire("compute", ("a.csv",), load)
+
+    first["CostUSD"] = 0.0
+
+    assert second["CostUSD"].sum() == np.arange(1_000).sum()
+
+
+def test_views_are_released_when_garbage_collected():
+    registry, load = DatasetRegistry(), _Loader()
+    first = registry.acquire("upload:1", ("x",), load)
+    second = registry.acquire("upload:1", ("x",), load)
+
+    del first
+    gc.collect()
+    assert _views(registry, "upload:1") == 1
+    registry.prune("upload:")
+    assert _views(registry, "upload:1") == 1
+
+    del second
+    gc.collect()
+    assert _views(registry, "upload:1") == 0
+    registry.prune("upload:")
+    assert registry.stats() == []
+
+
+def test_changed_files_reload_and_old_views_stay_valid():
+    registry, load = DatasetRegistry(), _Loader()
+    old = registry.acquire("compute", ("a.csv", 1), load)
+
+    new = registry.acquire("compute", ("a.csv", 2), load)
+
+    assert load.calls == 2
+    assert not np.shares_memory(old["CostUSD"].to_numpy(), new["CostUSD"].to_numpy())
+    assert len(old) == 1_000
+    assert [entry["views"] for entry in registry.stats()] == [1]
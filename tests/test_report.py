@@ -0,0 +1,31 @@
+import shutil
+
+import pandas as pd
+
+from finops import report
+from finops.loader import COMPUTE_STEM, S3_STEM
+
+
+def test_tag_keys_are_slugified_in_file_names(tmp_path, sample_paths):
+    account_dir = tmp_path / "acct"
+    account_dir.mkdir()
+    compute_path, s3_path = sample_paths
+    compute = pd.read_csv(compute_path)
+    compute["Tags"] = "cost/center=42,Team Name=data"
+    compute.to_csv(account_dir / f"{COMPUTE_STEM}.csv", index=False)
+    shutil.copy(s3_path, account_dir / f"{S3_STEM}.csv")
+
+    report.build_account_report(account_dir, tmp_path / "out", include_charts=False)
+
+    written = {path.name for path in (tmp_path / "out").glob("*_cost_by_tag_*.csv")}
+    assert {f"ec2_cost_by_tag_{report.filename_slug('cost/center')}.csv",
+            f"ec2_cost_by_tag_{report.filename_slug('Team Name')}.csv"} <= written
+    assert all(name.isascii() and "/" not in name and " " not in name for name in written)
+
+
+def test_filename_slug():
+    assert report.filename_slug("Team.Name-2") == "Team.Name-2"
+    assert report.filename_slug("a/b\\c d:e.f-g").startswith("a_b_c_d_e.f-g_")
+    slugs = {report.filename_slug(key) for key in ["a/b", "a:b", "a_b", "a b"]}
+    assert len(slugs) == 4
+    assert all(slug.startswith("a_b") for slug in slugs)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import rightsizing
+
+CATALOG = pd.DataFrame({
+    "InstanceType": ["m5.xlarge", "m5.large", "m6.large", "c5.large", "t3.small"],
+    "Family": ["m", "m", "m", "c", "t"],
+    "vCPU": [4.0, 2.0, 2.0, 2.0, 2.0],
+    "MemoryGiB": [16.0, 8.0, 8.0, 8.0, 2.0],
+    "NetworkMbps": [1250.0, 750.0, 750.0, 750.0, 500.0],
+    "HourlyPriceUSD": [0.192, 0.096, 0.096, 0.085, 0.0208],
+})
+
+
+def _instances(**overrides):
+    rows = {
+        "ResourceId": ["i-idle", "i-stopped", "i-busy", "i-unknown", "i-small"],
+        "InstanceType": ["m5.xlarge", "m5.xlarge", "m5.xlarge", "x9.huge", "m5.large"],
+        "State": ["running", "stopped", "running", "running", "running"],
+        # Needs 1.5 vCPU and 6 GiB at the 80% target, except i-busy (4.5 vCPU).
+        "CPUUtilization": [30.0, 30.0, 90.0, 30.0, 10.0],
+        "MemoryUtilization": [30.0, 30.0, 30.0, 30.0, 10.0],
+        "NetworkIn_Bps": 1e6,
+        "NetworkOut_Bps": 1e6,
+        "CostUSD": [100.0, 100.0, 100.0, 100.0, 40.0],
+    }
+    rows.update(overrides)
+    return pd.DataFrame(rows).set_index("ResourceId")
+
+
+def test_cheapest_fitting_type_in_family_and_savings():
+    result = rightsizing.rightsize(_instances(), CATALOG)
+
+    # m5.large and m6.large tie on price; the first in catalog order wins.
+    assert result.loc["i-idle", "RecommendedType"] == "m5.large"
+    assert result.loc["i-idle", "CurrentHourlyUSD"] == pytest.approx(0.192)
+    assert result.loc["i-idle", "RecommendedHourlyUSD"] == pytest.approx(0.096)
+    assert result.loc["i-idle", "ProjectedCostUSD"] == pytest.approx(50.0)
+    assert result.loc["i-idle", "SavingsUSD"] == pytest.approx(50.0)
+
+
+def test_instances_without_a_recommendation_keep_their_cost():
+    result = rightsizing.rightsize(_instances(), CATALOG)
+
+    # Stopped, nothing smaller fits, not in the catalog, and an equal-price
+    # type is not cheaper than the current one.
+    unchanged = result.loc[["i-stopped", "i-busy", "i-unknown", "i-small"]]
+    assert unchanged["RecommendedType"].isna().all()
+    assert unchanged["RecommendedHourlyUSD"].isna().all()
+    assert unchanged["SavingsUSD"].tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert unchanged["ProjectedCostUSD"].tolist() == [100.0, 100.0, 100.0, 40.0]
+    assert np.isnan(result.loc["i-unknown", "CurrentHourlyUSD"])
+
+
+def test_cross_family_and_target_utilization():
+    cross = rightsizing.rightsize(_instances(), CATALOG, same_family=False)
+    assert cross.loc["i-idle", "RecommendedType"] == "c5.large"
+    assert cross.loc["i-idle", "SavingsUSD"] == pytest.approx(100.0 * (1 - 0.085 / 0.192))
+
+    # At a 30% ceiling i-idle needs the full 4 vCPU and 16 GiB of its current type.
+    strict = rightsizing.rightsize(_instances(), CATALOG, target_utilization=0.3)
+    assert pd.isna(strict.loc["i-idle", "RecommendedType"])
+
+
+def test_blocks_give_the_same_result():
+    ec2 = _instances()
+    pd.testing.assert_frame_equal(rightsizing.rightsize(ec2, CATALOG, block_size=2), rightsizing.rightsize(ec2, CATALOG))
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from finops import sources
+from finops.loader import S3_DTYPES
+
+
+@pytest.fixture
+def s3_exports(tmp_path, sample_paths):
+    s3 = pd.read_csv(sample_paths[1])
+    with_encryption = tmp_path / "111111111111" / "aws_resources_S3.csv"
+    without_encryption = tmp_path / "222222222222" / "aws_resources_S3.csv"
+    for path in (with_encryption, without_encryption):
+        path.parent.mkdir()
+    s3.to_csv(with_encryption, index=False)
+    s3.drop(columns="Encryption").to_csv(without_encryption, index=False)
+    return [with_encryption, without_encryption], s3
+
+
+def test_missing_encryption_column_is_unknown(s3_exports):
+    paths, s3 = s3_exports
+    combined = sources.load_sources(paths, S3_DTYPES)
+
+    absent = combined[combined[sources.ACCOUNT_COLUMN] == "222222222222"]
+    present = combined[combined[sources.ACCOUNT_COLUMN] == "111111111111"]
+    assert (absent["Encryption"] == "Unknown").all()
+    assert present["Encryption"].isna().sum() == s3["Encryption"].isna().sum()
+
+
+def test_duckdb_union_matches_pandas(s3_exports, sample_paths):
+    pytest.importorskip("duckdb")
+    from finops import query
+
+    paths, _ = s3_exports
+    backend = query.DuckDBBackend(sample_paths[0], paths)
+    combined = sources.load_sources(paths, S3_DTYPES)
+
+    def counts(values):
+        return values.astype(object).fillna("(missing)").value_counts().to_dict()
+
+    assert counts(backend.s3.select({}).frame(["Encryption"])["Encryption"]) == counts(combined["Encryption"])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import analysis, benchmark, streaming
+
+
+def _assert_series_equal(streamed, expected):
+    streamed = streamed.sort_index()
+    expected = expected.copy()
+    expected.index = expected.index.astype(object)
+    pd.testing.assert_series_equal(streamed, expected.sort_index(), check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize("filters", [None, {"Region": ["us-east-1", "eu-west-1"]}])
+def test_compute_summary_matches_pandas(export_paths, filters):
+    compute_path, s3_path = export_paths
+    ec2 = benchmark.open_backend("pandas", compute_path, s3_path).ec2.select(filters or {}).complete()
+    frame = ec2.frame()
+
+    streamed = streaming.summarize_compute(compute_path, chunksize=997, filters=filters)
+
+    _assert_series_equal(streamed["cost_by_region"].sums(), analysis.cost_by_region(frame))
+    _assert_series_equal(streamed["cost_by_region"].means(), analysis.avg_cost_by_region(frame))
+    _assert_series_equal(streamed["cost_by_instance_type"].sums(),
+                         frame.groupby("InstanceType", observed=True)["CostUSD"].sum())
+    top = streamed["top_instances"].result()
+    expected = ec2.top_instances()
+    assert list(top["ResourceId"]) == list(expected["ResourceId"])
+    np.testing.assert_allclose(top["CostUSD"], expected["CostUSD"])
+    np.testing.assert_array_equal(streamed["cpu_histogram"].counts, streaming.histogram_counts(frame["CPUUtilization"]))
+
+
+def test_s3_summary_matches_pandas(export_paths):
+    compute_path, s3_path = export_paths
+    s3 = benchmark.open_backend("pandas", compute_path, s3_path).s3.select({}).complete()
+
+    streamed = streaming.summarize_s3(s3_path, chunksize=997)
+
+    _assert_series_equal(streamed["cost_by_region"].sums(), s3.cost_by_region())
+    _assert_series_equal(streamed["storage_by_region"].sums(), s3.storage_by_region())
+    assert list(streamed["top_buckets"].result()["BucketName"]) == list(s3.top_buckets()["BucketName"])
+
+
+def test_top_k_merges_partials_with_repeated_labels_and_ties():
+    first = pd.DataFrame({"ResourceId": ["a", "b", "c"], "CostUSD": [5.0, 5.0, 1.0]})
+    second = pd.DataFrame({"ResourceId": ["d", "e", "f"], "CostUSD": [5.0, 9.0, 5.0]})
+    left = streaming.TopK("CostUSD", 4, ["ResourceId", "CostUSD"], source=0)
+    right = streaming.TopK("CostUSD", 4, ["ResourceId", "CostUSD"], source=1)
+    left.update(first)
+    right.update(second)
+
+    merged = left.merge(right).result()
+
+    expected = pd.concat([first, second], ignore_index=True).nlargest(4, "CostUSD")
+    assert list(merged["ResourceId"]) == list(expected["ResourceId"])
+
+
+def test_top_k_same_source_partials_do_not_compare_records():
+    chunk = pd.DataFrame({"ResourceId": ["a", "b"], "CostUSD": [3.0, 3.0]})
+    left = streaming.TopK("CostUSD", 2, ["ResourceId", "CostUSD"])
+    right = streaming.TopK("CostUSD", 2, ["ResourceId", "CostUSD"])
+    left.update(chunk)
+    right.update(chunk)
+
+    assert list(left.merge(right).result()["ResourceId"]) == ["a", "a"]
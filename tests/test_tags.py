@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from finops import tags
+
+TAG_STRINGS = [
+    "Owner=alice,Environment=dev,Owner=bob",
+    "Owner = carol , Team=data",
+    "Environment=prod,Owner",
+    "Owner=,Team=web",
+    "Team=web,Owner=dave=ops",
+    "Owner=erin,Owner=",
+    None,
+]
+
+
+def test_parse_tag_string_keeps_the_last_repeated_key():
+    assert tags.parse_tag_string("Owner=alice,Environment=dev,Owner=bob") == {"Owner": "bob", "Environment": "dev"}
+
+
+def test_duckdb_cost_by_tag_matches_pandas(tmp_path):
+    pytest.importorskip("duckdb")
+    from finops import query
+
+    frame = pd.DataFrame({
+        "ResourceId": [f"i-{n}" for n in range(len(TAG_STRINGS))],
+        "CostUSD": [1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0],
+        "Tags": TAG_STRINGS,
+    })
+    frame.to_csv(tmp_path / "compute.csv", index=False)
+    frame[["CostUSD"]].to_csv(tmp_path / "s3.csv", index=False)
+    backend = query.DuckDBBackend(tmp_path / "compute.csv", tmp_path / "s3.csv")
+    tagged = tags.with_tag_columns(frame)
+
+    assert backend.ec2.tag_keys() == tags.tag_keys(tagged)
+    for key in tags.tag_keys(tagged):
+        expected = tags.cost_by_tag(tagged, key).sort_values(key, ignore_index=True)
+        result = backend.ec2.select({}).cost_by_tag(key).sort_values(key, ignore_index=True)
+        pd.testing.assert_frame_equal(result, expected)
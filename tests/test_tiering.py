@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finops import tiering
+
+PRICES = tiering.load_price_table(Path(__file__).resolve().parent.parent / tiering.PRICE_TABLE_FILENAME)
+AS_OF = pd.Timestamp("2025-10-01")
+
+
+@pytest.fixture
+def s3():
+    return pd.DataFrame({
+        "BucketName": ["logs", "archive-eu", "cold", "unpriced"],
+        "Region": ["us-east-1", "eu-central-1", "us-east-1", "mars-north-1"],
+        "StorageClass": ["STANDARD", "STANDARD_IA", "GLACIER", "STANDARD"],
+        "TotalSizeGB": [1000.0, 200.0, 500.0, 100.0],
+        "ObjectCount": [10_000, 2_000, 1_000, 100],
+        "CreationDate": AS_OF - pd.to_timedelta([400, 100, 800, 900], unit="D"),
+    })
+
+
+def test_cost_matrix_uses_list_prices(s3):
+    simulator = tiering.TieringSimulator(s3, PRICES, as_of=AS_OF)
+
+    # STANDARD, INTELLIGENT_TIERING, STANDARD_IA, GLACIER, DEEP_ARCHIVE
+    np.testing.assert_allclose(simulator.monthly[0], [23.0, 23.0, 12.5, 3.6, 0.99])
+    np.testing.assert_allclose(simulator.monthly[1], [4.9, 4.9, 2.7, 0.8, 0.36])
+    np.testing.assert_allclose(simulator.transition[0], [0.0, 0.1, 0.1, 0.3, 0.5])
+    np.testing.assert_allclose(simulator.transition[1], [0.0, 0.02, 0.02, 0.06, 0.1])
+    assert np.isnan(simulator.monthly[3]).all() and np.isnan(simulator.current_monthly[3])
+    np.testing.assert_allclose(simulator.current_monthly[:3], [23.0, 2.7, 1.8])
+    assert simulator.age_days.tolist() == [400.0, 100.0, 800.0, 900.0]
+
+
+def test_default_policy(s3):
+    simulation = tiering.TieringSimulator(s3, PRICES, as_of=AS_OF).simulate(tiering.DEFAULT_POLICY)
+
+    # Only "logs" is past 365 days in a warmer class than GLACIER; "archive-eu" is
+    # already STANDARD_IA and "unpriced" has no prices.
+    assert simulation["TargetClass"].tolist()[0] == "GLACIER"
+    assert simulation["TargetClass"].iloc[1:].isna().all()
+    assert simulation.loc[0, "ProjectedMonthlyUSD"] == pytest.approx(3.6)
+    assert simulation["MonthlySavingsUSD"].tolist() == pytest.approx([19.4, 0.0, 0.0, 0.0])
+    assert simulation["TransitionCostUSD"].tolist() == pytest.approx([0.3, 0.0, 0.0, 0.0])
+    summary = tiering.summarize(simulation)
+    assert summary["buckets_moved"] == 1
+    assert summary["payback_months"] == pytest.approx(0.3 / 19.4)
+
+
+def test_policy_that_moves_nothing(s3):
+    simulation = tiering.TieringSimulator(s3, PRICES, as_of=AS_OF).simulate({"STANDARD_IA": 1_000, "GLACIER": None})
+
+    assert simulation["TargetClass"].isna().all()
+    summary = tiering.summarize(simulation)
+    assert summary["buckets_moved"] == 0
+    assert summary["monthly_savings"] == 0.0
+    assert summary["transition_cost"] == 0.0
+    assert summary["payback_months"] is None
+    assert summary["projected_monthly"] == pytest.approx(summary["current_monthly"])
+    assert tiering.transition_table(s3, simulation).empty
+
+
+def test_policy_that_archives_everything(s3):
+    simulation = tiering.TieringSimulator(s3, PRICES, as_of=AS_OF).simulate({"STANDARD_IA": 0, "DEEP_ARCHIVE": 0})
+
+    assert simulation["TargetClass"].astype(object).tolist()[:3] == ["DEEP_ARCHIVE"] * 3
+    assert pd.isna(simulation["TargetClass"].iloc[3])
+    assert simulation["ProjectedMonthlyUSD"].tolist()[:3] == pytest.approx([0.99, 0.36, 0.495])
+    assert simulation["MonthlySavingsUSD"].tolist() == pytest.approx([22.01, 2.34, 1.305, 0.0])
+    assert simulation["TransitionCostUSD"].tolist() == pytest.approx([0.5, 0.1, 0.05, 0.0])
+
+    moves = tiering.transition_table(s3, simulation).set_index("From")
+    assert moves["To"].unique().tolist() == ["DEEP_ARCHIVE"]
+    assert moves.loc["STANDARD", "TotalSizeGB"] == 1000.0
+    assert moves["Buckets"].sum() == 3
@@ -0,0 +1,69 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from finops import uploads
+from finops.loader import COMPUTE_DTYPES, load_compute
+
+
+def _upload(data, name):
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+@pytest.fixture(scope="module")
+def compute_bytes(sample_paths):
+    return sample_paths[0].read_bytes()
+
+
+def test_compression_is_detected_from_magic_bytes(compute_bytes):
+    # Names deliberately disagree with the content.
+    assert uploads.detect_compression(_upload(gzip.compress(compute_bytes), "export.csv")) == "gzip"
+    assert uploads.detect_compression(_upload(b"\x28\xb5\x2f\xfd" + b"\0" * 16, "export.csv.gz")) == "zstd"
+    assert uploads.detect_compression(_upload(compute_bytes, "export.csv.zst")) is None
+
+    upload = _upload(compute_bytes, "export.csv")
+    upload.seek(10)
+    uploads.detect_compression(upload)
+    assert upload.tell() == 10
+
+
+def test_gzip_upload_parses_like_the_plain_file(compute_bytes, sample_paths):
+    expected = load_compute(sample_paths[0])
+
+    for upload in [_upload(compute_bytes, "a.csv"), _upload(gzip.compress(compute_bytes), "a.csv.gz")]:
+        parsed = uploads.read_upload(upload, COMPUTE_DTYPES, chunksize=37)
+        pd.testing.assert_frame_equal(parsed, expected)
+
+
+def test_zstd_upload(compute_bytes, sample_paths):
+    zstandard = pytest.importorskip("zstandard")
+    upload = _upload(zstandard.ZstdCompressor().compress(compute_bytes), "a.csv.zst")
+    pd.testing.assert_frame_equal(uploads.read_upload(upload, COMPUTE_DTYPES), load_compute(sample_paths[0]))
+
+
+def test_zstd_without_zstandard_is_rejected(monkeypatch):
+    monkeypatch.setattr(uploads, "zstd_supported", lambda: False)
+    with pytest.raises(ValueError, match="zstandard"):
+        uploads.check_columns(_upload(b"\x28\xb5\x2f\xfd" + b"\0" * 16, "a.csv.zst"), [])
+
+
+def test_bad_header_is_rejected_before_parsing(compute_bytes):
+    good = _upload(gzip.compress(compute_bytes), "good.csv.gz")
+    bad = _upload(b"ResourceId,Region,Cost\ni-1,us-east-1,1.0\n", "bad.csv")
+    with pytest.raises(ValueError, match="bad.csv is missing required columns InstanceType, State, CostUSD"):
+        uploads.load_uploads([good, bad], COMPUTE_DTYPES, uploads.COMPUTE_REQUIRED_COLUMNS)
+    assert good.tell() == 0
+
+
+def test_content_hash_depends_only_on_content(compute_bytes):
+    first = uploads.content_hash([_upload(compute_bytes, "a.csv")])
+    assert uploads.content_hash([_upload(compute_bytes, "renamed.csv")]) == first
+    assert uploads.content_hash([_upload(compute_bytes[:-1] + b" ", "a.csv")]) != first
+
+    # File boundaries count: the same bytes split differently hash differently.
+    assert (uploads.content_hash([_upload(b"ab", "1"), _upload(b"c", "2")])
+            != uploads.content_hash([_upload(b"a", "1"), _upload(b"bc", "2")]))